@@ -0,0 +1,18 @@
+"""Tests des générateurs aléatoires dérivés d'une graine (aleatoire.generateur)."""
+
+import unittest
+
+from thesis_analysis.aleatoire import generateur
+
+
+class TestGenerateur(unittest.TestCase):
+
+    def test_reproductible_par_cle(self):
+        tirage = generateur(42, ("echantillon", None)).random(5)
+        self.assertEqual(list(generateur(42, ("echantillon", None)).random(5)), list(tirage))
+        self.assertNotEqual(list(generateur(42, ("echantillon", "g")).random(5)), list(tirage))
+        self.assertNotEqual(list(generateur(43, ("echantillon", None)).random(5)), list(tirage))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Tests des intervalles de confiance bootstrap (bootstrap_ic) comparés à scipy.stats.bootstrap."""
+
+import unittest
+
+import numpy as np
+from scipy.stats import bootstrap
+
+from thesis_analysis.bootstrap import bootstrap_ic
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.groupes = {"asymetrique": rng.lognormal(0, 0.8, 60), "normal": rng.normal(10, 2, 41)}
+
+    def _comparer(self, methode_scipy, methode):
+        n_bootstrap = 20000
+        resultats = bootstrap_ic(self.groupes, methode=methode, n_bootstrap=n_bootstrap, seed=1)
+
+        for cle, valeurs in self.groupes.items():
+            for statistique, fonction in [("mean", np.mean), ("median", np.median)]:
+                reference = bootstrap(
+                    (valeurs,), fonction, n_resamples=n_bootstrap, method=methode_scipy,
+                    random_state=np.random.default_rng(2)
+                ).confidence_interval
+                largeur = reference.high - reference.low
+
+                # Les rééchantillonnages diffèrent : écart toléré de quelques pour cent de la largeur
+                self.assertLess(abs(resultats[cle][statistique][0] - reference.low), 0.06*largeur)
+                self.assertLess(abs(resultats[cle][statistique][1] - reference.high), 0.06*largeur)
+
+    def test_percentile(self):
+        self._comparer("percentile", "percentile")
+
+    def test_bca(self):
+        self._comparer("BCa", "bca")
+
+    def test_bca_decale_vers_l_asymetrie(self):
+        # Distribution asymétrique à droite : l'intervalle BCa de la moyenne est décalé vers la droite
+        valeurs = self.groupes["asymetrique"]
+        percentile = bootstrap_ic({"x": valeurs}, "percentile", 20000, seed=3)["x"]["mean"]
+        bca = bootstrap_ic({"x": valeurs}, "bca", 20000, seed=3)["x"]["mean"]
+        self.assertGreater(bca[0], percentile[0])
+        self.assertGreater(bca[1], percentile[1])
+
+    def test_reproductible(self):
+        sequentiel = bootstrap_ic(self.groupes, "bca", 500, seed=4)
+        paralleles = bootstrap_ic(self.groupes, "bca", 500, seed=4, n_jobs=2)
+        inverse = bootstrap_ic(dict(reversed(list(self.groupes.items()))), "bca", 500, seed=4)
+        self.assertEqual(sequentiel, paralleles)
+        self.assertEqual(sequentiel, inverse)
+
+
+if __name__ == "__main__":
+    unittest.main()
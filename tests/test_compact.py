@@ -0,0 +1,53 @@
+"""Tests du mode compact (analyseStatistiques(df, compact = True))."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from thesis_analysis import analyseStatistiques
+
+
+class TestCompact(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 400
+        self.df = pd.DataFrame({
+            "mesure": rng.normal(size=n),
+            "demi": rng.integers(0, 200, n)/2,
+            "entier": rng.integers(0, 100, n),
+            "groupe": rng.choice(["a", "b", "c"], n),
+        })
+        self.df.loc[::7, "demi"] = np.nan
+
+    def test_types(self):
+        analyses = analyseStatistiques(self.df, compact=True)
+
+        # Les flottants non représentables exactement en float32 restent en float64
+        self.assertEqual(analyses.df["mesure"].dtype, np.float64)
+        self.assertEqual(analyses.df["demi"].dtype, np.float32)
+        self.assertEqual(analyses.df["entier"].dtype, np.int8)
+        self.assertIsInstance(analyses.df["groupe"].dtype, pd.CategoricalDtype)
+        self.assertGreater(analyses.rapport_compact["economie"], 0)
+
+    def test_erreur_relative_non_toleree(self):
+        df = pd.DataFrame({"x": [1.0, 0.5, 1 + 2.0**-40]})
+        self.assertEqual(analyseStatistiques(df, compact=True).df["x"].dtype, np.float64)
+
+    def test_statistiques_identiques(self):
+        variables = {"mesure": "quantitative", "demi": "quantitative", "entier": "quantitative"}
+        reference = analyseStatistiques(self.df).analyse_univarie(variables, ["groupe"])
+        compact = analyseStatistiques(self.df, compact=True).analyse_univarie(variables, ["groupe"])
+
+        for variable in variables:
+            self.assertEqual(compact[variable]["global"]["mean"], reference[variable]["global"]["mean"])
+            self.assertEqual(compact[variable]["global"]["std"], reference[variable]["global"]["std"])
+            self.assertEqual(compact[variable]["test"]["groupe"][0], reference[variable]["test"]["groupe"][0])
+            self.assertEqual(
+                compact[variable]["test"]["groupe"][1]["p_value"], reference[variable]["test"]["groupe"][1]["p_value"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests des corrélations de Pearson et de Spearman (correler) comparées à scipy, paire par paire."""
+
+import unittest
+
+import numpy as np
+from scipy.stats import pearsonr, spearmanr
+
+from thesis_analysis.correlations import correler
+
+
+class TestCorrelations(unittest.TestCase):
+
+    def _references(self, X, Y, fonction):
+        r = np.full((X.shape[1], Y.shape[1]), np.nan)
+        n = np.zeros((X.shape[1], Y.shape[1]), dtype=np.int64)
+        p_value = np.full((X.shape[1], Y.shape[1]), np.nan)
+        for i in range(X.shape[1]):
+            for j in range(Y.shape[1]):
+                lignes = ~np.isnan(X[:, i]) & ~np.isnan(Y[:, j])
+                n[i, j] = lignes.sum()
+                if n[i, j] > 2:
+                    r[i, j], p_value[i, j] = fonction(X[lignes, i], Y[lignes, j])
+        return r, n, p_value
+
+    def _comparer(self, X, Y):
+        resultats = correler(X, Y)
+        for methode, fonction in [("pearson", pearsonr), ("spearman", spearmanr)]:
+            r, n, p_value = self._references(X, Y, fonction)
+            np.testing.assert_array_equal(resultats[methode]["n"], n)
+            np.testing.assert_allclose(resultats[methode]["r"], r, rtol=0, atol=1e-10)
+            np.testing.assert_allclose(resultats[methode]["p_value"], p_value, rtol=1e-6, atol=1e-12)
+
+    def _donnees(self, n, p, q, manquants, seed):
+        rng = np.random.default_rng(seed)
+        X = np.round(rng.normal(size=(n, p)), 1)
+        Y = np.round(X[:, :1] + rng.normal(size=(n, q)), 1)
+        X[rng.uniform(size=X.shape) < manquants] = np.nan
+        Y[rng.uniform(size=Y.shape) < manquants] = np.nan
+        return X, Y
+
+    def test_sans_valeur_manquante(self):
+        self._comparer(*self._donnees(80, 4, 3, 0, 0))
+
+    def test_manquants_homogenes(self):
+        X, Y = self._donnees(80, 4, 3, 0, 1)
+        X[:10] = np.nan
+        Y[70:] = np.nan
+        self._comparer(X, Y)
+
+    def test_manquants_heterogenes(self):
+        # Un profil de valeurs manquantes par colonne, ex-aequo nombreux (valeurs arrondies)
+        self._comparer(*self._donnees(120, 12, 10, 0.15, 2))
+
+    def test_colonne_constante_ou_trop_courte(self):
+        X, Y = self._donnees(40, 3, 2, 0.1, 3)
+        X[:, 1] = 1.0
+        X[2:, 2] = np.nan
+        resultats = correler(X, Y)
+        self.assertTrue(np.isnan(resultats["spearman"]["r"][1]).all())
+        self.assertTrue(np.isnan(resultats["spearman"]["p_value"][2]).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Tests de la génération des tableaux (genererTableau)."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from thesis_analysis import analyseStatistiques, genererTableau
+
+
+class TestFormatPValue(unittest.TestCase):
+
+    def test_formats(self):
+        tableau = genererTableau({})
+        attendus = [
+            (0.5, "0.5"),
+            (0.01234, "0.012"),
+            (0.0072, "< 0.01"),
+            (0.004, "< 0.005"),
+            (0.00099, "< 10^-3"),
+            (1e-5, "< 10^-4"),
+            (3.2e-7, "< 10^-6"),
+            (1e-300, "< 10^-299"),
+        ]
+        for p_value, texte in attendus:
+            self.assertEqual(tableau._formater_p_value(p_value), texte)
+
+    def test_p_value_nulle_ou_manquante(self):
+        tableau = genererTableau({})
+        self.assertTrue(tableau._formater_p_value(0.0).startswith("< 10^-"))
+        self.assertEqual(tableau._formater_p_value(np.nan), "nan")
+
+
+class TestActualisation(unittest.TestCase):
+
+    def _resultats(self, modalites, seed):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({"c": rng.choice(modalites, 120), "g": rng.choice(["a", "b"], 120)})
+        return analyseStatistiques(df).analyse_univarie({"c": "qualitative"}, ["g"])
+
+    def _modalites(self, tableau):
+        return [ligne[1] for ligne in tableau.tableau_descriptif(None, ["c"], ["g"], format_sortie="raw")[2:]]
+
+    def test_resultats_modifies(self):
+        for cache in [True, False]:
+            resultats = self._resultats(["u", "v"], 0)
+            tableau = genererTableau(resultats, cache=cache)
+            self.assertEqual(sorted(self._modalites(tableau)), ["u", "v"])
+
+            # Les résultats de la variable sont remplacés : l'index et les lignes suivent
+            resultats["c"] = self._resultats(["u", "v", "w"], 1)["c"]
+            self.assertEqual(sorted(self._modalites(tableau)), ["u", "v", "w"])
+
+    def test_invalidation_par_variable(self):
+        rng = np.random.default_rng(2)
+        df = pd.DataFrame({
+            "c": rng.choice(["u", "v"], 120), "d": rng.choice(["u", "v"], 120),
+            "g": rng.choice(["a", "b"], 120), "h": rng.choice(["a", "b"], 120)
+        })
+        resultats = analyseStatistiques(df).analyse_univarie({"c": "qualitative", "d": "qualitative"}, ["g"])
+        tableau = genererTableau(resultats, cache=False)
+        modalites_g = tableau.index.modalites_axe("g")
+        entree_d = tableau.index.variable("d")
+
+        # Sans cache, le rendu reconstruit l'entrée de la variable sans toucher aux autres ni aux unions d'axes
+        self.assertEqual(len(self._modalites(tableau)), 2)
+        self.assertIs(tableau.index.variable("d"), entree_d)
+        self.assertIs(tableau.index.modalites_axe("g"), modalites_g)
+
+        # Un axe apparu dans une variable est ajouté, il disparaît avec elle
+        resultats["c"] = analyseStatistiques(df).analyse_univarie({"c": "qualitative"}, ["g", "h"])["c"]
+        tableau.index.invalider("c")
+        self.assertEqual(list(tableau.index.axes.keys()), ["g", "h"])
+        self.assertIs(tableau.index.modalites_axe("g"), modalites_g)
+
+        resultats["c"] = analyseStatistiques(df).analyse_univarie({"c": "qualitative"}, ["g"])["c"]
+        tableau.index.invalider("c")
+        self.assertEqual(list(tableau.index.axes.keys()), ["g"])
+
+
+
+class TestGenerationParallele(unittest.TestCase):
+
+    def test_processus_comme_sequentiel(self):
+        rng = np.random.default_rng(3)
+        df = pd.DataFrame({"x": rng.normal(size=100), "y": rng.normal(size=100), "c": rng.choice(["u", "v"], 100),
+                           "g": rng.choice(["a", "b"], 100), "z": rng.normal(size=100)})
+        variables = {"x": "quantitative", "y": "quantitative", "c": "qualitative"}
+        resultats = analyseStatistiques(df).analyse_univarie(variables, {"g": "qualitative", "z": "quantitative"})
+        tableau = genererTableau(resultats, cache=False)
+
+        # Chaque processus ne reçoit que les variables de son paquet, avec les axes de l'ensemble des résultats
+        partiel = tableau._restreindre(["c"])
+        self.assertEqual(list(partiel.data), ["c"])
+        self.assertTrue(partiel.index.axe_quantitatif("z"))
+
+        for methode in ["tableau_descriptif", "tableau_detail_variables"]:
+            self.assertEqual(
+                getattr(tableau, methode)(None, list(variables), ["g", "z"], format_sortie="raw", n_jobs=2, executeur="process"),
+                getattr(tableau, methode)(None, list(variables), ["g", "z"], format_sortie="raw")
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
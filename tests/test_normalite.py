@@ -0,0 +1,81 @@
+"""Tests des tests de normalité en lot (normalite_lot) comparés à scipy et statsmodels."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.stats import shapiro, normaltest
+from statsmodels.stats.diagnostic import lilliefors
+
+from thesis_analysis import analyseStatistiques
+from thesis_analysis.puissance import _arbre_quantitatif
+from thesis_analysis.test import normalite_lot, testQuantitatif, politique_taille
+
+
+class TestNormalite(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.groupes = dict(
+            [("normal {}".format(n), rng.normal(size=n)) for n in [3, 4, 7, 12, 30, 49, 200]]
+            + [("lognormal {}".format(n), rng.lognormal(size=n)) for n in [5, 20, 80, 600]]
+        )
+
+    def test_shapiro(self):
+        resultats = normalite_lot(self.groupes, methode="shapiro")
+        for cle, valeurs in self.groupes.items():
+            reference = shapiro(valeurs)
+            self.assertEqual(resultats[cle]["methode"], "shapiro")
+            self.assertAlmostEqual(resultats[cle]["statistic"], reference.statistic, places=4)
+            self.assertAlmostEqual(resultats[cle]["p_value"], reference.pvalue, places=3)
+
+    def test_dagostino(self):
+        groupes = dict([(cle, x) for cle, x in self.groupes.items() if x.shape[0] >= 8])
+        resultats = normalite_lot(groupes, methode="dagostino")
+        for cle, valeurs in groupes.items():
+            reference = normaltest(valeurs)
+            self.assertAlmostEqual(resultats[cle]["statistic"], reference.statistic, places=8)
+            self.assertAlmostEqual(resultats[cle]["p_value"], reference.pvalue, places=8)
+
+    def test_lilliefors(self):
+        groupes = dict([(cle, x) for cle, x in self.groupes.items() if x.shape[0] >= 4])
+        resultats = normalite_lot(groupes, methode="lilliefors")
+        for cle, valeurs in groupes.items():
+            statistique, p_value = lilliefors(valeurs, dist="norm", pvalmethod="table")
+            self.assertAlmostEqual(resultats[cle]["statistic"], statistique, places=10)
+            self.assertAlmostEqual(resultats[cle]["p_value"], p_value, places=10)
+
+    def test_groupes_non_testables(self):
+        resultats = normalite_lot({"petit": np.array([1.0, 2.0]), "constant": np.full(10, 3.0)})
+        for resultat in resultats.values():
+            self.assertEqual(resultat["methode"], "no_test")
+            self.assertTrue(np.isnan(resultat["p_value"]))
+
+    def test_groupes_non_testables_non_normaux(self):
+        # Groupes de deux sujets : pas de test de normalité, test non paramétrique
+        groupes = {"a": np.array([1.0, 2.0]), "b": np.array([1.5, 4.0])}
+        nom, _ = testQuantitatif.depuis_groupes(groupes).best_test()
+        self.assertEqual(nom, "Mann-Whitney Wilcoxon")
+
+        # Même règle dans les simulations de puissance
+        noms, _ = _arbre_quantitatif(
+            [x[np.newaxis] for x in groupes.values()], np.array([2, 2]), None, politique_taille()
+        )
+        self.assertEqual(noms[0], nom)
+
+    def test_seulement_groupes_utiles(self):
+        # Deux groupes de plus de 30 sujets : z-test, la normalité n'est testée que pour l'axe à trois modalités
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({"x": rng.normal(size=200), "g": rng.choice(["a", "b"], 200), "h": rng.choice(["a", "b", "c"], 200)})
+        resultat = analyseStatistiques(df).analyse_univarie({"x": "quantitative"}, ["g", "h"])["x"]
+
+        self.assertEqual(resultat["test"]["g"][0], "z_test")
+        self.assertEqual(list(resultat["normalite"]["sous_groupes"].keys()), ["h"])
+        self.assertNotIn("global", resultat["normalite"])
+        self.assertEqual(resultat["normalite"]["sous_groupes"]["h"], normalite_lot(
+            dict([(x, df["x"].values[df["h"].values == x]) for x in resultat["normalite"]["sous_groupes"]["h"]])
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests des simulations de puissance (puissance_quantitative, puissance_qualitative)."""
+
+import unittest
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+from thesis_analysis.puissance import (
+    puissance_quantitative, puissance_qualitative, taille_minimale, _arbre_quantitatif, _arbre_qualitatif
+)
+from thesis_analysis.test import testQuantitatif, testQualitatif, politique_taille
+
+
+class TestArbres(unittest.TestCase):
+
+    def test_arbre_quantitatif_comme_best_test(self):
+        rng = np.random.default_rng(0)
+        politique = politique_taille()
+        for effectifs, lognormale in [((6, 7), False), ((12, 20), True), ((40, 35), False), ((5, 9, 14), True), ((20, 20, 20), False)]:
+            repliques = 25
+            groupes = [
+                rng.lognormal(0, 1, (repliques, n)) + 0.3*g if lognormale else rng.normal(0, 1 + g, (repliques, n))
+                for g, n in enumerate(effectifs)
+            ]
+            noms, p_values = _arbre_quantitatif(groupes, np.array(effectifs), None, politique)
+
+            for r in range(repliques):
+                nom, resultat = testQuantitatif.depuis_groupes(dict([(g, x[r]) for g, x in enumerate(groupes)])).best_test()
+                self.assertEqual(noms[r], nom)
+                self.assertAlmostEqual(p_values[r], resultat["p_value"], delta=1e-6*max(resultat["p_value"], 1e-300))
+
+    def test_arbre_qualitatif_comme_best_test(self):
+        rng = np.random.default_rng(1)
+        for probabilites, effectifs in [([[.5, .5], [.3, .7]], (10, 12)), ([[.5, .5], [.3, .7]], (60, 60)), ([[.2, .3, .5], [.3, .3, .4]], (40, 40))]:
+            repliques = 25
+            tables = np.stack([rng.multinomial(n, probabilites[g], size=repliques) for g, n in enumerate(effectifs)], axis=1)
+            noms, p_values = _arbre_qualitatif(tables, 2000, np.random.default_rng(0))
+
+            for r in range(repliques):
+                table = tables[r]
+                table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+                nom, resultat = testQualitatif.depuis_contingence(table).best_test(seed=0)
+                self.assertEqual(noms[r], nom)
+                if nom != "fisher_monte_carlo":
+                    self.assertAlmostEqual(p_values[r], resultat["p_value"], places=8)
+
+
+class TestPuissance(unittest.TestCase):
+
+    def test_z_test_comme_la_formule(self):
+        # Groupes de plus de 30 sujets : z-test, puissance théorique Phi(d.sqrt(n/2) - z_0.975)
+        courbe = puissance_quantitative([0, 0.5], [1, 1], [80, 160], n_simulations=4000, seed=1)
+        for taille, resultat in courbe.items():
+            self.assertEqual(resultat["tests"], {"z_test": 1.0})
+            theorique = ndtr(0.5*np.sqrt(taille/4) - ndtri(0.975))
+            self.assertLess(abs(resultat["puissance"] - theorique), 4*resultat["erreur_standard"] + 0.01)
+
+    def test_risque_sous_hypothese_nulle(self):
+        courbe = puissance_qualitative([[.4, .6], [.4, .6]], [200], n_simulations=4000, seed=2)
+        self.assertLess(abs(courbe[200]["puissance"] - 0.05), 0.015)
+
+    def test_reproductible_et_taille_minimale(self):
+        courbe = puissance_quantitative([0, 0.8], [1, 1], [20, 40, 80], n_simulations=500, seed=3)
+        seule = puissance_quantitative([0, 0.8], [1, 1], [40], n_simulations=500, seed=3)
+        self.assertEqual(courbe[40], seule[40])
+
+        self.assertLessEqual(courbe[20]["puissance"], courbe[80]["puissance"])
+        attendue = [t for t in sorted(courbe) if courbe[t]["puissance"] >= 0.8]
+        self.assertEqual(taille_minimale(courbe), attendue[0] if attendue else None)
+        self.assertIsNone(taille_minimale(courbe, 1.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +0,0 @@
-#!/usr/bin/env python
-
-"""Tests for `py_thesis_toolbox` package."""
-
-
-import unittest
-
-from py_thesis_toolbox import py_thesis_toolbox
-
-
-class TestPy_thesis_toolbox(unittest.TestCase):
-    """Tests for `py_thesis_toolbox` package."""
-
-    def setUp(self):
-        """Set up test fixtures, if any."""
-
-    def tearDown(self):
-        """Tear down test fixtures, if any."""
-
-    def test_000_something(self):
-        """Test something."""
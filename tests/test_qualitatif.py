@@ -0,0 +1,87 @@
+"""Tests des tests qualitatifs (testQualitatif)."""
+
+import unittest
+
+import numpy as np
+from scipy.stats import chi2_contingency, fisher_exact, hypergeom
+
+from thesis_analysis.test import fisher_exact_lot
+from thesis_analysis.test.test_qualitatif import testQualitatif, _simuler_tables
+
+
+class TestFisher(unittest.TestCase):
+
+    def test_lot_comme_scipy(self):
+        rng = np.random.default_rng(0)
+        tables = rng.integers(0, 15, size=(300, 2, 2))
+        tables[:20, 0, 0] = 0
+        tables[20:30, 1] = 0
+        odds_ratio, p_value = fisher_exact_lot(tables)
+
+        for i, table in enumerate(tables):
+            reference = fisher_exact(table)
+            self.assertAlmostEqual(p_value[i], reference.pvalue, places=10)
+            if table.sum(axis=0).all() and table.sum(axis=1).all():
+                self.assertTrue(np.isclose(odds_ratio[i], reference.statistic, equal_nan=True))
+
+    def test_best_test(self):
+        contingence = np.array([[0, 5], [4, 1]])
+        nom, resultat = testQualitatif.depuis_contingence(contingence).best_test()
+        self.assertEqual(nom, "fisher")
+        self.assertAlmostEqual(resultat["p_value"], fisher_exact(contingence).pvalue, places=12)
+
+
+    def test_monte_carlo_n_simulations(self):
+        contingence = np.array([[3, 0, 4], [0, 5, 1]])
+        nom, resultat = testQualitatif.depuis_contingence(contingence).best_test(seed=0, n_simulations=500)
+        self.assertEqual(nom, "fisher_monte_carlo")
+        self.assertEqual(resultat["n_simulations"], 500)
+
+
+class TestPatefield(unittest.TestCase):
+
+    def test_marges_conservees(self):
+        lignes, colonnes = np.array([7, 12, 5, 9]), np.array([10, 4, 11, 8])
+        tables = _simuler_tables(lignes, colonnes, 5000, np.random.default_rng(0))
+
+        self.assertTrue((tables >= 0).all())
+        self.assertTrue((tables.sum(axis=2) == lignes).all())
+        self.assertTrue((tables.sum(axis=1) == colonnes).all())
+
+        # Espérance de chaque cellule sous l'indépendance : r_i.c_j/n
+        attendus = np.outer(lignes, colonnes)/lignes.sum()
+        np.testing.assert_allclose(tables.mean(axis=0), attendus, atol=0.1)
+
+    def test_loi_hypergeometrique(self):
+        # Tableau 2x2 : la première cellule suit une loi hypergéométrique
+        lignes, colonnes = np.array([8, 12]), np.array([9, 11])
+        n_simulations = 40000
+        tables = _simuler_tables(lignes, colonnes, n_simulations, np.random.default_rng(1))
+
+        valeurs = np.arange(0, 9)
+        frequences = np.bincount(tables[:, 0, 0], minlength=valeurs.shape[0])/n_simulations
+        theoriques = hypergeom(20, 9, 8).pmf(valeurs)
+        ecarts = np.abs(frequences - theoriques)/np.sqrt(theoriques*(1 - theoriques)/n_simulations + 1e-12)
+        self.assertLess(ecarts.max(), 5)
+
+
+class TestPermutation(unittest.TestCase):
+
+    def test_tableau_une_ligne_ou_colonne(self):
+        for contingence in [np.array([[5, 7, 3]]), np.array([[4], [9]]), np.array([[4, 0], [9, 0]])]:
+            test = testQualitatif.depuis_contingence(contingence)
+            self.assertEqual(test.best_test(method="permutation", seed=0), ("no_test", {"valid": True}))
+
+    def test_proche_du_khi2(self):
+        contingence = np.array([[30, 20, 25], [18, 32, 24]])
+        nom, resultat = testQualitatif.depuis_contingence(contingence).best_test(method="permutation", seed=0)
+        reference = chi2_contingency(contingence, correction=False)
+
+        self.assertEqual(nom, "permutation")
+        self.assertTrue(resultat["valid"])
+        self.assertAlmostEqual(resultat["statistic"], reference[0])
+        self.assertLess(abs(resultat["p_value"] - reference[1]), 0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()
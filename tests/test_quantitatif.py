@@ -0,0 +1,105 @@
+"""Tests des tests quantitatifs (testQuantitatif) et des comparaisons post-hoc comparés à scipy."""
+
+import unittest
+
+import numpy as np
+from scipy.special import ndtr
+from scipy.stats import mannwhitneyu, rankdata, studentized_range, tukey_hsd
+from statsmodels.stats.multitest import multipletests
+
+from thesis_analysis.test import testQuantitatif, post_hoc
+
+
+class TestMannWhitney(unittest.TestCase):
+
+    def _comparer(self, x, y):
+        resultat = testQuantitatif.depuis_groupes({"a": x, "b": y}).mwwilcoxon()
+        reference = mannwhitneyu(x, y, alternative="two-sided", method="auto")
+        self.assertAlmostEqual(resultat["statistic"], reference.statistic, places=10)
+        self.assertAlmostEqual(resultat["p_value"], reference.pvalue, places=10)
+        return resultat
+
+    def test_exact(self):
+        rng = np.random.default_rng(0)
+        for n1, n2 in [(3, 4), (5, 8), (8, 8), (2, 30), (7, 60)]:
+            resultat = self._comparer(rng.normal(size=n1), rng.normal(0.5, 1, n2))
+            self.assertEqual(resultat["methode"], "exact")
+
+    def test_asymptotique(self):
+        rng = np.random.default_rng(1)
+        self._comparer(rng.normal(size=25), rng.normal(0.5, 1, 40))
+
+        # Ex-aequo : approximation normale avec correction, même pour de petits groupes
+        resultat = self._comparer(np.round(rng.normal(size=6)), np.round(rng.normal(1, 1, 7)))
+        self.assertEqual(resultat["methode"], "asymptotique")
+
+
+class TestPostHoc(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.groupes = {
+            "a": rng.normal(0, 1, 15),
+            "b": rng.normal(0.8, 2, 22),
+            "c": rng.normal(1.5, 0.5, 9),
+            "d": np.round(rng.normal(0.2, 1, 30)),
+        }
+        self.valeurs = list(self.groupes.values())
+
+    def test_tukey(self):
+        resultat = post_hoc(self.groupes, "tukey")
+        reference = tukey_hsd(*self.valeurs)
+        intervalle = reference.confidence_interval(0.95)
+
+        modalites = list(self.groupes.keys())
+        for (a, b), comparaison in resultat["comparaisons"].items():
+            i, j = modalites.index(a), modalites.index(b)
+            self.assertAlmostEqual(comparaison["difference"], reference.statistic[i, j], places=10)
+            self.assertAlmostEqual(comparaison["p_value"], reference.pvalue[i, j], places=6)
+            self.assertAlmostEqual(comparaison["ci_95"][0], intervalle.low[i, j], places=6)
+            self.assertAlmostEqual(comparaison["ci_95"][1], intervalle.high[i, j], places=6)
+
+    def test_games_howell(self):
+        resultat = post_hoc(self.groupes, "games_howell")
+        k = len(self.groupes)
+
+        for (a, b), comparaison in resultat["comparaisons"].items():
+            x, y = self.groupes[a], self.groupes[b]
+            vx, vy = x.var(ddof=1)/len(x), y.var(ddof=1)/len(y)
+            ddl = (vx + vy)**2/(vx**2/(len(x) - 1) + vy**2/(len(y) - 1))
+            q = abs(x.mean() - y.mean())/np.sqrt((vx + vy)/2)
+            quantile = studentized_range.ppf(0.95, k, ddl)*np.sqrt((vx + vy)/2)
+
+            self.assertAlmostEqual(comparaison["statistic"], q, places=10)
+            self.assertAlmostEqual(comparaison["p_value"], studentized_range.sf(q, k, ddl), places=8)
+            self.assertAlmostEqual(comparaison["ci_95"][0], x.mean() - y.mean() - quantile, places=6)
+
+    def test_dunn(self):
+        resultat = post_hoc(self.groupes, "dunn", ajustement="holm")
+
+        toutes = np.concatenate(self.valeurs)
+        rangs = rankdata(toutes)
+        N = toutes.shape[0]
+        effectifs = np.unique(toutes, return_counts=True)[1]
+        variance = N*(N + 1)/12 - (effectifs**3 - effectifs).sum()/(12*(N - 1))
+
+        debuts = np.cumsum([0] + [len(x) for x in self.valeurs])
+        rangs_moyens = dict(zip(self.groupes, [rangs[debuts[g]:debuts[g + 1]].mean() for g in range(len(self.valeurs))]))
+
+        p_values = []
+        for (a, b), comparaison in resultat["comparaisons"].items():
+            z = (rangs_moyens[a] - rangs_moyens[b])/np.sqrt(variance*(1/len(self.groupes[a]) + 1/len(self.groupes[b])))
+            self.assertAlmostEqual(comparaison["statistic"], z, places=10)
+            p_values.append(2*ndtr(-abs(z)))
+
+        ajustees = multipletests(p_values, method="holm")[1]
+        np.testing.assert_allclose([x["p_value"] for x in resultat["comparaisons"].values()], ajustees, rtol=1e-10)
+
+    def test_best_test(self):
+        nom, resultat = testQuantitatif.depuis_groupes(self.groupes).best_test(post_hoc=True)
+        self.assertEqual(resultat["post_hoc"]["methode"], "tukey" if nom == "ANOVA_1W" else "dunn")
+        self.assertEqual(len(resultat["post_hoc"]["comparaisons"]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests des régressions multivariées (analyseMultivariee) comparées à statsmodels."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from thesis_analysis import analyseMultivariee
+
+
+class TestRegression(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 300
+        self.df = pd.DataFrame({
+            "age": rng.normal(50, 10, n),
+            "sexe": rng.choice(["F", "H"], n),
+        })
+        lineaire = 1 + 0.05*self.df["age"] + 0.5*(self.df["sexe"] == "H") + rng.normal(size=n)
+        self.df["y"] = lineaire
+        self.df["z"] = lineaire + rng.normal(size=n)
+        self.df.loc[rng.choice(n, 40, replace=False), "z"] = np.nan
+        probabilite = 1/(1 + np.exp(-(-3 + 0.05*self.df["age"])))
+        self.df["b"] = np.where(rng.uniform(size=n) < probabilite, "oui", "non")
+        self.df["c"] = np.where(rng.uniform(size=n) < 0.4, "oui", "non")
+
+        # Variables observées chez trop peu de sujets pour être estimées
+        self.df["rare"] = np.nan
+        self.df.loc[:2, "rare"] = [1.0, 2.0, 0.5]
+        self.df["rare_binaire"] = None
+        self.df.loc[:2, "rare_binaire"] = ["oui", "non", "oui"]
+
+        self.covariables = {"age": "quantitative", "sexe": "qualitative"}
+        self.X = sm.add_constant(pd.DataFrame({
+            "age": self.df["age"], "sexe H": (self.df["sexe"] == "H").astype(float)
+        }))
+
+    def _comparer(self, resultat, reference):
+        for terme, nom in zip(resultat["termes"], reference.params.index):
+            coefficient = resultat["coefficients"][terme]
+            self.assertAlmostEqual(coefficient["estimate"], reference.params[nom], places=6)
+            self.assertAlmostEqual(coefficient["std_error"], reference.bse[nom], places=6)
+            self.assertAlmostEqual(coefficient["p_value"], reference.pvalues[nom], places=6)
+
+    def test_lineaire_qr(self):
+        resultats = analyseMultivariee(self.df).regression(
+            {"y": "quantitative", "z": "quantitative"}, self.covariables
+        )
+        for variable in ["y", "z"]:
+            lignes = self.df[variable].notna()
+            reference = sm.OLS(self.df.loc[lignes, variable], self.X[lignes]).fit()
+            self.assertEqual(resultats[variable]["n"], int(lignes.sum()))
+            self.assertAlmostEqual(resultats[variable]["r2"], reference.rsquared, places=8)
+            self.assertTrue(resultats[variable]["estimable"])
+            self._comparer(resultats[variable], reference)
+
+    def test_logistique_irls(self):
+        resultats = analyseMultivariee(self.df).regression(
+            {"b": "qualitative", "c": "qualitative"}, self.covariables
+        )
+        for variable in ["b", "c"]:
+            reference = sm.Logit((self.df[variable] == "oui").astype(float), self.X).fit(disp=0)
+            self.assertTrue(resultats[variable]["converge"])
+            self.assertEqual(resultats[variable]["evenement"], "oui")
+            self._comparer(resultats[variable], reference)
+
+    def test_modele_non_estimable(self):
+        resultats = analyseMultivariee(self.df).regression(
+            {"y": "quantitative", "rare": "quantitative", "b": "qualitative", "rare_binaire": "qualitative"},
+            self.covariables
+        )
+        for variable in ["rare", "rare_binaire"]:
+            self.assertFalse(resultats[variable]["estimable"])
+            self.assertEqual(resultats[variable]["n"], 3)
+            for coefficient in resultats[variable]["coefficients"].values():
+                self.assertTrue(np.isnan(coefficient["estimate"]))
+                self.assertTrue(np.isnan(coefficient["std_error"]))
+
+        # Les autres variables du lot restent estimées
+        self.assertTrue(resultats["y"]["estimable"])
+        self.assertTrue(resultats["b"]["estimable"])
+        reference = sm.OLS(self.df["y"], self.X).fit()
+        self._comparer(resultats["y"], reference)
+
+    def test_covariables_colineaires(self):
+        df = self.df.copy()
+        df["age2"] = 2*df["age"]
+        resultats = analyseMultivariee(df).regression(
+            {"y": "quantitative", "b": "qualitative"}, {"age": "quantitative", "age2": "quantitative"}
+        )
+        self.assertFalse(resultats["y"]["estimable"])
+        self.assertFalse(resultats["b"]["estimable"])
+
+
+if __name__ == "__main__":
+    unittest.main()
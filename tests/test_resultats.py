@@ -0,0 +1,82 @@
+"""Tests des résultats calculés à la demande (analyse_univarie(lazy = True), resultatsDifferes)."""
+
+import pickle
+import unittest
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from thesis_analysis import analyseStatistiques, genererTableau
+
+
+class TestResultatsDifferes(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 150
+        self.df = pd.DataFrame({
+            "x": rng.normal(size=n),
+            "y": rng.exponential(size=n),
+            "c": rng.choice(["u", "v", "w"], n),
+            "g": rng.choice(["a", "b"], n),
+        })
+        self.variables = {"x": "quantitative", "y": "quantitative", "c": "qualitative"}
+        self.analyses = analyseStatistiques(self.df)
+
+    def test_calcul_a_la_demande(self):
+        resultats = self.analyses.analyse_univarie(self.variables, ["g"], lazy=True)
+
+        self.assertIsInstance(resultats, Mapping)
+        self.assertEqual(list(resultats), list(self.variables))
+        self.assertEqual(len(resultats), 3)
+        self.assertIn("y", resultats)
+        self.assertNotIn("z", resultats)
+        self.assertEqual(resultats.calcules(), [])
+
+        premier = resultats["y"]
+        self.assertEqual(resultats.calcules(), ["y"])
+        self.assertIs(resultats["y"], premier)
+
+        with self.assertRaises(KeyError):
+            resultats["z"]
+
+    def test_identique_a_l_analyse_complete(self):
+        complets = self.analyses.analyse_univarie(self.variables, ["g"])
+        differes = self.analyses.analyse_univarie(self.variables, ["g"], lazy=True, prefetch=True).materialize()
+
+        self.assertEqual(list(differes), list(complets))
+        for variable in ["x", "y"]:
+            self.assertEqual(differes[variable]["global"]["mean"], complets[variable]["global"]["mean"])
+            self.assertEqual(differes[variable]["test"]["g"][0], complets[variable]["test"]["g"][0])
+            self.assertEqual(differes[variable]["test"]["g"][1]["p_value"], complets[variable]["test"]["g"][1]["p_value"])
+        self.assertEqual(differes["c"]["global"]["u"]["n"], complets["c"]["global"]["u"]["n"])
+
+    def test_axe_quantitatif_sans_calcul(self):
+        variables = dict([("v{}".format(i), "quantitative") for i in range(20)])
+        for i in range(20):
+            self.df["v{}".format(i)] = np.arange(150) % (i + 3)
+        resultats = analyseStatistiques(self.df).analyse_univarie(variables, {"g": "qualitative", "x": "quantitative"}, lazy=True)
+
+        self.assertEqual(resultats.axes_quantitatifs, ["x"])
+        tableau = genererTableau(resultats).tableau_descriptif(None, ["v3"], ["g", "x"], format_sortie="raw")
+        self.assertEqual(resultats.calcules(), ["v3"])
+        self.assertEqual(tableau[0][8], "x r (IC 95%)")
+
+    def test_tableaux_et_serialisation(self):
+        complets = self.analyses.analyse_univarie(self.variables, ["g"])
+        differes = self.analyses.analyse_univarie(self.variables, ["g"], lazy=True)
+
+        self.assertEqual(
+            genererTableau(differes).tableau_descriptif(None, list(self.variables), ["g"], format_sortie="raw"),
+            genererTableau(complets).tableau_descriptif(None, list(self.variables), ["g"], format_sortie="raw")
+        )
+
+        # Transmis à un autre processus sous forme de dictionnaire complet
+        copie = pickle.loads(pickle.dumps(differes))
+        self.assertIsInstance(copie, dict)
+        self.assertEqual(copie["x"]["global"]["mean"], complets["x"]["global"]["mean"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Tests du stockage binaire des résultats (sauvegarder_resultats, charger_resultats)."""
+
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from thesis_analysis import analyseStatistiques, sauvegarder_resultats, charger_resultats
+
+
+class TestStockage(unittest.TestCase):
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.chemin = os.path.join(self.dossier.name, "resultats.bin")
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def test_aller_retour_valeurs(self):
+        resultats = {
+            "a": {
+                "n": 12,
+                "flottant": 0.1,
+                "nan": np.nan,
+                "booleen": True,
+                "texte": "abc",
+                "aucun": None,
+                "liste": [1, 2.5, "x"],
+                "tuple": (1, 2),
+                "tableau": np.arange(6, dtype=np.int32).reshape(2, 3),
+                "cles": {1: "entier", 1.5: "flottant", ("a", 2): "tuple", False: "booleen"},
+            }
+        }
+        sauvegarder_resultats(resultats, self.chemin)
+        lus = charger_resultats(self.chemin)["a"]
+
+        self.assertEqual(lus["n"], 12)
+        self.assertIsInstance(lus["n"], int)
+        self.assertEqual(lus["flottant"], 0.1)
+        self.assertTrue(np.isnan(lus["nan"]))
+        self.assertIs(lus["booleen"], True)
+        self.assertEqual(lus["texte"], "abc")
+        self.assertIsNone(lus["aucun"])
+        self.assertEqual(lus["liste"], [1, 2.5, "x"])
+        self.assertEqual(lus["tuple"], (1, 2))
+        np.testing.assert_array_equal(lus["tableau"], resultats["a"]["tableau"])
+        self.assertEqual(lus["tableau"].dtype, np.int32)
+        self.assertEqual(lus["cles"], resultats["a"]["cles"])
+
+    def test_grands_entiers_exacts(self):
+        graine = 134582076374031733940942679848279257926
+        resultats = {"a": {
+            "seed": graine,
+            "int64_max": np.iinfo(np.int64).max,
+            "int64_min": int(np.iinfo(np.int64).min),
+            "au_dela_2_53": 2**53 + 1,
+            "negatif": -(2**70),
+            "numpy": np.int64(2**62 + 3),
+        }}
+        sauvegarder_resultats(resultats, self.chemin)
+        lus = charger_resultats(self.chemin)["a"]
+
+        self.assertEqual(lus["seed"], graine)
+        self.assertEqual(lus["int64_max"], np.iinfo(np.int64).max)
+        self.assertEqual(lus["int64_min"], np.iinfo(np.int64).min)
+        self.assertEqual(lus["au_dela_2_53"], 2**53 + 1)
+        self.assertEqual(lus["negatif"], -(2**70))
+        self.assertEqual(lus["numpy"], 2**62 + 3)
+
+    def test_version_non_supportee(self):
+        sauvegarder_resultats({"a": {"n": 1}}, self.chemin)
+        with open(self.chemin, "rb") as fichier:
+            contenu = fichier.read()
+        with open(self.chemin, "wb") as fichier:
+            fichier.write(contenu.replace(b'"version":2', b'"version":1', 1))
+
+        with self.assertRaises(Exception):
+            charger_resultats(self.chemin)
+
+    def test_graine_echantillon_reproductible(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"x": rng.normal(size=500), "g": rng.choice(["a", "b"], 500)})
+        analyses = analyseStatistiques(df)
+        resultats = analyses.analyse_univarie({"x": "quantitative"}, ["g"], sample=0.2)
+
+        sauvegarder_resultats(resultats, self.chemin)
+        graine = charger_resultats(self.chemin)["x"]["echantillon"]["seed"]
+        self.assertEqual(graine, resultats["x"]["echantillon"]["seed"])
+
+        rejoue = analyses.analyse_univarie({"x": "quantitative"}, ["g"], sample=0.2, seed=graine)
+        self.assertEqual(rejoue["x"]["global"]["mean"], resultats["x"]["global"]["mean"])
+
+    def test_analyse_complete(self):
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({
+            "x": rng.normal(size=200),
+            "c": rng.choice(["u", "v", "w"], 200),
+            "g": rng.choice([1, 2], 200),
+        })
+        resultats = analyseStatistiques(df).analyse_univarie({"x": "quantitative", "c": "qualitative"}, ["g"])
+        sauvegarder_resultats(resultats, self.chemin)
+        lus = charger_resultats(self.chemin)
+
+        self.assertEqual(set(lus.keys()), {"x", "c"})
+        self.assertAlmostEqual(lus["x"]["global"]["mean"], resultats["x"]["global"]["mean"])
+        self.assertEqual(lus["x"]["test"]["g"][0], resultats["x"]["test"]["g"][0])
+        np.testing.assert_array_equal(
+            lus["c"]["test"]["g"][1]["observed_values"], resultats["c"]["test"]["g"][1]["observed_values"]
+        )
+        self.assertEqual(lus["c"]["global"]["u"]["n"], resultats["c"]["global"]["u"]["n"])
+
+        # Transmis à un processus : seul le chemin est sérialisé
+        copie = pickle.loads(pickle.dumps(lus))
+        self.assertAlmostEqual(copie["x"]["global"]["mean"], resultats["x"]["global"]["mean"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+"""Tests for `thesis_analysis` package."""
+
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import thesis_analysis
+from thesis_analysis import analyseStatistiques, genererTableau
+
+
+class TestThesis_analysis(unittest.TestCase):
+    """Tests for `thesis_analysis` package."""
+
+    def test_interface_publique(self):
+        for nom in [
+            "analyseStatistiques", "genererTableau", "analyseMultivariee", "sauvegarder_resultats",
+            "charger_resultats", "puissance_quantitative", "puissance_qualitative", "taille_minimale"
+        ]:
+            self.assertTrue(hasattr(thesis_analysis, nom), nom)
+
+    def test_analyse_et_tableau(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            "x": rng.normal(size=100),
+            "c": rng.choice(["u", "v"], 100),
+            "g": rng.choice(["a", "b"], 100),
+        })
+        resultats = analyseStatistiques(df).analyse_univarie({"x": "quantitative", "c": "qualitative"}, ["g"])
+        self.assertEqual(resultats["x"]["global"]["n"], 100)
+        self.assertAlmostEqual(resultats["x"]["global"]["mean"], df["x"].mean())
+
+        tableau = genererTableau(resultats).tableau_descriptif(None, ["x", "c"], ["g"], format_sortie="raw")
+        self.assertEqual(tableau[0][-3:], ["Test", "Paramètre", "p"])
+        self.assertEqual(len(tableau), 1 + 1 + 1 + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
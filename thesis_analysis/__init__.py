@@ -1,2 +1,5 @@
 from .analyseStatistiques import analyseStatistiques
 from .genererTableau import genererTableau
+from .analyseMultivariee import analyseMultivariee
+from .stockageResultats import sauvegarder_resultats, charger_resultats
+from .puissance import puissance_quantitative, puissance_qualitative, taille_minimale
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+    Générateurs aléatoires reproductibles
+    Un générateur est dérivé d'une graine commune et d'une clé (groupe, taille, tirage) :
+    les tirages ne dépendent ni de l'ordre de calcul ni du nombre de workers.
+"""
+
+import hashlib
+import numpy as np
+
+def generateur (seed, cle):
+
+    """
+        Générateur propre à une clé, dérivé de la graine
+        Input :
+            seed : graine commune (entier)
+            cle : clé du calcul, tout objet dont la représentation (repr) est stable
+        Output : numpy.random.Generator
+    """
+
+    empreinte = hashlib.blake2b(repr(cle).encode("utf-8"), digest_size = 8).digest()
+
+    return np.random.default_rng(np.random.SeedSequence(
+        seed,
+        spawn_key = (int.from_bytes(empreinte, "little"),)
+    ))
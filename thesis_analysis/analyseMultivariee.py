@@ -0,0 +1,330 @@
+import warnings
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve_triangular
+from scipy.special import expit
+from scipy.stats import norm, t as loi_t
+from .correlations import _profils
+
+class analyseMultivariee ():
+    """
+        Modèles multivariés : plusieurs variables d'intérêt expliquées par un même ensemble de covariables
+            Variable quantitative : régression linéaire, la matrice des covariables est factorisée (QR) une fois
+                par profil de valeurs manquantes pour toutes les variables
+            Variable qualitative binaire : régression logistique, ajustée pour toutes les variables à la fois (IRLS vectorisé)
+
+        Input :
+            df : dataset
+    """
+
+    def __init__ (self, df):
+
+        self.df = df
+
+    def _matrice_covariables (self, covariables):
+
+        """
+            Construit la matrice des covariables
+            Les covariables qualitatives sont codées en indicatrices, la première modalité (ordre trié) est la référence
+            Input : covariables : dictionnaire covariable -> type (qualitative ou quantitative)
+            Output : matrice (n, k) avec constante, NaN pour les lignes incomplètes, noms des termes, références
+        """
+
+        colonnes = [np.ones(self.df.shape[0])]
+        termes = ["intercept"]
+        references = {}
+
+        for covariable, type_covariable in covariables.items():
+
+            if type_covariable == "quantitative":
+                colonnes.append(self.df[covariable].to_numpy(dtype = np.float64))
+                termes.append(covariable)
+            elif type_covariable == "qualitative":
+                codes, modalites = pd.factorize(self.df[covariable], sort = False, use_na_sentinel = True)
+                ordre = _ordre_modalites(modalites.tolist())
+                references[covariable] = ordre[0]
+
+                for modalite in ordre[1:]:
+                    indicatrice = (codes == modalites.get_loc(modalite)).astype(np.float64)
+                    indicatrice[codes < 0] = np.nan
+                    colonnes.append(indicatrice)
+                    termes.append("{} {}".format(covariable, _texte_modalite(modalite)))
+            else:
+                raise Exception("Type de covariable inconnu : {}".format(type_covariable))
+
+        return np.column_stack(colonnes), termes, references
+
+    def regression (self, variables, covariables, taille_bloc = 256):
+
+        """
+            Ajuste un modèle multivarié pour chaque variable d'intérêt
+            Les lignes dont une covariable ou la variable d'intérêt est manquante sont exclues du modèle de cette variable
+            Input :
+                variables : dictionnaire variable -> type
+                    quantitative : régression linéaire
+                    qualitative : régression logistique, la variable doit être binaire, l'évènement est la seconde modalité (ordre trié)
+                covariables : dictionnaire covariable -> type (qualitative ou quantitative)
+                taille_bloc : nombre de variables traitées à la fois
+            Output : dictionnaire variable -> résultat du modèle
+                type, modele, n, termes, references, coefficients : terme -> estimate, std_error, ci_95, statistic, p_value
+                (odds_ratio et or_ci_95 pour la régression logistique), r2 ou converge,
+                estimable : False si trop peu de sujets ou des covariables colinéaires (coefficients NaN)
+        """
+
+        X, termes, references = self._matrice_covariables(covariables)
+        lignes = ~np.isnan(X).any(axis = 1)
+        X = X[lignes]
+
+        lineaires = [x for x, type_variable in variables.items() if type_variable == "quantitative"]
+        logistiques = [x for x, type_variable in variables.items() if type_variable == "qualitative"]
+
+        resultats = {}
+
+        for debut in range(0, len(lineaires), taille_bloc):
+            bloc = lineaires[debut:debut+taille_bloc]
+            Y = np.column_stack([self.df[x].to_numpy(dtype = np.float64)[lignes] for x in bloc])
+            resultats.update(zip(bloc, _regression_lineaire(X, Y, termes)))
+
+        for debut in range(0, len(logistiques), taille_bloc):
+            bloc = logistiques[debut:debut+taille_bloc]
+            Y, evenements = self._encoder_binaires(bloc, lignes)
+            resultats.update(zip(bloc, _regression_logistique(X, Y, termes, evenements)))
+
+        # Sortie dans l'ordre des variables
+        resultats = dict([(x, resultats[x]) for x in variables.keys() if x in resultats])
+        for resultat in resultats.values():
+            resultat["references"] = references
+
+        return resultats
+
+    def _encoder_binaires (self, variables, lignes):
+
+        """
+            Code des variables qualitatives binaires en 0/1, NaN pour les valeurs manquantes
+            Output : matrice (n, nombre de variables), modalité codée 1 de chaque variable
+        """
+
+        colonnes = []
+        evenements = []
+
+        for variable in variables:
+            codes, modalites = pd.factorize(self.df[variable], sort = False, use_na_sentinel = True)
+            if len(modalites) != 2:
+                raise Exception("La variable {} doit être binaire pour une régression logistique.".format(variable))
+
+            evenement = _ordre_modalites(modalites.tolist())[1]
+            colonne = (codes == modalites.get_loc(evenement)).astype(np.float64)
+            colonne[codes < 0] = np.nan
+
+            colonnes.append(colonne[lignes])
+            evenements.append(evenement)
+
+        return np.column_stack(colonnes), evenements
+
+def _ordre_modalites (modalites):
+
+    """
+        Modalités triées, dans l'ordre d'apparition si non comparables
+    """
+
+    try:
+        return sorted(modalites)
+    except TypeError:
+        return list(modalites)
+
+def _texte_modalite (modalite):
+
+    """
+        Texte d'une modalité dans le nom d'un terme, les flottants entiers sont affichés en int
+    """
+
+    if isinstance(modalite, (float, np.floating)) and float(modalite).is_integer():
+        return str(int(modalite))
+
+    return str(modalite)
+
+def _coefficients (termes, estimate, std_error, quantile, p_value, statistic):
+
+    return dict(zip(
+        termes,
+        [
+            {
+                "estimate":estimate[i],
+                "std_error":std_error[i],
+                "ci_95":[estimate[i]-quantile*std_error[i], estimate[i]+quantile*std_error[i]],
+                "statistic":statistic[i],
+                "p_value":p_value[i]
+            } for i in range(len(termes))
+        ]
+    ))
+
+def _non_estimable (termes, n, type_variable, modele, **informations):
+
+    """
+        Résultat d'un modèle non estimable : coefficients et erreurs types NaN
+    """
+
+    vide = np.full(len(termes), np.nan)
+    coefficients = _coefficients(termes, vide, vide, np.nan, vide, vide)
+    if modele == "logistique":
+        for coefficient in coefficients.values():
+            coefficient["odds_ratio"] = np.nan
+            coefficient["or_ci_95"] = [np.nan, np.nan]
+
+    resultat = {
+        "type":type_variable,
+        "modele":modele,
+        "n":int(n),
+        "termes":list(termes),
+        "coefficients":coefficients
+    }
+    resultat.update(informations)
+    resultat["estimable"] = False
+
+    return resultat
+
+def _regression_lineaire (X, Y, termes):
+
+    """
+        Régressions linéaires de chaque colonne de Y sur X
+        Une factorisation QR par profil de valeurs manquantes de Y, partagée par les variables du profil
+        Un profil avec n <= k sujets ou une matrice de rang incomplet donne des modèles non estimables (NaN)
+        Output : liste de résultats, un par colonne de Y
+    """
+
+    resultats = [None]*Y.shape[1]
+    k = X.shape[1]
+
+    for lignes, colonnes in _profils(Y):
+
+        X_profil = X[lignes]
+        Y_profil = Y[np.ix_(lignes, colonnes)]
+        n = X_profil.shape[0]
+
+        # Profil non estimable (trop peu de sujets ou covariables colinéaires) : les autres profils sont conservés
+        if n <= k or np.linalg.matrix_rank(X_profil) < k:
+            for colonne in colonnes:
+                resultats[colonne] = _non_estimable(termes, n, "quantitative", "lineaire", r2 = np.nan)
+            continue
+
+        Q, R = np.linalg.qr(X_profil)
+
+        B = solve_triangular(R, Q.T @ Y_profil)
+        residus = Y_profil - X_profil @ B
+        ddl = n - k
+
+        # Variance des coefficients : sigma² . diag((R'R)^-1)
+        somme_carres = (residus*residus).sum(axis = 0)
+        R_inverse = solve_triangular(R, np.eye(k))
+        std_error = np.sqrt(np.outer((R_inverse*R_inverse).sum(axis = 1), somme_carres/ddl))
+
+        statistic = B/std_error
+        p_value = 2*loi_t.sf(np.abs(statistic), ddl)
+        quantile = loi_t.ppf(0.975, ddl)
+
+        ecarts = Y_profil - Y_profil.mean(axis = 0)
+        r2 = 1 - somme_carres/(ecarts*ecarts).sum(axis = 0)
+
+        for j, colonne in enumerate(colonnes):
+            resultats[colonne] = {
+                "type":"quantitative",
+                "modele":"lineaire",
+                "n":int(n),
+                "termes":list(termes),
+                "coefficients":_coefficients(termes, B[:, j], std_error[:, j], quantile, p_value[:, j], statistic[:, j]),
+                "r2":r2[j],
+                "estimable":True
+            }
+
+    return resultats
+
+def _regression_logistique (X, Y, termes, evenements, iterations = 50, tolerance = 1e-8):
+
+    """
+        Régressions logistiques de chaque colonne de Y (0/1, NaN si manquant) sur X
+        Les modèles sont ajustés ensemble par IRLS : les lignes manquantes ont un poids nul
+        Output : liste de résultats, un par colonne de Y
+    """
+
+    masque = ~np.isnan(Y)
+    Y0 = np.where(masque, Y, 0)
+    masque = masque.astype(np.float64)
+
+    n, k = X.shape
+    m = Y.shape[1]
+    B = np.zeros((k, m))
+
+    # Modèles non estimables (trop peu de sujets ou covariables colinéaires sur les lignes observées) :
+    # exclus de l'ajustement, leur information est remplacée par l'identité pour ne pas bloquer la résolution
+    effectifs = masque.sum(axis = 0)
+    estimable = effectifs > k
+    if estimable.any():
+        estimable[estimable] = np.linalg.matrix_rank(np.einsum("ni,nm,nj->mij", X, masque[:, estimable], X)) == k
+    identite = np.eye(k)
+    converge = ~estimable
+
+    with np.errstate(over = "ignore"):
+        for iteration in range(iterations):
+
+            mu = expit(X @ B)
+            W = mu*(1-mu)*masque
+
+            # Information de Fisher et score de chaque modèle
+            information = np.einsum("ni,nm,nj->mij", X, W, X)
+            information[~estimable] = identite
+            score = X.T @ ((Y0 - mu)*masque)
+
+            try:
+                pas = np.linalg.solve(information, score.T[:, :, np.newaxis])[:, :, 0]
+            except np.linalg.LinAlgError:
+                pas = np.einsum("mij,jm->mi", np.linalg.pinv(information), score)
+
+            # Les modèles ayant convergé ne sont plus mis à jour
+            pas[converge] = 0
+            B += pas.T
+            converge |= np.abs(pas).max(axis = 1) < tolerance
+
+            if converge.all():
+                break
+
+        mu = expit(X @ B)
+        W = mu*(1-mu)*masque
+        information = np.einsum("ni,nm,nj->mij", X, W, X)
+        information[~estimable] = identite
+
+    with warnings.catch_warnings(), np.errstate(invalid = "ignore", over = "ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        std_error = np.sqrt(np.diagonal(np.linalg.pinv(information), axis1 = 1, axis2 = 2)).T
+        statistic = B/std_error
+        p_value = 2*norm.sf(np.abs(statistic))
+        quantile = norm.ppf(0.975)
+
+    resultats = []
+    for j in range(m):
+
+        if not estimable[j]:
+            resultats.append(_non_estimable(
+                termes, effectifs[j], "qualitative", "logistique", evenement = evenements[j], converge = False
+            ))
+            continue
+
+        coefficients = _coefficients(termes, B[:, j], std_error[:, j], quantile, p_value[:, j], statistic[:, j])
+
+        with np.errstate(over = "ignore"):
+            for coefficient in coefficients.values():
+                coefficient["odds_ratio"] = np.exp(coefficient["estimate"])
+                coefficient["or_ci_95"] = [np.exp(x) for x in coefficient["ci_95"]]
+
+        resultats.append({
+            "type":"qualitative",
+            "modele":"logistique",
+            "n":int(masque[:, j].sum()),
+            "termes":list(termes),
+            "evenement":evenements[j],
+            "coefficients":coefficients,
+            "converge":bool(converge[j]),
+            "estimable":True
+        })
+
+    return resultats
@@ -1,6 +1,13 @@
 import math
+import warnings
+import numpy as np
+from functools import partial
 import pandas as pd
-from .test import testQualitatif, testQuantitatif
+from .test import testQualitatif, testQuantitatif, normalite_lot, taille_effet_groupes, taille_effet_contingences
+from .resultats import descriptionQuantitative, descriptionQualitative, resultatsDifferes
+from .correlations import correler
+from .bootstrap import bootstrap_ic
+from .aleatoire import generateur as generateur_aleatoire
 
 class analyseStatistiques ():
     """
@@ -9,163 +16,876 @@ class analyseStatistiques ():
             Description des données
             Application des tests
 
-        Input : dataset
+        Input :
+            df : dataset
+            compact : si True, une copie compacte du dataset est conservée
+                float32 pour les flottants représentables exactement, plus petit type entier pour les entiers,
+                type category pour les chaînes de caractères peu variées
+                Le gain de mémoire est disponible dans l'attribut rapport_compact
     """
     
-    def __init__ (self, df):
+    def __init__ (self, df, compact = False):
         # Chargement du dataframe
+        self.rapport_compact = None
+        if compact:
+            df, self.rapport_compact = _compacter(df)
+            
         self.df = df
         
-    def _describe_qualitative (self, data):
+        # Codes entiers des variables qualitatives et des axes : chaque colonne n'est encodée qu'une fois
+        self._codes = {}
+        
+        # Echantillon analysé (analyse_univarie avec sample), None pour le jeu de données complet
+        self._echantillon = None
+        
+    def _encoder (self, colonne, lignes = None):
+        
+        """
+            Encode une colonne qualitative en codes entiers (int8, int16 ou int32), -1 pour les valeurs manquantes
+            Les modalités ne sont décodées qu'à la construction des résultats
+            Input :
+                colonne : nom de la colonne, ou tuple de colonnes pour un axe composé
+                lignes : positions des lignes à retourner (strate), toutes si None
+            Output : codes, liste des modalités (position = code), tuples de modalités pour un axe composé
+        """
+        
+        if colonne not in self._codes:
+            if isinstance(colonne, tuple):
+                self._codes[colonne] = self._encoder_compose(colonne)
+            else:
+                codes, modalites = pd.factorize(self.df[colonne], sort = False, use_na_sentinel = True)
+                self._codes[colonne] = (
+                    codes.astype(_type_codes(len(modalites))),
+                    modalites.tolist()
+                )
+        
+        codes, modalites = self._codes[colonne]
+        if lignes is not None:
+            codes = codes[lignes]
+            
+        return codes, modalites
+    
+    def _encoder_compose (self, colonnes):
+        
+        """
+            Encode un axe composé (interaction de plusieurs colonnes qualitatives)
+            Les codes des colonnes sont combinés en un code unique, sans créer de colonne concaténée,
+            seules les combinaisons observées sont conservées
+            Input : colonnes : tuple de colonnes
+            Output : codes, liste des modalités (tuples)
+        """
+        
+        encodages = [self._encoder(x) for x in colonnes]
+        
+        # Code combiné : numération en base variable, -1 si une des colonnes est manquante
+        combine = np.zeros(self.df.shape[0], dtype = np.int64)
+        valide = np.ones(self.df.shape[0], dtype = bool)
+        for codes, modalites in encodages:
+            combine = combine*len(modalites) + codes
+            valide &= codes >= 0
+        
+        # Combinaisons observées
+        combinaisons_observees, codes_valides = np.unique(combine[valide], return_inverse = True)
+        codes = np.full(self.df.shape[0], -1, dtype = _type_codes(len(combinaisons_observees)))
+        codes[valide] = codes_valides
+        
+        # Décodage des combinaisons en tuples de modalités
+        positions = []
+        combinaisons = combinaisons_observees
+        for codes_colonne, modalites in reversed(encodages):
+            positions.insert(0, combinaisons % len(modalites))
+            combinaisons = combinaisons // len(modalites)
+        modalites = [
+            tuple([encodages[i][1][positions[i][j]] for i in range(len(colonnes))])
+            for j in range(len(combinaisons_observees))
+        ]
+        
+        return codes, modalites
+    
+    def _valeurs (self, colonne, lignes = None):
+        
+        """
+            Valeurs d'une colonne quantitative en float64, NaN pour les valeurs manquantes
+            lignes : positions des lignes à retourner (strate), toutes si None
+        """
+        
+        valeurs = self.df[colonne].to_numpy(dtype = np.float64)
+        if lignes is not None:
+            valeurs = valeurs[lignes]
+        
+        return valeurs
+    
+    def _strates (self, strata):
+        
+        """
+            Regroupe les lignes du jeu de données par strate
+            Input : strata : colonne (ou tuple de colonnes) définissant les strates
+            Output : dictionnaire strate -> positions des lignes, strates par ordre d'apparition, valeurs manquantes exclues
+        """
+        
+        codes, modalites = self._encoder(strata)
+        lignes_valides = np.flatnonzero(codes >= 0)
+        
+        strates = {}
+        for code, positions in self._grouper(codes[lignes_valides]):
+            strates[modalites[code]] = lignes_valides[positions]
+        
+        return strates
+        
+    def _describe_qualitative (self, codes, modalites):
         
         """
             Calculate n and p of each modalitie of the qualitative value
-            Input : data, Pandas Series containing data to describe
+            Modalities are sorted by decreasing n, then by first appearance
+            Input :
+                codes : integer codes of the non missing values
+                modalites : labels of the codes
         """
-                
-        table = data.value_counts()
-        description = pd.DataFrame({'n':table, 'p':table/table.sum()}) \
-            .to_dict("index")
-        description["total"] = table.sum()
+        
+        codes_presents, premier, effectifs = np.unique(codes, return_index = True, return_counts = True)
+        ordre = np.lexsort((premier, -effectifs))
+        
+        description = descriptionQualitative(
+            [modalites[x] for x in codes_presents[ordre]],
+            effectifs[ordre]
+        )
         
         return(description)
     
-    def _get_sub_table(self, variable, axes):
+    def _grouper (self, codes_axe):
         
-        # On sélectionne les données à analyse
-        if (axes is None):
-            temp_data = self.df[[variable]]
+        """
+            Regroupe des lignes selon les codes d'un axe
+            Input : codes_axe : codes de l'axe des lignes valides
+            Output : liste de (code, positions des lignes du groupe), groupes par ordre d'apparition
+        """
+        
+        # Tri stable : les lignes de chaque groupe restent dans l'ordre d'origine
+        ordre = np.argsort(codes_axe, kind = "stable")
+        codes_presents, premier, effectifs = np.unique(codes_axe, return_index = True, return_counts = True)
+        positions = np.split(ordre, np.cumsum(effectifs)[:-1])
+        
+        groupes = [(codes_presents[i], positions[i]) for i in np.argsort(premier)]
+        
+        return groupes
+        
+    def _echantillonner (self, sample, sample_strata = None, seed = None):
+        
+        """
+            Tire les lignes d'un échantillon aléatoire simple, ou stratifié (allocation proportionnelle)
+            Input :
+                sample : fraction des lignes (0 < sample <= 1) ou nombre de lignes (entier)
+                sample_strata : colonne (ou tuple de colonnes) de stratification, None pour un échantillon simple
+                    Chaque strate (valeurs manquantes comprises) fournit au moins une ligne
+                seed : graine du tirage
+            Output : positions triées des lignes tirées
+        """
+        
+        n_total = self.df.shape[0]
+        
+        if isinstance(sample, (int, np.integer)) and not isinstance(sample, bool) and sample >= 1:
+            if sample > n_total:
+                raise Exception("L'échantillon demandé ({} lignes) dépasse le jeu de données ({} lignes)".format(sample, n_total))
+            fraction = sample/n_total
+        elif isinstance(sample, (float, np.floating)) and 0 < sample <= 1:
+            fraction = float(sample)
+        else:
+            raise Exception("sample doit être une fraction (0 < sample <= 1) ou un nombre de lignes")
+        
+        generateur = generateur_aleatoire(seed, ("echantillon", sample_strata))
+        
+        if sample_strata is None:
+            lignes = generateur.choice(n_total, int(round(fraction*n_total)), replace = False)
+        else:
+            # Tirage dans chaque strate, les lignes sans strate forment une strate
+            codes, modalites = self._encoder(sample_strata)
+            lignes = []
+            for code, positions in self._grouper(codes):
+                taille = max(1, int(round(fraction*len(positions))))
+                lignes.append(positions[generateur.choice(len(positions), taille, replace = False)])
+            lignes = np.concatenate(lignes)
+        
+        lignes.sort()
+        
+        return lignes
+    
+    def _decrire_echantillon (self, analyse):
+        
+        """
+            Erreurs standards et modalités insuffisamment représentées d'une analyse menée sur un échantillon
+            Les erreurs standards (moyennes, proportions) sont corrigées de la fraction de population tirée
+            Input : analyse : résultats d'une variable
+            Output : dictionnaire
+                fraction, n_lignes, n_total, sample_strata, seed, seuil : paramètres de l'échantillon
+                erreur_standard : global, sous_groupes -> axe -> modalité
+                    variable quantitative : erreur standard de la moyenne
+                    variable qualitative : modalité de la variable -> erreur standard de la proportion
+                modalites_insuffisantes : global (modalités de la variable qualitative),
+                    sous_groupes -> axe -> modalités de l'axe, dont l'effectif échantillonné est inférieur au seuil
+        """
+        
+        echantillon = dict(self._echantillon)
+        correction = math.sqrt(1 - echantillon["fraction"])
+        seuil = echantillon["seuil"]
+        
+        if analyse["type"] == "quantitative":
+            erreur = lambda description: float(description["std_mean"]*correction)
+            insuffisantes = lambda description: []
         else:
-            temp_data = self.df[[variable]+axes]
+            erreur = lambda description: dict([
+                (modalite, float(math.sqrt(description[modalite]["p"]*(1 - description[modalite]["p"])/description["total"])*correction))
+                for modalite in description if modalite != "total"
+            ])
+            insuffisantes = lambda description: [
+                modalite for modalite in description if modalite != "total" and description[modalite]["n"] < seuil
+            ]
+        
+        echantillon["erreur_standard"] = {"global":erreur(analyse["global"])}
+        echantillon["modalites_insuffisantes"] = {"global":insuffisantes(analyse["global"])}
         
-        temp_data = temp_data.dropna()
+        if "sous_groupes" in analyse:
+            
+            echantillon["erreur_standard"]["sous_groupes"] = {}
+            echantillon["modalites_insuffisantes"]["sous_groupes"] = {}
+            
+            for axe, sous_groupes in analyse["sous_groupes"].items():
+                
+                echantillon["erreur_standard"]["sous_groupes"][axe] = dict([
+                    (modalite, erreur(description)) for modalite, description in sous_groupes.items()
+                ])
+                
+                # Effectif du sous-groupe : n (quantitatif) ou total (qualitatif)
+                effectif = "n" if analyse["type"] == "quantitative" else "total"
+                echantillon["modalites_insuffisantes"]["sous_groupes"][axe] = [
+                    modalite for modalite, description in sous_groupes.items() if description[effectif] < seuil
+                ]
         
-        return(temp_data)
+        return echantillon
         
+    def _analyse_univarie_qualitative (self, variable, axes = None, lignes = None, options_test = None):
         
-    def _analyse_univarie_qualitative (self, variable, axes = None):
+        codes_variable, modalites_variable = self._encoder(variable, lignes)
+        valide_variable = codes_variable >= 0
         
-        temp_data = self._get_sub_table(variable, [])
+        # Les comparaisons post-hoc ne concernent que les variables quantitatives
+        options_qualitatif = dict([(x, y) for x, y in (options_test or {}).items() if x != "post_hoc"])
         
         # On charge un dictionnaire vide
         analyse = {}
         
-        analyse["n"] = temp_data.shape[0]
+        analyse["n"] = int(valide_variable.sum())
 
         ## Globale : en dehors de l'axe d'analyse
-        analyse["global"] = self._describe_qualitative(temp_data[variable])
+        analyse["global"] = self._describe_qualitative(codes_variable[valide_variable], modalites_variable)
 
         ## Spécifique : Dans les axes d'analyse
         if (axes is not None):
                 
             analyse["sous_groupes"] = {}
             analyse["test"] = {}
+            contingences = {}
             
             for axe in axes:  
                 
-                temp_data = self._get_sub_table(variable, [axe])
+                codes_axe, modalites_axe = self._encoder(axe, lignes)
+                valide = valide_variable & (codes_axe >= 0)
                 
-                # Axe values
-                axe_values = temp_data[axe] \
-                    .drop_duplicates().values.tolist()
+                codes_v = codes_variable[valide]
+                codes_a = codes_axe[valide]
                 
-                # Description
+                # Description : une ligne par modalité de l'axe, dans l'ordre d'apparition
                 analyse["sous_groupes"][axe] = {}
-                for values in axe_values:
-                    analyse["sous_groupes"][axe][values] = self._describe_qualitative(
-                        temp_data[
-                            temp_data[axe] == values
-                        ] \
-                        .reset_index(drop = True)[variable]
+                for code, positions in self._grouper(codes_a):
+                    analyse["sous_groupes"][axe][modalites_axe[code]] = self._describe_qualitative(
+                        codes_v[positions], modalites_variable
                     )
 
-                # Test statistique
-                analyse["test"][axe] = testQualitatif(temp_data, variable,axe).best_test()
+                # Test statistique : tableau de contingence à partir des codes
+                contingences[axe] = _contingence(codes_a, modalites_axe, codes_v, modalites_variable)
+                analyse["test"][axe] = testQualitatif.depuis_contingence(contingences[axe]).best_test(**options_qualitatif)
+            
+            # Tailles d'effet de tous les axes en un lot, à partir des tableaux de contingence
+            _ajouter_tailles_effet(analyse["test"], taille_effet_contingences(list(contingences.values())))
 
         analyse["type"] = "qualitative"
+        
+        if self._echantillon is not None:
+            analyse["echantillon"] = self._decrire_echantillon(analyse)
 
         return analyse
     
     def _describe_quantitative (self, data):
         """
             Calculate mean, median, Q25, 50, 27, std, std_mean and CI for quantitative data
-            Input : data, Pandas Series containing data to describe
+            Input : data, array or Pandas Series containing data to describe, without missing values
         """
         
-        # Dict containing data
-        description = {}
+        data = np.array(data, dtype = np.float64)
+        data.sort()
         
-        description["n"] = data.shape[0]
-        description["mean"] = data.mean()
-        description["median"] = data.median()
-        description["Q25"] = data.quantile(0.25)
-        description["Q75"] = data.quantile(0.75)
-        description["std"] = data.std()
-        description["std_mean"] = description["std"]/math.sqrt(description["n"])
-        description["ci_95"] = [description["mean"]-1.96*description["std_mean"], 
-                                description["mean"]+1.96*description["std_mean"]]        
+        description = _decrire_colonnes(data[:, np.newaxis])[0]
         
         return description
     
-    def _analyse_univarie_quantitative (self, variable, axes = None):
+    def _describe_quantitative_lot (self, variables, taille_bloc = 256, strates = None):
+        """
+            Calculate the global description of several quantitative variables at once
+            Each block of columns is loaded as a 2D float array, NaN are ignored column-wise
+            Input :
+                variables : list of quantitative variables
+                taille_bloc : number of columns processed at once, bounds memory usage
+                strates : dict stratum -> row positions, the block is then loaded once and described per stratum
+            Output : dict variable -> description, or dict stratum -> (dict variable -> description)
+        """
+        
+        if strates is None:
+            descriptions = {}
+        else:
+            descriptions = dict(zip(strates.keys(), [{} for x in strates]))
+        
+        for debut in range(0, len(variables), taille_bloc):
+            
+            bloc = variables[debut:debut+taille_bloc]
+            X = self.df[bloc].to_numpy(dtype = np.float64, copy = True)
+            
+            if strates is None:
+                # Tri par colonne (les NaN sont placés en fin) pour le calcul des quantiles
+                X.sort(axis = 0)
+                descriptions.update(zip(bloc, _decrire_colonnes(X)))
+            else:
+                # Chaque strate est triée séparément
+                for strate, lignes in strates.items():
+                    X_strate = X[lignes]
+                    X_strate.sort(axis = 0)
+                    descriptions[strate].update(zip(bloc, _decrire_colonnes(X_strate)))
+        
+        return descriptions
+    
+    def _analyse_univarie_quantitative (self, variable, axes = None, description_globale = None, lignes = None, correlations = None, bootstrap = None, options_test = None):
         
         # On sélectionne les données à analyse
-        temp_data = self._get_sub_table(variable, [])
+        valeurs = self._valeurs(variable, lignes)
+        valide_variable = ~np.isnan(valeurs)
+        
+        # Le test de Fisher par Monte Carlo ne concerne que les variables qualitatives
+        options_quantitatif = dict([(x, y) for x, y in (options_test or {}).items() if x != "n_simulations"])
         
         # On charge un dictionnaire vide
         analyse = {}
         
-        analyse["n"] = temp_data.shape[0]
+        analyse["n"] = int(valide_variable.sum())
 
-        ## Globale : en dehors de l'axe d'analyse
-        analyse["global"] = self._describe_quantitative(temp_data[variable])
+        ## Globale : en dehors de l'axe d'analyse, éventuellement déjà calculée
+        if description_globale is None:
+            description_globale = self._describe_quantitative(valeurs[valide_variable])
+        analyse["global"] = description_globale
+        
+        # Groupes à rééchantillonner et à tester : global puis chaque modalité de chaque axe
+        groupes = {(variable,):valeurs[valide_variable]}
+        valeurs_axes = {}
                 
         ## Spécifique : Dans les axes d'analyse
         if (axes is not None):
                 
             analyse["sous_groupes"] = {}
-            analyse["test"] = {}
 
             for axe in axes:  
                 
-                temp_data = self._get_sub_table(variable, [axe])
+                codes_axe, modalites_axe = self._encoder(axe, lignes)
+                valide = valide_variable & (codes_axe >= 0)
                 
-                # Axe values
-                axe_values = temp_data[axe] \
-                    .drop_duplicates().values.tolist()
+                valeurs_valides = valeurs[valide]
+                
+                # Valeurs de chaque modalité de l'axe, dans l'ordre d'apparition
+                y_values = {}
+                for code, positions in self._grouper(codes_axe[valide]):
+                    y_values[modalites_axe[code]] = valeurs_valides[positions]
+                valeurs_axes[axe] = y_values
                 
                 # Description
                 analyse["sous_groupes"][axe] = {}
-                for values in axe_values:
-                    analyse["sous_groupes"][axe][values] = self._describe_quantitative(
-                        temp_data[
-                            temp_data[axe] == values
-                        ] \
-                        .reset_index(drop = True)[variable]
-                    )
-
+                for modalite, y in y_values.items():
+                    analyse["sous_groupes"][axe][modalite] = self._describe_quantitative(y)
+                    groupes[(variable, axe, modalite)] = y
+        
+        if (axes is not None):
+            
+            analyse["test"] = {}
+            
+            # Normalité en un lot, uniquement pour les groupes des axes dont le test l'utilise, réutilisée par les tests et les rapports
+            tests = dict([(axe, testQuantitatif.depuis_groupes(y_values)) for axe, y_values in valeurs_axes.items()])
+            axes_normalite = [axe for axe, test in tests.items() if test.normalite_requise(method = options_quantitatif.get("method"))]
+            
+            normalite = normalite_lot(dict(
+                [((axe, modalite), y) for axe in axes_normalite for modalite, y in valeurs_axes[axe].items()]
+            ))
+            analyse["normalite"] = {"sous_groupes":{}}
+            
+            for axe in axes_normalite:
+                normalite_axe = dict([(modalite, normalite[(axe, modalite)]) for modalite in valeurs_axes[axe]])
+                analyse["normalite"]["sous_groupes"][axe] = normalite_axe
+                tests[axe] = testQuantitatif.depuis_groupes(valeurs_axes[axe], normalite_axe)
+            
+            for axe, test in tests.items():
+                
                 # Test statistique
-                analyse["test"][axe] = testQuantitatif(temp_data, variable,axe).best_test()
+                analyse["test"][axe] = test.best_test(**options_quantitatif)
+            
+            # Tailles d'effet de tous les axes en un lot, à partir des effectifs, moyennes et écarts types des sous-groupes
+            descriptions = [list(analyse["sous_groupes"][axe].values()) for axe in valeurs_axes]
+            _ajouter_tailles_effet(analyse["test"], taille_effet_groupes(
+                [[x["n"] for x in description] for description in descriptions],
+                [[x["mean"] for x in description] for description in descriptions],
+                [[x["std"] for x in description] for description in descriptions]
+            ))
+        
+        ## Corrélations avec les axes quantitatifs, déjà calculées
+        if correlations is not None:
+            
+            analyse.setdefault("test", {})
+            analyse["correlation"] = {}
+            
+            for axe, correlation in correlations.items():
+                analyse["correlation"][axe] = {
+                    "pearson":correlation["pearson"],
+                    "spearman":correlation["spearman"]
+                }
+                analyse["test"][axe] = correlation["test"]
+        
+        ## Intervalles de confiance par bootstrap de tous les groupes en un appel
+        if bootstrap is not None:
+            
+            intervalles = bootstrap_ic(groupes, **bootstrap)
+            
+            analyse["bootstrap"] = {
+                "methode":bootstrap["methode"],
+                "n_bootstrap":bootstrap["n_bootstrap"],
+                "global":intervalles[(variable,)]
+            }
+            if axes is not None:
+                analyse["bootstrap"]["sous_groupes"] = dict(zip(
+                    axes,
+                    [
+                        dict([(modalite, intervalles[(variable, axe, modalite)]) for modalite in analyse["sous_groupes"][axe]])
+                        for axe in axes
+                    ]
+                ))
 
         analyse["type"] = "quantitative"
+        
+        if self._echantillon is not None:
+            analyse["echantillon"] = self._decrire_echantillon(analyse)
 
         return analyse
         
-    def analyse_univarie (self, variables, axes = None):
+    def _analyse_univarie_variable (self, variable, type_variable, axes = None, lignes = None, axes_quantitatifs = None, correlation = "pearson", bootstrap = None, options_test = None):
+        
+        """
+            Analyse univariée d'une variable selon son type
+            lignes : positions des lignes analysées (strate), toutes si None
+            axes_quantitatifs : axes quantitatifs, corrélés aux variables quantitatives
+            correlation : méthode de corrélation retenue comme test
+            bootstrap : options de bootstrap_ic, None pour ne pas calculer d'intervalle par bootstrap
+            options_test : paramètres de best_test (method, seed, politique, post_hoc)
+        """
+        
+        if type_variable == 'qualitative':
+            return self._analyse_univarie_qualitative(variable, axes, lignes, options_test)
+        elif type_variable == 'quantitative':
+            correlations = None
+            if axes_quantitatifs:
+                correlations = self._correlations([variable], axes_quantitatifs, correlation, lignes)[variable]
+                
+            return self._analyse_univarie_quantitative(
+                variable, axes, lignes = lignes, correlations = correlations, bootstrap = bootstrap, options_test = options_test
+            )
+    
+    def _correlations (self, variables, axes_quantitatifs, methode = "pearson", lignes = None, taille_bloc = 256):
+        
+        """
+            Corrélations de Pearson et de Spearman entre des variables et des axes quantitatifs
+            Calculées pour toutes les paires en une opération matricielle, par bloc de variables
+            Input :
+                variables : liste des variables quantitatives
+                axes_quantitatifs : liste des axes quantitatifs
+                methode : méthode retenue comme test ("pearson" ou "spearman")
+                lignes : positions des lignes analysées (strate), toutes si None
+                taille_bloc : nombre de variables traitées à la fois
+            Output : dictionnaire variable -> axe -> {"pearson", "spearman", "test"}
+        """
+        
+        if methode not in ["pearson", "spearman"]:
+            raise Exception("Méthode de corrélation inconnue : {}".format(methode))
+        
+        Y = np.column_stack([self._valeurs(x, lignes) for x in axes_quantitatifs])
+        
+        correlations = {}
+        
+        for debut in range(0, len(variables), taille_bloc):
+            
+            bloc = variables[debut:debut+taille_bloc]
+            X = np.column_stack([self._valeurs(x, lignes) for x in bloc])
+            
+            resultats = correler(X, Y)
+            
+            for i, variable in enumerate(bloc):
+                correlations[variable] = {}
+                for j, axe in enumerate(axes_quantitatifs):
+                    
+                    correlation = {}
+                    for nom_methode, resultat in resultats.items():
+                        correlation[nom_methode] = {
+                            "r":resultat["r"][i, j],
+                            "n":int(resultat["n"][i, j]),
+                            "ci_95":[resultat["ci_inf"][i, j], resultat["ci_sup"][i, j]],
+                            "p_value":resultat["p_value"][i, j]
+                        }
+                    
+                    # Test : absent si la corrélation ne peut être testée
+                    if np.isnan(correlation[methode]["p_value"]):
+                        correlation["test"] = ("no_test", {"valid":True})
+                    else:
+                        correlation["test"] = (methode, {
+                            "statistic":correlation[methode]["r"],
+                            "p_value":correlation[methode]["p_value"]
+                        })
+                    
+                    correlations[variable][axe] = correlation
+        
+        return correlations
+        
+    def analyse_univarie (self, variables, axes = None, lazy = False, prefetch = False, strata = None, correlation = "pearson",
+                          bootstrap = None, n_bootstrap = 2000, seed = None, n_jobs = 1, methode_test = None, politique_taille = None,
+                          post_hoc = False, sample = None, sample_strata = None, sample_min = 30, n_simulations = 10000):
         """
             Analyse descriptive univariée
                 variable : dictionnaire contenant la liste des variables à analyser de la forme :
                     Key = Nom de la variable, Value : type de variable : quantitative ou qualitative
                 axes : axes d'analyse de la variable, doivent être de type qualitative. Liste de variables.                
+                    Un axe peut être un tuple de variables qualitatives : les sous-groupes sont alors les combinaisons de leurs modalités
+                    Les axes peuvent aussi être un dictionnaire axe -> type d'axe (qualitative ou quantitative) :
+                    les axes quantitatifs sont corrélés (Pearson et Spearman) aux variables quantitatives
+                lazy : si True, renvoie un Mapping dont chaque variable est analysée au premier accès (resultatsDifferes)
+                prefetch : avec lazy, analyse les variables en arrière plan
+                strata : variable qualitative (ou tuple de variables) définissant des strates analysées séparément
+                    Les résultats sont alors un dictionnaire strate -> résultats de la strate
+                    Les lignes sans strate sont exclues
+                correlation : corrélation retenue comme test des axes quantitatifs, "pearson" ou "spearman"
+                bootstrap : "percentile" ou "bca" pour ajouter aux variables quantitatives un intervalle de confiance
+                    à 95% par bootstrap de la moyenne et de la médiane, global et par sous-groupe
+                n_bootstrap : nombre de rééchantillonnages
+                seed : graine du bootstrap et des tests simulés, les résultats sont reproductibles pour une même graine
+                n_jobs : nombre de threads du bootstrap
+                methode_test : "permutation" pour remplacer les tests paramétriques et asymptotiques par des tests de permutation
+                    (statistique F pour les variables quantitatives, Khi-2 pour les variables qualitatives), graine seed
+                politique_taille : dictionnaire des seuils d'effectif au-delà desquels la distribution exacte de Mann-Whitney (exact_max)
+                    et les tests de permutation (permutation_max) sont remplacés par leur approximation asymptotique, None pour les seuils par défaut
+                    La méthode utilisée est enregistrée dans le résultat de ces tests (clé methode), les autres tests n'en dépendent pas
+                post_hoc : si True, les tests des variables quantitatives à plus de deux groupes sont complétés des comparaisons
+                    deux à deux (Tukey après une ANOVA, Dunn ajusté par Holm après un Kruskal-Wallis), clé post_hoc du résultat du test
+                sample : fraction (0 < sample <= 1) ou nombre de lignes d'un échantillon aléatoire sur lequel l'analyse complète est menée,
+                    tirage reproductible de graine seed. Chaque variable reçoit une clé echantillon : erreurs standards des moyennes
+                    et des proportions, modalités dont l'effectif échantillonné est inférieur à sample_min
+                sample_strata : variable qualitative (ou tuple de variables) stratifiant le tirage, allocation proportionnelle
+                sample_min : effectif échantillonné minimal d'une modalité
+                n_simulations : nombre de tableaux simulés du test de Fisher par Monte Carlo (tableaux r x c hors conditions du Khi-2)
         """
+        
+        # Echantillon : l'analyse est menée par un analyseur restreint aux lignes tirées et aux colonnes analysées
+        if sample is not None:
+            
+            # Graine commune : tirée une fois si absente et enregistrée, pour reproduire l'échantillon
+            if seed is None:
+                seed = np.random.SeedSequence().entropy
+            
+            lignes = self._echantillonner(sample, sample_strata, seed)
+            
+            colonnes = []
+            for colonne in list(variables) + list(axes or []) + [strata]:
+                for x in (colonne if isinstance(colonne, tuple) else (colonne,)):
+                    if x is not None and x in self.df.columns and x not in colonnes:
+                        colonnes.append(x)
+            
+            analyses = analyseStatistiques(self.df[colonnes].take(lignes))
+            analyses._echantillon = {
+                "fraction":len(lignes)/self.df.shape[0],
+                "n_lignes":len(lignes),
+                "n_total":self.df.shape[0],
+                "sample_strata":sample_strata,
+                "seed":seed,
+                "seuil":sample_min
+            }
+            
+            return analyses.analyse_univarie(
+                variables, axes, lazy, prefetch, strata, correlation, bootstrap, n_bootstrap, seed, n_jobs, methode_test,
+                politique_taille, post_hoc, n_simulations = n_simulations
+            )
+        
+        # Seules les variables de type connu sont analysées
+        variables = dict(
+            [(variable, type_variable) for variable, type_variable in variables.items() \
+                if type_variable in ['qualitative', 'quantitative']]
+        )
+        
+        # Axes qualitatifs et quantitatifs
+        if isinstance(axes, dict):
+            axes_quantitatifs = [axe for axe, type_axe in axes.items() if type_axe == 'quantitative']
+            axes = [axe for axe, type_axe in axes.items() if type_axe == 'qualitative']
+        else:
+            axes_quantitatifs = []
+        
+        # Options du bootstrap : graine commune à toutes les variables
+        if bootstrap is not None:
+            bootstrap = {
+                "methode":bootstrap,
+                "n_bootstrap":n_bootstrap,
+                "seed":np.random.SeedSequence().entropy if seed is None else seed,
+                "n_jobs":n_jobs
+            }
+        
+        # Choix des tests, la graine sert aussi aux tests simulés (Fisher par Monte Carlo)
+        options_test = {
+            "method":methode_test, "seed":seed, "politique":politique_taille, "post_hoc":post_hoc, "n_simulations":n_simulations
+        }
+        
+        # Strates : encodage et regroupement des lignes une seule fois, partagés par toutes les strates
+        if strata is not None:
+            strates = self._strates(strata)
+        else:
+            strates = {None:None}
+        
+        if lazy:
+            resultats = dict(zip(
+                strates.keys(),
+                [
+                    resultatsDifferes(
+                        partial(
+                            self._analyse_univarie_variable,
+                            axes = axes,
+                            lignes = lignes,
+                            axes_quantitatifs = axes_quantitatifs,
+                            correlation = correlation,
+                            bootstrap = bootstrap,
+                            options_test = options_test
+                        ),
+                        variables,
+                        (axes or []) + axes_quantitatifs,
+                        prefetch,
+                        axes_quantitatifs
+                    ) for lignes in strates.values()
+                ]
+            ))
+            
+            return(resultats[None] if strata is None else resultats)
+                
+        # Description globale de toutes les variables quantitatives en une fois
+        variables_quantitatives = [variable for variable, type_variable in variables.items() if type_variable == 'quantitative']
+        if strata is None:
+            descriptions_globales = {None:self._describe_quantitative_lot(variables_quantitatives)}
+        else:
+            descriptions_globales = self._describe_quantitative_lot(variables_quantitatives, strates = strates)
                 
         # Sortie des résultats
         resultats = {}
         
-        for variable, type_variable in variables.items():
-            if type_variable == 'qualitative':
-                resultats[variable] = self._analyse_univarie_qualitative(variable, axes)
-            elif type_variable == 'quantitative':
-                resultats[variable] = self._analyse_univarie_quantitative(variable, axes)                
+        for strate, lignes in strates.items():
+            
+            resultats[strate] = {}
+            
+            # Corrélations de toutes les variables quantitatives avec les axes quantitatifs en une fois
+            correlations = {}
+            if len(axes_quantitatifs) > 0 and len(variables_quantitatives) > 0:
+                correlations = self._correlations(variables_quantitatives, axes_quantitatifs, correlation, lignes)
+            
+            for variable, type_variable in variables.items():
+                if type_variable == 'quantitative':
+                    resultats[strate][variable] = self._analyse_univarie_quantitative(
+                        variable, axes, descriptions_globales[strate][variable], lignes, correlations.get(variable), bootstrap, options_test
+                    )
+                else:
+                    resultats[strate][variable] = self._analyse_univarie_variable(
+                        variable, type_variable, axes, lignes, options_test = options_test
+                    )
                 
-        return(resultats)
\ No newline at end of file
+        return(resultats[None] if strata is None else resultats)
+
+
+
+def _compacter_colonne (serie, seuil_category = 0.5):
+    
+    """
+        Retourne une version compacte d'une colonne
+            Les flottants ne sont convertis en float32 que si toutes les valeurs sont retrouvées exactement en float64
+            seuil_category : proportion maximale de modalités distinctes pour la conversion en category
+    """
+    
+    if pd.api.types.is_bool_dtype(serie) or isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    elif pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast = "integer")
+    elif pd.api.types.is_float_dtype(serie):
+        if serie.dtype == np.float32:
+            return serie
+        
+        valeurs = serie.to_numpy()
+        valeurs_32 = valeurs.astype(np.float32)
+        
+        # Aller-retour exact float64 -> float32 -> float64, les NaN sont considérés égaux
+        with np.errstate(over = "ignore", invalid = "ignore"):
+            retour = valeurs_32.astype(np.float64)
+            conserve = bool(((retour == valeurs) | (np.isnan(retour) & np.isnan(valeurs))).all())
+        
+        if conserve:
+            return pd.Series(valeurs_32, index = serie.index, name = serie.name)
+        else:
+            return serie
+    elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+        if serie.shape[0] > 0 and serie.nunique(dropna = True) <= seuil_category*serie.shape[0]:
+            return serie.astype("category")
+        else:
+            return serie
+    else:
+        return serie
+
+def _compacter (df):
+    
+    """
+        Copie compacte d'un dataset, profilage de chaque colonne une seule fois
+        Output : dataset compact, rapport (mémoire initiale, compacte, économisée et types de chaque colonne)
+    """
+    
+    colonnes = dict(zip(
+        df.columns,
+        [_compacter_colonne(df[colonne]) for colonne in df.columns]
+    ))
+    df_compact = pd.DataFrame(colonnes, index = df.index)
+    
+    memoire_initiale = int(df.memory_usage(deep = True).sum())
+    memoire_compacte = int(df_compact.memory_usage(deep = True).sum())
+    
+    rapport = {
+        "memoire_initiale":memoire_initiale,
+        "memoire_compacte":memoire_compacte,
+        "economie":memoire_initiale - memoire_compacte,
+        "types":dict(zip(
+            df.columns,
+            [(str(df[x].dtype), str(df_compact[x].dtype)) for x in df.columns]
+        ))
+    }
+    
+    return df_compact, rapport
+
+def _type_codes (n_modalites):
+    
+    """
+        Plus petit type entier signé permettant de coder n modalités et la valeur manquante (-1)
+    """
+    
+    for type_codes in [np.int8, np.int16, np.int32]:
+        if n_modalites <= np.iinfo(type_codes).max:
+            return type_codes
+    
+    return np.int64
+
+def _ordre_modalites (codes, modalites):
+    
+    """
+        Codes présents triés selon leur modalité (ordre des tableaux de contingence), ou par code si non comparables
+    """
+    
+    try:
+        return sorted(codes, key = lambda x: modalites[x])
+    except TypeError:
+        return sorted(codes)
+
+def _ajouter_tailles_effet (tests, tailles_effet):
+    
+    """
+        Ajoute les tailles d'effet aux résultats des tests effectués (clé taille_effet), dans l'ordre des axes
+    """
+    
+    for (test_applique, resultat), taille_effet in zip(tests.values(), tailles_effet):
+        if taille_effet is not None and "p_value" in resultat:
+            resultat["taille_effet"] = taille_effet
+
+def _contingence (codes_x, modalites_x, codes_y, modalites_y):
+    
+    """
+        Tableau de contingence de deux variables encodées, modalités de x en lignes et de y en colonnes
+        Seules les modalités présentes sont conservées, triées par modalité
+    """
+    
+    lignes = _ordre_modalites(np.unique(codes_x), modalites_x)
+    colonnes = _ordre_modalites(np.unique(codes_y), modalites_y)
+    
+    # Position de chaque code dans le tableau
+    position_x = np.zeros(len(modalites_x), dtype = np.int64)
+    position_x[lignes] = np.arange(len(lignes))
+    position_y = np.zeros(len(modalites_y), dtype = np.int64)
+    position_y[colonnes] = np.arange(len(colonnes))
+    
+    contingence = np.bincount(
+        position_x[codes_x]*len(colonnes) + position_y[codes_y],
+        minlength = len(lignes)*len(colonnes)
+    ).reshape(len(lignes), len(colonnes))
+    
+    return contingence
+
+def _decrire_colonnes (X):
+    
+    """
+        Description de chaque colonne d'un tableau 2D trié par colonne, NaN en fin de colonne
+        Output : liste de descriptions, une par colonne
+    """
+    
+    with warnings.catch_warnings(), np.errstate(divide = "ignore", invalid = "ignore"):
+        # Colonnes vides ou de taille 1 : NaN comme pour pandas
+        warnings.simplefilter("ignore", RuntimeWarning)
+        
+        n = (~np.isnan(X)).sum(axis = 0)
+        mean = np.nanmean(X, axis = 0)
+        std = np.nanstd(X, axis = 0, ddof = 1)
+        std_mean = std/np.sqrt(n)
+        
+        # Quantiles : interpolation linéaire (comme pandas)
+        Q25, median, Q75 = [_quantile_colonnes(X, n, q) for q in [0.25, 0.5, 0.75]]
+    
+    descriptions = []
+    for i in range(X.shape[1]):
+        descriptions.append(descriptionQuantitative(
+            n = int(n[i]),
+            mean = mean[i],
+            median = median[i],
+            Q25 = Q25[i],
+            Q75 = Q75[i],
+            std = std[i],
+            std_mean = std_mean[i],
+            ci_95 = [mean[i]-1.96*std_mean[i], mean[i]+1.96*std_mean[i]]
+        ))
+    
+    return descriptions
+
+def _quantile_colonnes (X, n, q):
+    
+    """
+        Quantile de chaque colonne d'un tableau trié, NaN en fin de colonne, interpolation linéaire (comme pandas)
+        Input :
+            X : tableau 2D trié par colonne
+            n : nombre de valeurs non manquantes de chaque colonne
+            q : quantile
+    """
+    
+    if X.shape[0] == 0:
+        return np.full(X.shape[1], np.nan)
+    
+    position = (n-1)*q
+    bas = np.clip(np.floor(position).astype(np.int64), 0, None)
+    haut = np.clip(np.ceil(position).astype(np.int64), 0, None)
+    
+    valeur_bas = np.take_along_axis(X, bas[np.newaxis, :], axis = 0)[0]
+    valeur_haut = np.take_along_axis(X, haut[np.newaxis, :], axis = 0)[0]
+    
+    quantile = valeur_bas + (valeur_haut-valeur_bas)*(position-bas)
+    quantile[n == 0] = np.nan
+    
+    return quantile
@@ -0,0 +1,143 @@
+"""
+    Intervalles de confiance à 95% par bootstrap de la moyenne et de la médiane
+    Les rééchantillonnages d'un groupe sont tirés par lots de tableaux d'indices (taille bornée en mémoire),
+    chaque groupe a son propre générateur, dérivé de la graine et de la clé du groupe : les résultats sont
+    reproductibles quel que soit l'ordre de calcul ou le nombre de workers.
+"""
+
+import concurrent.futures
+import numpy as np
+from scipy.special import ndtr, ndtri
+from .aleatoire import generateur as generateur_aleatoire
+
+_STATISTIQUES = ["mean", "median"]
+
+def bootstrap_ic (groupes, methode = "percentile", n_bootstrap = 2000, seed = None, n_jobs = 1, taille_lot = 2**22):
+
+    """
+        Intervalles de confiance à 95% par bootstrap de la moyenne et de la médiane de plusieurs groupes
+        Input :
+            groupes : dictionnaire clé -> tableau numpy des valeurs du groupe, sans valeur manquante
+            methode : "percentile" ou "bca" (biais corrigé et accéléré)
+            n_bootstrap : nombre de rééchantillonnages
+            seed : graine, None pour une graine aléatoire
+            n_jobs : nombre de threads, 1 pour un calcul séquentiel
+            taille_lot : nombre maximal de valeurs rééchantillonnées à la fois pour un groupe
+        Output : dictionnaire clé -> {"mean":[inf, sup], "median":[inf, sup]}
+    """
+
+    if methode not in ["percentile", "bca"]:
+        raise Exception("Méthode de bootstrap inconnue : {}".format(methode))
+
+    # Graine commune : tirée une fois si absente, pour que tous les groupes en dérivent
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    calculer = lambda cle: _bootstrap_groupe(
+        np.asarray(groupes[cle], dtype = np.float64),
+        methode, n_bootstrap, generateur_aleatoire(seed, cle), taille_lot
+    )
+
+    if n_jobs == 1:
+        intervalles = [calculer(cle) for cle in groupes]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers = n_jobs) as executeur:
+            intervalles = list(executeur.map(calculer, groupes))
+
+    return dict(zip(groupes.keys(), intervalles))
+
+def _bootstrap_groupe (y, methode, n_bootstrap, generateur, taille_lot):
+
+    """
+        Intervalles de confiance d'un groupe
+        Output : dictionnaire statistique -> [inf, sup]
+    """
+
+    n = y.shape[0]
+    if n < 2:
+        return dict([(x, [np.nan, np.nan]) for x in _STATISTIQUES])
+
+    # Les indices portent sur les valeurs triées : la médiane d'un rééchantillonnage est la valeur
+    # de son indice médian, obtenu en triant les indices (tri entier rapide sur 16 bits)
+    y_trie = np.sort(y)
+    type_indices = np.int16 if n <= np.iinfo(np.int16).max else np.int64
+    milieu = n//2
+
+    # Rééchantillonnages par lots : tableau d'indices (lot, n)
+    repliques = dict([(x, np.empty(n_bootstrap)) for x in _STATISTIQUES])
+    taille = max(1, taille_lot//n)
+    for debut in range(0, n_bootstrap, taille):
+        fin = min(n_bootstrap, debut+taille)
+        indices = generateur.integers(0, n, size = (fin-debut, n), dtype = type_indices)
+        indices.sort(axis = 1)
+
+        repliques["mean"][debut:fin] = y_trie[indices].mean(axis = 1)
+        if n % 2 == 1:
+            repliques["median"][debut:fin] = y_trie[indices[:, milieu]]
+        else:
+            repliques["median"][debut:fin] = (y_trie[indices[:, milieu-1]] + y_trie[indices[:, milieu]])/2
+
+    niveaux = np.array([0.025, 0.975])
+
+    intervalles = {}
+    if methode == "percentile":
+        for statistique in _STATISTIQUES:
+            intervalles[statistique] = np.quantile(repliques[statistique], niveaux).tolist()
+    else:
+        estimations = {"mean":y.mean(), "median":np.median(y)}
+        jackknife = {"mean":(y.sum() - y)/(n-1), "median":_jackknife_mediane(y_trie)}
+
+        for statistique in _STATISTIQUES:
+            intervalles[statistique] = _intervalle_bca(
+                repliques[statistique], estimations[statistique], jackknife[statistique], niveaux
+            )
+
+    return intervalles
+
+def _jackknife_mediane (y_trie):
+
+    """
+        Médiane de chaque échantillon privé d'une valeur, calculée à partir des valeurs triées
+        Les valeurs privées de la même valeur ont la même médiane : seule la position dans le tri compte
+    """
+
+    n = y_trie.shape[0]
+    positions = np.arange(n)
+
+    # Valeur de rang j de l'échantillon privé de la valeur de rang i
+    valeur = lambda j: y_trie[np.where(j < positions, j, j+1)]
+
+    if (n-1) % 2 == 1:
+        return valeur((n-2)//2)
+    else:
+        return (valeur((n-1)//2 - 1) + valeur((n-1)//2))/2
+
+def _intervalle_bca (repliques, estimation, jackknife, niveaux):
+
+    """
+        Intervalle bootstrap biais corrigé et accéléré (BCa)
+        Input :
+            repliques : statistique de chaque rééchantillonnage
+            estimation : statistique sur l'échantillon
+            jackknife : statistique de chaque échantillon privé d'une valeur
+            niveaux : niveaux de l'intervalle
+    """
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        # Correction du biais
+        proportion = (np.sum(repliques < estimation) + 0.5*np.sum(repliques == estimation))/repliques.shape[0]
+        z0 = ndtri(proportion)
+
+        # Accélération
+        ecarts = jackknife.mean() - jackknife
+        denominateur = 6*np.sum(ecarts**2)**1.5
+        acceleration = np.sum(ecarts**3)/denominateur if denominateur > 0 else 0
+
+        z = ndtri(niveaux)
+        niveaux_corriges = ndtr(z0 + (z0+z)/(1 - acceleration*(z0+z)))
+
+    # Distribution dégénérée : intervalle des percentiles
+    if not np.all(np.isfinite(niveaux_corriges)):
+        niveaux_corriges = niveaux
+
+    return np.quantile(repliques, niveaux_corriges).tolist()
@@ -0,0 +1,217 @@
+"""
+    Corrélations de Pearson et de Spearman entre variables quantitatives
+    Toutes les paires (colonne de X, colonne de Y) sont calculées en une opération matricielle,
+    les valeurs manquantes sont exclues paire par paire à l'aide de masques.
+"""
+
+import warnings
+import numpy as np
+from scipy.stats import rankdata, t as loi_t
+
+def correler (X, Y):
+
+    """
+        Corrélations de Pearson et de Spearman entre chaque colonne de X et chaque colonne de Y
+        Input :
+            X : tableau (n, p) float64, NaN pour les valeurs manquantes
+            Y : tableau (n, q) float64, NaN pour les valeurs manquantes
+        Output : dictionnaire méthode ("pearson", "spearman") -> dictionnaire r, n, p_value, ci_inf, ci_sup de tableaux (p, q)
+    """
+
+    resultats = {}
+
+    with warnings.catch_warnings(), np.errstate(divide = "ignore", invalid = "ignore"):
+        # Colonnes vides ou constantes : NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        resultats["pearson"] = _statistiques(*_pearson(X, Y))
+        resultats["spearman"] = _statistiques(*_spearman(X, Y))
+
+    return resultats
+
+def _pearson (X, Y):
+
+    """
+        Coefficient de Pearson de chaque paire de colonnes, sur les lignes complètes de la paire
+        Output : r, n : tableaux (p, q)
+    """
+
+    masque_x = ~np.isnan(X)
+    masque_y = ~np.isnan(Y)
+
+    # Centrage par colonne : les sommes restent exactes par paire, l'erreur d'arrondi est réduite
+    X0 = np.where(masque_x, X - np.nanmean(X, axis = 0), 0)
+    Y0 = np.where(masque_y, Y - np.nanmean(Y, axis = 0), 0)
+    masque_x = masque_x.astype(np.float64)
+    masque_y = masque_y.astype(np.float64)
+
+    # Sommes sur les lignes complètes de chaque paire
+    n = masque_x.T @ masque_y
+    somme_x = X0.T @ masque_y
+    somme_y = masque_x.T @ Y0
+    somme_xx = (X0*X0).T @ masque_y
+    somme_yy = masque_x.T @ (Y0*Y0)
+    somme_xy = X0.T @ Y0
+
+    covariance = somme_xy - somme_x*somme_y/n
+    variance_x = somme_xx - somme_x*somme_x/n
+    variance_y = somme_yy - somme_y*somme_y/n
+
+    r = np.clip(covariance/np.sqrt(variance_x*variance_y), -1, 1)
+
+    return r, n
+
+def _spearman (X, Y, taille_lot = 2**22, part_profils = 1/64):
+
+    """
+        Coefficient de Spearman de chaque paire de colonnes, sur les lignes complètes de la paire
+        Les rangs dépendent des lignes retenues :
+            peu de combinaisons de profils de valeurs manquantes (au plus part_profils du nombre de paires) :
+                rangs calculés une fois par combinaison de profils, corrélations par produits matriciels
+            sinon : rangs de chaque colonne parmi les lignes observées de chaque profil de l'autre tableau
+                (comptages cumulés, _rangs_conditionnels) et sommes masquées, par blocs de colonnes de X
+        Output : r, n : tableaux (p, q)
+    """
+
+    profils_x, profils_y = _profils(X), _profils(Y)
+    if len(profils_x)*len(profils_y) <= max(1, part_profils*X.shape[1]*Y.shape[1]):
+        return _spearman_profils(X, Y, profils_x, profils_y)
+
+    masque_x = ~np.isnan(X)
+    masque_y = ~np.isnan(Y)
+    n_lignes, q = Y.shape
+
+    r = np.full((X.shape[1], q), np.nan)
+    n = masque_x.astype(np.float64).T @ masque_y.astype(np.float64)
+
+    # Profils des colonnes de Y : les rangs des colonnes de X ne dépendent que du profil de la colonne de Y
+    profils, profil_y = np.unique(masque_y, axis = 1, return_inverse = True)
+    profils = profils.astype(np.float64)
+    profil_y = profil_y.reshape(-1)
+
+    taille_bloc = max(1, taille_lot // max(n_lignes*q, 1))
+    for debut in range(0, X.shape[1], taille_bloc):
+        bloc = slice(debut, debut + taille_bloc)
+
+        profils_bloc, profil_x = np.unique(masque_x[:, bloc], axis = 1, return_inverse = True)
+        profil_x = profil_x.reshape(-1)
+
+        # Rangs de chaque paire (n, colonnes du bloc, colonnes de Y), nuls hors des lignes complètes de la paire
+        lignes = masque_x[:, bloc, np.newaxis] & masque_y[:, np.newaxis, :]
+        rangs_x = np.where(lignes, _rangs_conditionnels(X[:, bloc], profils)[:, :, profil_y], 0)
+        rangs_y = np.where(lignes, _rangs_conditionnels(Y, profils_bloc.astype(np.float64))[:, :, profil_x].transpose(0, 2, 1), 0)
+
+        # Sur m lignes, la somme des rangs moyens vaut m(m+1)/2
+        n_bloc = n[bloc]
+        carre_moyenne = n_bloc*((n_bloc + 1)/2)**2
+        covariance = np.einsum("nab,nab->ab", rangs_x, rangs_y) - carre_moyenne
+        variance_x = np.einsum("nab,nab->ab", rangs_x, rangs_x) - carre_moyenne
+        variance_y = np.einsum("nab,nab->ab", rangs_y, rangs_y) - carre_moyenne
+
+        r[bloc] = np.clip(covariance/np.sqrt(variance_x*variance_y), -1, 1)
+
+    return r, n
+
+def _spearman_profils (X, Y, profils_x, profils_y):
+
+    """
+        Coefficient de Spearman, rangs calculés une fois par combinaison de profils de valeurs manquantes
+        Output : r, n : tableaux (p, q)
+    """
+
+    r = np.full((X.shape[1], Y.shape[1]), np.nan)
+    n = np.zeros((X.shape[1], Y.shape[1]))
+
+    for masque_x, colonnes_x in profils_x:
+        for masque_y, colonnes_y in profils_y:
+
+            lignes = masque_x & masque_y
+            rangs_x = rankdata(X[np.ix_(lignes, colonnes_x)], axis = 0)
+            rangs_y = rankdata(Y[np.ix_(lignes, colonnes_y)], axis = 0)
+
+            r_bloc, n_bloc = _pearson(rangs_x, rangs_y)
+            r[np.ix_(colonnes_x, colonnes_y)] = r_bloc
+            n[np.ix_(colonnes_x, colonnes_y)] = n_bloc
+
+    return r, n
+
+def _rangs_conditionnels (V, M):
+
+    """
+        Rangs moyens (ex-aequo compris) des valeurs de chaque colonne de V parmi les lignes retenues par chaque colonne de M
+        Le rang d'une valeur est le nombre de lignes retenues de valeur inférieure plus la moitié de celles de valeur égale (plus un) :
+        les lignes retenues sont comptées de manière cumulée dans l'ordre trié de chaque colonne
+        Input :
+            V : tableau (n, a), NaN pour les valeurs manquantes
+            M : tableau (n, c) des lignes retenues (0/1), les lignes manquantes de V sont ignorées
+        Output : tableau (n, a, c), rangs sans signification pour les lignes non retenues
+    """
+
+    n = V.shape[0]
+    positions = np.arange(n)[:, np.newaxis]
+
+    # Ordre de chaque colonne (NaN en fin) et bornes du groupe d'ex-aequo de chaque position
+    ordre = np.argsort(V, axis = 0, kind = "stable")
+    V_trie = np.take_along_axis(V, ordre, axis = 0)
+    nouveau = np.ones(V.shape, dtype = bool)
+    nouveau[1:] = V_trie[1:] != V_trie[:-1]
+    dernier = np.ones(V.shape, dtype = bool)
+    dernier[:-1] = nouveau[1:]
+
+    debut = np.maximum.accumulate(np.where(nouveau, positions, 0), axis = 0)
+    fin = np.minimum.accumulate(np.where(dernier, positions, n - 1)[::-1], axis = 0)[::-1]
+
+    # Bornes du groupe de chaque ligne, dans l'ordre d'origine
+    inverse = np.empty_like(ordre)
+    np.put_along_axis(inverse, ordre, positions, axis = 0)
+    debut = np.take_along_axis(debut, inverse, axis = 0)[:, :, np.newaxis]
+    fin = np.take_along_axis(fin, inverse, axis = 0)[:, :, np.newaxis] + 1
+
+    # Nombre de lignes retenues avant chaque position triée
+    cumul = np.zeros((n + 1, V.shape[1], M.shape[1]))
+    np.cumsum(M[ordre], axis = 0, out = cumul[1:])
+
+    inferieurs = np.take_along_axis(cumul, debut, axis = 0)
+    egaux = np.take_along_axis(cumul, fin, axis = 0) - inferieurs
+
+    return inferieurs + (egaux + 1)/2
+
+def _profils (X):
+
+    """
+        Regroupe les colonnes selon leur profil de valeurs manquantes
+        Output : liste de (masque des lignes non manquantes, positions des colonnes)
+    """
+
+    masques = ~np.isnan(X)
+    profils, colonnes = np.unique(masques, axis = 1, return_inverse = True)
+    colonnes = colonnes.reshape(-1)
+
+    return [(profils[:, i], np.flatnonzero(colonnes == i)) for i in range(profils.shape[1])]
+
+def _statistiques (r, n):
+
+    """
+        p-value (test de Student à n-2 degrés de liberté) et intervalle de confiance à 95% (transformation de Fisher)
+        Output : dictionnaire r, n, p_value, ci_inf, ci_sup
+    """
+
+    ddl = n - 2
+    statistique = r*np.sqrt(ddl/(1 - r*r))
+    p_value = 2*loi_t.sf(np.abs(statistique), ddl)
+    p_value[ddl < 1] = np.nan
+
+    z = np.arctanh(r)
+    erreur = 1.96/np.sqrt(n - 3)
+    ci_inf = np.tanh(z - erreur)
+    ci_sup = np.tanh(z + erreur)
+    ci_inf[n <= 3] = np.nan
+    ci_sup[n <= 3] = np.nan
+
+    return {
+        "r":r,
+        "n":n.astype(np.int64),
+        "p_value":p_value,
+        "ci_inf":ci_inf,
+        "ci_sup":ci_sup
+    }
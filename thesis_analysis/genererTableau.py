@@ -1,7 +1,17 @@
 from io import StringIO, BytesIO
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
 import pyexcel as pe
 import csv 
+import copy
 import math
+import os
+import sys
+import hashlib
+import numpy as np
+import pandas as pd
+from .indexResultats import indexResultats
 
 class genererTableau ():
     
@@ -14,9 +24,11 @@ class genererTableau ():
             precision : nombre de décimales de précision
             quantitative_string_format : format d'écriture de la moyenne, écart type et taille d'échantillon des variables quantitatives
             qualitative_string_format : format d'écriture du n et de la proportion des variables qualitatives
+            cache : si True, les lignes générées pour chaque variable sont conservées et réutilisées tant que ses résultats ne changent pas
+            taille_effet : si True, une colonne "Taille d'effet" suit les colonnes de test (g de Hedges, êta², odds ratio, V de Cramér)
     """
     
-    def __init__ (self, data, precision = 2, quantitative_string_format = "{mean:.2f} +/- {std:.2f} ({n})", qualitative_string_format = "{n} ({p:.2%})"):
+    def __init__ (self, data, precision = 2, quantitative_string_format = "{mean:.2f} +/- {std:.2f} ({n})", qualitative_string_format = "{n} ({p:.2%})", cache = True, taille_effet = False):
         
         """
             Data : data contenant les données aggrégées, généré par analyseStatistiques.analyse_univarie
@@ -27,22 +39,41 @@ class genererTableau ():
         self.qualitative_string_format = qualitative_string_format
         self.absence_test = "Absence de test effectué (CI des tests conventionnels non remplis)"
         self.precision = precision
+        self.taille_effet = taille_effet
         
         self.data = data
-        self.liste_variables = list(data.keys()) # Liste des variables analysables
-        if "sous_groupes" in list(data.values())[0]:
-            self.liste_axes = list(list(data.values())[0]["sous_groupes"].keys()) # Liste des axes d'analyses
-        else:
-            self.liste_axes = []
         
-        # On récupère la liste des modalités de chaque axes
-        self.liste_modalites = dict(zip(
+        # Cache des lignes générées : clé de rendu -> (empreinte des résultats, lignes)
+        self.cache = cache
+        self._cache_rendu = {}
+        self._empreintes = {}
+        
+        # Index des variables, axes et modalités : construit une seule fois
+        self.index = indexResultats(data)
+        
+        self.liste_variables = list(self.index.variables.keys()) # Liste des variables analysables
+        self.liste_axes = list(self.index.axes.keys()) # Liste des axes d'analyses
+        
+    @property
+    def liste_modalites (self):
+        
+        """
+            Liste des modalités de chaque axe
+        """
+        
+        return dict(zip(
             self.liste_axes,
             [self._obtenir_modalite_axe(x, True) for x in self.liste_axes]
         ))
         
-        # On récupère la liste des modalités de chaque variable
-        self.liste_modalites_variables = dict(zip(
+    @property
+    def liste_modalites_variables (self):
+        
+        """
+            Liste des modalités de chaque variable
+        """
+        
+        return dict(zip(
             self.liste_variables,
             [self._obtenir_modalite_variable(x, True) for x in self.liste_variables]
         ))
@@ -51,12 +82,26 @@ class genererTableau ():
         """
             Nettoie un texte
             Si il s'agit d'un flottant : le met en int
+            Si il s'agit d'un tuple (modalité d'un axe composé) : les modalités sont séparées par " / "
         """
         
-        if type(texte) != type(str()):
+        if isinstance(texte, tuple):
+            texte = " / ".join([self._generer_texte_propre(x) for x in texte])
+        elif type(texte) != type(str()):
             texte = str(int(texte))
             
         return(texte)
+    
+    def _nom_axe (self, axe):
+        """
+            Nom affiché d'un axe
+            Les variables d'un axe composé (tuple) sont séparées par " x "
+        """
+        
+        if isinstance(axe, tuple):
+            return " x ".join([str(x) for x in axe])
+        
+        return axe
         
     def _generer_str_mean_std_n(self, mean, std, n):
         
@@ -145,40 +190,143 @@ class genererTableau ():
             Input :
                 test : liste contenant le résultat du test
             Sortie :
-                liste de 3 éléments comprenant : Test, Paramètre et p
+                liste de 3 éléments comprenant : Test, Paramètre et p, complétée de la taille d'effet si demandée
         """
         
         resultat = []
         
         if len(test[1].keys()) > 1:
-            resultat.append(test[0]) # Nom du test
+            # Nom du test, complété de la méthode utilisée (exacte, asymptotique, permutation) si elle est enregistrée
+            if "methode" in test[1]:
+                resultat.append("{} ({})".format(test[0], test[1]["methode"]))
+            else:
+                resultat.append(test[0])
             resultat.append(self._generer_str_valeur(test[1]["statistic"])) # Paramètre de test
             resultat.append(self._formater_p_value(test[1]["p_value"])) # Petit p du test
         else:
             resultat.append(self.absence_test)
             resultat = resultat + ["", ""]
+        
+        if self.taille_effet:
+            resultat.append(self._generer_str_taille_effet(test[1].get("taille_effet")))
             
         return(resultat)
     
-    def _formater_p_value(self, p_value):
+    def _generer_str_taille_effet(self, taille_effet):
+        
+        """
+            Génère le texte de la taille d'effet d'un test
+            g de Hedges (IC 95%) pour deux groupes, êta² au-delà, odds ratio (IC 95%) et V de Cramér pour un tableau 2x2, V de Cramér sinon
+            
+            Input :
+                taille_effet : tailles d'effet du test, None si absentes
+            Sortie :
+                texte, vide en l'absence de taille d'effet
+        """
+        
+        if taille_effet is None:
+            return ""
+        
+        textes = []
+        if "hedges_g" in taille_effet:
+            textes.append("g {} ({})".format(self._generer_str_valeur(taille_effet["hedges_g"]), self._generer_str_ci(taille_effet["ci_95"])))
+        elif "eta_carre" in taille_effet:
+            textes.append("η² {}".format(self._generer_str_valeur(taille_effet["eta_carre"])))
+        if "odds_ratio" in taille_effet:
+            textes.append("OR {} ({})".format(self._generer_str_valeur(taille_effet["odds_ratio"]), self._generer_str_ci(taille_effet["ci_95"])))
+        if "cramer_v" in taille_effet:
+            textes.append("V {}".format(self._generer_str_valeur(taille_effet["cramer_v"])))
+        
+        return(", ".join(textes))
     
-        # Nombre de décimales concernées
-        n_digit = len(str(p_value).split(".")[-1].split("0"))
-
-        borne_basse = 5*math.pow(10, -n_digit)
-        borne_sup = math.pow(10, -n_digit+1)
-
-        estimation_p = borne_basse if p_value <= borne_basse else borne_sup
-
+    def _colonnes_test(self, en_tete = ["Test", "Paramètre", "p"]):
+        
+        """
+            Colonnes de test d'un tableau : en-tête, ou cases vides si en_tete vaut None
+            La colonne de taille d'effet est ajoutée si elle est demandée
+        """
+        
+        if en_tete is None:
+            return ["" for x in range(3 + self.taille_effet)]
+        
+        return(list(en_tete) + (["Taille d'effet"] if self.taille_effet else []))
+    
+    def _generer_str_normalite(self, normalite):
+        
+        """
+            Génère une liste avec formatage textuel du test de normalité d'un groupe
+            
+            Input :
+                normalite : résultat du test de normalité (methode, statistic, p_value), None si absent
+            Sortie :
+                liste de 3 éléments comprenant : Test, Paramètre et p, vides en l'absence de test
+        """
+        
+        if normalite is None or normalite["methode"] == "no_test":
+            return self._colonnes_test(None)
+        
+        resultat = [
+            "normalité {}".format(normalite["methode"]), # Nom du test
+            self._generer_str_valeur(normalite["statistic"]), # Paramètre de test
+            self._formater_p_value(normalite["p_value"]) # Petit p du test
+        ] + self._colonnes_test(None)[3:]
+        
+        return(resultat)
+    
+    def _generer_str_correlation(self, donnees, axe):
+        
+        """
+            Ecrit le coefficient de corrélation d'une variable avec un axe quantitatif et son intervalle de confiance
+            Le coefficient affiché est celui retenu comme test (Pearson par défaut)
+            
+            Input :
+                donnees : résultats de la variable
+                axe : axe quantitatif
+            Sortie :
+                texte, vide si la corrélation n'a pas été calculée
+        """
+        
+        if "correlation" not in donnees or axe not in donnees["correlation"]:
+            return ""
+        
+        methode = donnees["test"][axe][0]
+        if methode not in donnees["correlation"][axe]:
+            methode = "pearson"
+        correlation = donnees["correlation"][axe][methode]
+        
+        texte = "{} ({})".format(
+            self._generer_str_valeur(correlation["r"]),
+            self._generer_str_ci(correlation["ci_95"])
+        )
+        
+        return(texte)
+    
+    def _formater_p_value(self, p_value):
+        
+        """
+            Texte d'une p-value
+                p >= 0.01 : arrondie à 3 décimales
+                0.001 <= p < 0.01 : "< 0.005" ou "< 0.01"
+                p < 0.001 : "< 10^-k", plus petite puissance de 10 supérieure à p
+            Input :
+                p_value
+            Sortie :
+                texte
+        """
+        
+        if p_value != p_value:
+            return str(p_value)
+        
         # Affichage
-        if p_value > 0.01:
+        if p_value >= 0.01:
             formated_p_value = str(round(p_value, 3))
+        elif p_value >= 0.001:
+            formated_p_value = "< 0.005" if p_value < 0.005 else "< 0.01"
         else:
-            if p_value > 0.001:
-                formated_p_value = "< "+str(estimation_p)
-            else:
-                formated_p_value = "< 10^"+str(n_digit-1)    
-
+            # p-value nulle (sous-passement) : plus petite puissance de 10 représentable
+            exposant = math.ceil(-math.log10(max(p_value, sys.float_info.min))) - 1
+            formated_p_value = "< 10^-"+str(exposant)
+        
         return(formated_p_value)
         
     def _verifier_existence_variables(self, variables):
@@ -189,7 +337,7 @@ class genererTableau ():
            Output : None
         """
         
-        variables_manquantes = [x for x in variables if x not in self.liste_variables]
+        variables_manquantes = [x for x in variables if x not in self.index.variables]
             
         if len(variables_manquantes) > 0:
             raise Exception("Erreur, les variables {} sont inexistantes des données aggrégées.".format(
@@ -205,32 +353,33 @@ class genererTableau ():
         """
         
         if axes is not None:
-            axes_manquants = [x for x in axes if x not in self.liste_axes]
+            axes_manquants = [x for x in axes if x not in self.index.axes]
         else:
             axes_manquants = []
             
         if len(axes_manquants) > 0:
             raise Exception("Erreur, les axes {} sont inexistantes des données aggrégées.".format(
-                ", ".join(axes_manquants)
+                ", ".join([self._nom_axe(x) for x in axes_manquants])
             ))
             
-    def _obtenir_modalite_axe (self, axe, ajouter_nom = True):
+    def _obtenir_modalite_axe (self, axe, ajouter_nom = True, variables = None):
         
         """
             Retourne une liste contenant toutes les modalités pour un axe donné
             Input :
                 axe : nom de l'axe à analyse
                 ajouter_nom : Si True, alors le nom de l'axe est ajouté à la modalité (concaténation)
+                variables : variables dont on fait l'union des modalités, toutes si None
         """
         
         # Liste des modalités
-        modalites = list(self.data.values())[0]["sous_groupes"][axe].keys()
+        modalites = self.index.modalites_axe(axe, variables)
         
         # Post-traitement : on corrige les float et boolean pour les afficher en int
-        modalites = [int(x) if type(x) != type(str()) else x for x in modalites]
+        modalites = [int(x) if type(x) not in (str, tuple) else x for x in modalites]
         
         # On affiche le nom de l'axe avec si nécessaire
-        modalites_avec_str = [axe+" "+str(x) for x in modalites]
+        modalites_avec_str = [self._nom_axe(axe)+" "+self._generer_texte_propre(x) for x in modalites]
         
         if ajouter_nom:
             return(modalites_avec_str)
@@ -247,7 +396,7 @@ class genererTableau ():
         """
         
         # Liste des modalités
-        modalites = [x for x in list(self.data[variable]["global"].keys()) if x != "total"]
+        modalites = self.index.variable(variable)["modalites"]
         
         # Post-traitement : on corrige les float et boolean pour les afficher en int
         modalites = [int(x) if type(x) != type(str()) else x for x in modalites]
@@ -260,12 +409,13 @@ class genererTableau ():
         else:
             return(modalites)
             
-    def _generer_en_tete_descriptif(self, axes):
+    def _generer_en_tete_descriptif(self, axes, variables = None):
         
         """
             Genere l'en-tête d'un tableau Descriptif
             Input :
                 axes : liste des axes d'analyse
+                variables : liste des variables du tableau
             Output : None
         """
         
@@ -274,7 +424,11 @@ class genererTableau ():
         
         # Lecture des axes
         for axe in axes:
-            en_tete = en_tete+self.liste_modalites[axe]+["Test","Paramètre", "p"]
+            if self.index.axe_quantitatif(axe):
+                # Axe quantitatif : une colonne pour le coefficient de corrélation
+                en_tete = en_tete+[self._nom_axe(axe)+" r (IC 95%)"]+self._colonnes_test()
+            else:
+                en_tete = en_tete+self._obtenir_modalite_axe(axe, True, variables)+self._colonnes_test()
             
         return en_tete
     
@@ -288,7 +442,7 @@ class genererTableau ():
         """
         
         # Type de variable
-        type_variable = self.data[variable]["type"]
+        type_variable = self.index.variable(variable)["type"]
         
         # Initialisation de l'en-tête
         en_tete = []
@@ -301,49 +455,70 @@ class genererTableau ():
             en_tete = en_tete + ["n", "mean", "std", "IC 95%"]
         elif type_variable == "qualitative":
             en_tete.append("n")
-            en_tete = en_tete + self.liste_modalites_variables[variable]
+            en_tete = en_tete + self._obtenir_modalite_variable(variable, True)
         
-        en_tete = en_tete + ["Test", "Parameter", "p"]
+        en_tete = en_tete + self._colonnes_test(["Test", "Parameter", "p"])
             
         return en_tete
     
-    def _generer_lignes_descriptif (self, variable, axes):
+    def _generer_lignes_descriptif (self, variable, axes, modalites_axes = None):
         
         """
             Genere des ligne d'analyse d'un tableau descriptif pour une variable
             Input :
                 variable : nom de la variable
                 axes : axes sur lesquels générer la ligne
+                modalites_axes : dictionnaire axe -> modalités des colonnes du tableau, par défaut toutes les modalités de l'axe
         """
         
         lignes = []
         
-        if self.data[variable]["type"] == "quantitative":
+        if modalites_axes is None:
+            modalites_axes = dict(zip(
+                axes,
+                [self._obtenir_modalite_axe(axe, False) for axe in axes]
+            ))
+        
+        donnees = self.data[variable]
+        entree = self.index.variable(variable)
+        
+        if entree["type"] == "quantitative":
             # Ligne d'une variable quantitative : une seule ligne
             
             ligne = [] # On instancie la ligne
             ligne.append(variable+" mean +/- std (n)") # Ajout du nom de variable
             ligne.append("") # Espace vide, technique
             ligne.append(self._generer_str_mean_std_n(
-                self.data[variable]["global"]["mean"],
-                self.data[variable]["global"]["std"],
-                self.data[variable]["global"]["n"]
+                donnees["global"]["mean"],
+                donnees["global"]["std"],
+                donnees["global"]["n"]
             )) # Données globales
             
             # Données liées à chaque axe
             for axe in axes:
                 
-                donnees_axe = self.data[variable]["sous_groupes"][axe]
-                # Pour chaque valeur de l'axe
-                for valeur in donnees_axe.keys():
+                # Axe quantitatif : coefficient de corrélation
+                if self.index.axe_quantitatif(axe):
+                    ligne.append(self._generer_str_correlation(donnees, axe))
+                    ligne = ligne + self._generer_str_resultat_test(donnees["test"][axe]) # Données du test
+                    continue
+                
+                donnees_axe = donnees["sous_groupes"][axe]
+                presentes = entree["axes"][axe]["presentes"]
+                
+                # Pour chaque valeur de l'axe : vide si la valeur n'existe pas pour cette variable
+                for valeur in modalites_axes[axe]:
                     
-                    ligne.append(self._generer_str_mean_std_n(
-                        donnees_axe[valeur]["mean"],
-                        donnees_axe[valeur]["std"],
-                        donnees_axe[valeur]["n"]
-                    )) # Données hors test
+                    if valeur in presentes:
+                        ligne.append(self._generer_str_mean_std_n(
+                            donnees_axe[valeur]["mean"],
+                            donnees_axe[valeur]["std"],
+                            donnees_axe[valeur]["n"]
+                        )) # Données hors test
+                    else:
+                        ligne.append("")
                 
-                ligne = ligne + self._generer_str_resultat_test(self.data[variable]["test"][axe]) # Données du test
+                ligne = ligne + self._generer_str_resultat_test(donnees["test"][axe]) # Données du test
                 
             lignes.append(ligne)
         else:
@@ -357,52 +532,57 @@ class genererTableau ():
             # Données liées à chaque axe
             for axe in axes:
                 
-                blank_list = ["" for x in range(len(self.liste_modalites[axe]))]
+                # Axe quantitatif : pas de corrélation pour une variable qualitative
+                if self.index.axe_quantitatif(axe):
+                    ligne = ligne + [""] + self._colonnes_test(None)
+                    continue
+                
+                blank_list = ["" for x in range(len(modalites_axes[axe]))]
                 
                 ligne = ligne + blank_list # Blanc lié aux tests
-                ligne = ligne + self._generer_str_resultat_test(self.data[variable]["test"][axe]) # Données du test
+                ligne = ligne + self._generer_str_resultat_test(donnees["test"][axe]) # Données du test
                 
             lignes.append(ligne)
             
             ## On écrit les lignes propres à chaque variable
             
-            liste_labels = self.data[variable]["global"].keys()
-            
-            for label in liste_labels:
-                                
-                # On ignore le label total
-                if label != "total":
+            for label in entree["modalites"]:
+                
+                ligne = []
+                
+                ligne.append("") # Première ligne vide
+                ligne.append(self._generer_texte_propre(label)) # Libelé analysé   
+                ligne.append(self._generer_str_n_p(
+                    n = donnees["global"][label]["n"], 
+                    p = donnees["global"][label]["p"]
+                )) # Données générales
+                
+                # Valeur par axe
+                for axe in axes:
                     
-                    ligne = []
+                    if self.index.axe_quantitatif(axe):
+                        ligne = ligne + [""] + self._colonnes_test(None)
+                        continue
                     
-                    ligne.append("") # Première ligne vide
-                    ligne.append(self._generer_texte_propre(label)) # Libelé analysé   
-                    ligne.append(self._generer_str_n_p(
-                        n = self.data[variable]["global"][label]["n"], 
-                        p = self.data[variable]["global"][label]["p"]
-                    )) # Données générales
+                    donnees_axe = donnees["sous_groupes"][axe]
+                    presentes = entree["axes"][axe]["presentes"]
                     
-                    # Valeur par axe
-                    for axe in axes:
+                    # Pour chaque valeur de l'axe
+                    for valeur in modalites_axes[axe]: # On met 0 si la valeur n'existe pas
                         
-                        liste_valeurs = list(self.data[variable]["sous_groupes"][axe].keys())
-                        
-                        # Pour chaque valeur de l'axe
-                        for valeur in liste_valeurs: # On met 0 si la valeur n'existe pas
+                        donnees_valeur = donnees_axe[valeur] if valeur in presentes else {}
                             
-                            donnees_axe = self.data[variable]["sous_groupes"][axe][valeur]
-                                
-                            n = donnees_axe[label]["n"] if label in donnees_axe.keys() else 0
-                            p = donnees_axe[label]["p"] if label in donnees_axe.keys() else 0
+                        n = donnees_valeur[label]["n"] if label in donnees_valeur else 0
+                        p = donnees_valeur[label]["p"] if label in donnees_valeur else 0
 
-                            ligne.append(self._generer_str_n_p(
-                                n = n, 
-                                p = p
-                            )) # Données spécifique à chaque axe
-                    
-                    ligne = ligne + ["", "", ""] # Espaces vides entre 2 axes
+                        ligne.append(self._generer_str_n_p(
+                            n = n, 
+                            p = p
+                        )) # Données spécifique à chaque axe
                 
-                    lignes.append(ligne)
+                    ligne = ligne + self._colonnes_test(None) # Espaces vides au niveau des colonnes de test
+            
+                lignes.append(ligne)
         
         return(lignes)
     
@@ -417,37 +597,68 @@ class genererTableau ():
     
         lignes = []
         
-        if self.data[variable]["type"] == "quantitative":
+        donnees = self.data[variable]
+        entree = self.index.variable(variable)
+        
+        if entree["type"] == "quantitative":
             # Génération de la ligne simple
             if axe is None:
                 ligne = [] # On instancie la ligne
                 ligne = ligne + ["", ""] # Blanc technique
-                ligne.append(self._generer_str_valeur(self.data[variable]["global"]["n"])) # Taille d'échantillon
-                ligne.append(self._generer_str_valeur(self.data[variable]["global"]["mean"])) # Moyenne
-                ligne.append(self._generer_str_valeur(self.data[variable]["global"]["std"])) # Ecart type
-                ligne.append(self._generer_str_ci(self.data[variable]["global"]["ci_95"])) # IC à 95%
-                ligne = ligne + ["", "", ""] # Blanc technique
+                ligne.append(self._generer_str_valeur(donnees["global"]["n"])) # Taille d'échantillon
+                ligne.append(self._generer_str_valeur(donnees["global"]["mean"])) # Moyenne
+                ligne.append(self._generer_str_valeur(donnees["global"]["std"])) # Ecart type
+                ligne.append(self._generer_str_ci(donnees["global"]["ci_95"])) # IC à 95%
+                
+                # Test de normalité de l'échantillon
+                ligne = ligne + self._generer_str_normalite(donnees.get("normalite", {}).get("global"))
                 
                 lignes.append(ligne)
+            elif self.index.axe_quantitatif(axe):
+                # Axe quantitatif : une ligne par coefficient de corrélation
+                
+                # On écrit le nom de l'axe
+                ligne = []
+                ligne.append(self._nom_axe(axe)) # Nom de l'axe
+                ligne = ligne + ["","","","",""]
+                
+                # Résultat du test
+                ligne = ligne + self._generer_str_resultat_test(donnees["test"][axe])
+                
+                lignes.append(ligne)
+                
+                for methode, correlation in donnees["correlation"][axe].items():
+                    
+                    ligne = []
+                    
+                    ligne.append("") # Ligne blanche technique
+                    ligne.append("r "+methode) # Coefficient
+                    ligne.append(self._generer_str_valeur(correlation["n"])) # Taille d'échantillon
+                    ligne.append(self._generer_str_valeur(correlation["r"])) # Coefficient de corrélation
+                    ligne.append("") # Pas d'écart type
+                    ligne.append(self._generer_str_ci(correlation["ci_95"])) # IC à 95%
+                    ligne = ligne + ["", "", self._formater_p_value(correlation["p_value"])] + self._colonnes_test(None)[3:] # p de la corrélation
+                    
+                    lignes.append(ligne)
             else:
                 # On vérifie l'axe
                 self._verifier_existence_axes([axe])
                 
                 # Données sur l'axe
-                donnees_axe = self.data[variable]["sous_groupes"][axe]
+                donnees_axe = donnees["sous_groupes"][axe]
                 
                 # On écrit le nom de l'axe
                 ligne = []
-                ligne.append(axe) # Nom de l'axe
+                ligne.append(self._nom_axe(axe)) # Nom de l'axe
                 ligne = ligne + ["","","","",""]
                 
                 # Résultat du test
-                ligne = ligne + self._generer_str_resultat_test(self.data[variable]["test"][axe])
+                ligne = ligne + self._generer_str_resultat_test(donnees["test"][axe])
                 
                 lignes.append(ligne)
                 
                 # On parcours toutes les modalités de l'axe
-                for valeur_axe in donnees_axe.keys():
+                for valeur_axe in entree["axes"][axe]["modalites"]:
                     
                     ligne = []
                     
@@ -458,7 +669,10 @@ class genererTableau ():
                     ligne.append(self._generer_str_valeur(donnees_axe[valeur_axe]["std"])) # Ecart type
                     ligne.append(self._generer_str_ci(donnees_axe[valeur_axe]["ci_95"])) # IC à 95%
                     
-                    ligne = ligne + ["", "", ""] # Blanc technique
+                    # Test de normalité du sous-groupe
+                    ligne = ligne + self._generer_str_normalite(
+                        donnees.get("normalite", {}).get("sous_groupes", {}).get(axe, {}).get(valeur_axe)
+                    )
                     lignes.append(ligne)
         else:
             # Génération de la ligne simple
@@ -466,51 +680,58 @@ class genererTableau ():
             if axe is None:
                 ligne = [] # On instancie la ligne
                 ligne = ligne + ["", ""] # Blanc technique
-                ligne.append(self._generer_str_valeur(self.data[variable]["global"]["total"])) # Taille d'échantillon
-                for variable_valeur in self.data[variable]["global"].keys():
-                    if variable_valeur != "total":
-                        ligne.append(self._generer_str_n_p(
-                                n = self.data[variable]["global"][variable_valeur]["n"], 
-                                p = self.data[variable]["global"][variable_valeur]["p"]
-                            ))
-                ligne = ligne + ["", "", ""] # Blanc technique
+                ligne.append(self._generer_str_valeur(donnees["global"]["total"])) # Taille d'échantillon
+                for variable_valeur in entree["modalites"]:
+                    ligne.append(self._generer_str_n_p(
+                            n = donnees["global"][variable_valeur]["n"], 
+                            p = donnees["global"][variable_valeur]["p"]
+                        ))
+                ligne = ligne + self._colonnes_test(None) # Blanc technique
                 
                 lignes.append(ligne)
                 
+            elif self.index.axe_quantitatif(axe):
+                # Pas de corrélation pour une variable qualitative
+                pass
             else:
                 # On vérifie l'axe
                 self._verifier_existence_axes([axe])
                 
                 # Données sur l'axe
-                donnees_axe = self.data[variable]["sous_groupes"][axe]
+                donnees_axe = donnees["sous_groupes"][axe]
                 
                 # On écrit le nom de l'axe
                 ligne = []
-                ligne.append(axe) # Nom de l'axe
-                ligne = ligne + ["",""] + ["" for x in range(len(self.liste_modalites_variables[variable]))] # Blanc technique
+                ligne.append(self._nom_axe(axe)) # Nom de l'axe
+                ligne = ligne + ["",""] + ["" for x in range(len(entree["modalites"]))] # Blanc technique
                 
                 # Résultat du test
-                ligne = ligne + self._generer_str_resultat_test(self.data[variable]["test"][axe])
+                ligne = ligne + self._generer_str_resultat_test(donnees["test"][axe])
                 
                 lignes.append(ligne)
                 
                 # On parcours toutes les modalités de l'axe
-                for valeur_axe in donnees_axe.keys():
+                for valeur_axe in entree["axes"][axe]["modalites"]:
+                    
+                    donnees_valeur = donnees_axe[valeur_axe]
                     
                     ligne = []
                     
                     ligne.append("") # Ligne blanche technique
                     ligne.append(self._generer_texte_propre(valeur_axe)) # Valeur sur l'axe
-                    ligne.append(self._generer_str_valeur(donnees_axe[valeur_axe]["total"])) # Taille d'échantillon
+                    ligne.append(self._generer_str_valeur(donnees_valeur["total"])) # Taille d'échantillon
                     
-                    for variable_valeur in donnees_axe[valeur_axe].keys():
-                        if variable_valeur != "total":
-                            ligne.append(self._generer_str_n_p(
-                                    n = donnees_axe[valeur_axe][variable_valeur]["n"], 
-                                    p = donnees_axe[valeur_axe][variable_valeur]["p"]
-                                )) 
+                    # Colonnes dans l'ordre des modalités de la variable, 0 si la modalité est absente
+                    for variable_valeur in entree["modalites"]:
+                        n = donnees_valeur[variable_valeur]["n"] if variable_valeur in donnees_valeur else 0
+                        p = donnees_valeur[variable_valeur]["p"] if variable_valeur in donnees_valeur else 0
+                        
+                        ligne.append(self._generer_str_n_p(
+                                n = n, 
+                                p = p
+                            )) 
                     
-                    ligne = ligne + ["", "", ""] # Blanc technique
+                    ligne = ligne + self._colonnes_test(None) # Blanc technique
                     lignes.append(ligne)
             
         return lignes
@@ -560,7 +781,133 @@ class genererTableau ():
             return (f)
 
             
-    def tableau_descriptif (self, chemin, variables, axes = None, format_sortie = "csv"):
+    def _generer_blocs (self, methode, arguments, n_jobs = 1, executeur = "thread"):
+        
+        """
+            Génère des blocs de lignes, éventuellement en parallèle, et les renvoie dans l'ordre des arguments
+            
+            Input :
+                methode : nom de la méthode générant un bloc de lignes
+                arguments : liste de tuples d'arguments, un tuple par bloc
+                n_jobs : nombre de workers, 1 ou None pour une génération séquentielle, -1 pour tous les processeurs
+                executeur : 'thread' pour un pool de threads, 'process' pour un pool de processus
+                    Le formatage est en Python pur : les threads ne l'accélèrent pas (GIL), ils ne servent que lorsque l'accès
+                    aux résultats domine (résultats différés calculés au premier accès, résultats stockés lus sur disque).
+                    Chaque processus ne reçoit que les résultats des variables de son paquet.
+            Output :
+                liste des blocs de lignes
+        """
+        
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        
+        # Lecture du cache : seuls les blocs absents ou dont les résultats ont changé sont générés
+        blocs = [None for x in arguments]
+        if self.cache:
+            cles = [self._cle_cache(methode, x) for x in arguments]
+            for i, cle in enumerate(cles):
+                en_cache = self._cache_rendu.get(cle)
+                if en_cache is not None and en_cache[0] == self._empreintes[arguments[i][0]]:
+                    blocs[i] = [list(ligne) for ligne in en_cache[1]]
+        a_generer = [i for i in range(len(arguments)) if blocs[i] is None]
+        arguments_a_generer = [arguments[i] for i in a_generer]
+        
+        # Génération séquentielle
+        if n_jobs is None or n_jobs <= 1 or len(arguments_a_generer) <= 1:
+            generes = [getattr(self, methode)(*x) for x in arguments_a_generer]
+        else:
+            # Découpage en paquets contigus pour limiter le coût de chaque tâche
+            taille_paquet = math.ceil(len(arguments_a_generer)/(4*n_jobs))
+            paquets = [arguments_a_generer[i:i+taille_paquet] for i in range(0, len(arguments_a_generer), taille_paquet)]
+            
+            if executeur == "thread":
+                with ThreadPoolExecutor(n_jobs) as pool:
+                    resultats = list(pool.map(partial(_generer_paquet, self, methode), paquets))
+            elif executeur == "process":
+                # Chaque tâche ne transmet que les résultats et l'index des variables de son paquet
+                generateurs = [self._restreindre([x[0] for x in paquet]) for paquet in paquets]
+                with ProcessPoolExecutor(n_jobs) as pool:
+                    resultats = list(pool.map(_generer_paquet, generateurs, [methode]*len(paquets), paquets))
+            else:
+                raise Exception("Exécuteur non supporté.")
+            
+            generes = []
+            for resultat in resultats:
+                generes.extend(resultat)
+        
+        # Assemblage dans l'ordre demandé et écriture du cache
+        for i, lignes in zip(a_generer, generes):
+            blocs[i] = lignes
+            if self.cache:
+                self._cache_rendu[cles[i]] = (
+                    self._empreintes[arguments[i][0]],
+                    [list(ligne) for ligne in lignes]
+                )
+        
+        return blocs
+    
+    def _restreindre (self, variables):
+        
+        """
+            Copie du générateur limitée aux résultats de quelques variables, sans cache, transmise à un processus du pool
+            Input :
+                variables : liste des variables
+        """
+        
+        variables = list(dict.fromkeys(variables))
+        
+        copie = copy.copy(self)
+        copie.index = self.index.restreindre(variables)
+        copie.data = copie.index.data
+        copie.cache = False
+        copie._cache_rendu = {}
+        copie._empreintes = {}
+        copie.liste_variables = variables
+        
+        return copie
+    
+    def _actualiser_empreintes (self, variables):
+        
+        """
+            Calcule l'empreinte des résultats de chaque variable
+            L'entrée d'index d'une variable dont les résultats ont changé est reconstruite.
+            Sans cache, les empreintes ne sont pas calculées : l'entrée d'index de chaque variable est toujours reconstruite.
+            
+            Input :
+                variables : liste des variables
+        """
+        
+        if not self.cache:
+            for variable in variables:
+                self.index.invalider(variable)
+            return None
+        
+        for variable in variables:
+            empreinte = _empreinte(self.data[variable])
+            
+            if self._empreintes.get(variable) != empreinte:
+                self.index.invalider(variable)
+                self._empreintes[variable] = empreinte
+    
+    def _cle_cache (self, methode, arguments):
+        
+        """
+            Clé du cache de rendu : méthode, arguments et paramètres de formatage
+        """
+        
+        cle = (
+            methode,
+            _figer(arguments),
+            self.precision,
+            self.quantitative_string_format,
+            self.qualitative_string_format,
+            self.absence_test,
+            self.taille_effet
+        )
+        
+        return cle
+    
+    def tableau_descriptif (self, chemin, variables, axes = None, format_sortie = "csv", n_jobs = 1, executeur = "thread"):
         
         """
             Décrit le contenu de plusieurs variables selon un axe ou plusieurs axes donnés.
@@ -576,35 +923,82 @@ class genererTableau ():
                     'ods' pour un fichier ods
                     'xlsx' pour un fichier xlsx
                     'raw' pour un envoie brut des données (liste python)
+                n_jobs : nombre de workers pour générer les lignes des variables, 1 pour une génération séquentielle
+                executeur : 'thread' ou 'process', voir _generer_blocs
             Output :
                 si chemin textuel : aucune sortie, écriture du fichier
                 si chemin du fichier vaut None : retour du stream
         """
         
-        # Vérification que toutes les variables et axes existent
+        # Vérification que toutes les variables existent
         self._verifier_existence_variables(variables)
+        
+        # Empreinte des résultats, pour le cache de rendu et l'index
+        self._actualiser_empreintes(variables)
+        
+        # Vérification que tous les axes existent
         self._verifier_existence_axes(axes)
         
-        # Récupération des donnée
+        if axes is None:
+            axes = []
+        
+        # Récupération des donnée : modalités de chaque axe pour les variables du tableau
+        modalites_axes = dict(zip(
+            axes,
+            [self._obtenir_modalite_axe(axe, False, variables) for axe in axes]
+        ))
         
         # Génération de l'en-tête
-        en_tete = self._generer_en_tete_descriptif(axes)
+        en_tete = self._generer_en_tete_descriptif(axes, variables)
         
         # Création du tableau
         tableau = []
         tableau.append(en_tete)
         
-        # Traitement des variables une à une
-        for variable in variables:
-            
-            lignes = self._generer_lignes_descriptif(variable, axes)
-            tableau = tableau+lignes
+        # Traitement des variables, bloc par bloc
+        blocs = self._generer_blocs(
+            "_generer_lignes_descriptif",
+            [(variable, axes, modalites_axes) for variable in variables],
+            n_jobs,
+            executeur
+        )
+        for lignes in blocs:
+            tableau.extend(lignes)
             
         # Generation de la sortie
         sortie = self._generer_sortie(chemin, tableau, format_sortie)
         
         return(sortie)
     
+    def _generer_tableau_detail (self, variable, axes = None):
+        
+        """
+            Genere les lignes du tableau détaillé d'une variable, en-tête compris
+            Input :
+                variable : nom de la variable
+                axes : liste des axes d'analyse
+        """
+        
+        # Génération de l'en-tête
+        en_tete = self._generer_en_tete_detail(variable)
+                
+        # Création du tableau
+        tableau = []
+        tableau.append(en_tete)
+        
+        # On génère la première ligne d'analyse
+        tableau.extend(self._generer_lignes_detail(variable, None))
+        
+        # Ligne vide
+        tableau.append(["" for x in range(len(tableau[-1]))])
+        
+        # Ajout des axes
+        if axes is not None:
+            for axe in axes:
+                tableau.extend(self._generer_lignes_detail(variable, axe))
+        
+        return(tableau)
+    
     def tableau_detail_variable (self, chemin, variable, axes = None, format_sortie = "csv"):
         
         """
@@ -626,28 +1020,446 @@ class genererTableau ():
                 si chemin du fichier vaut None : retour du stream
         """
         
-        # Vérification que toutes les variables et axes existent
+        # Vérification que toutes les variables existent
         self._verifier_existence_variables([variable])
+        
+        # Empreinte des résultats, pour le cache de rendu et l'index
+        self._actualiser_empreintes([variable])
+        
+        # Vérification que tous les axes existent
         self._verifier_existence_axes(axes)
         
-        # Récupération des donnée
+        # Génération du tableau
+        tableau = self._generer_blocs("_generer_tableau_detail", [(variable, axes)])[0]
         
-        # Génération de l'en-tête
-        en_tete = self._generer_en_tete_detail(variable)
-                
-        # Création du tableau
+        # Generation de la sortie
+        sortie = self._generer_sortie(chemin, tableau, format_sortie)
+        
+        return(sortie)
+    
+    def tableau_detail_variables (self, chemin, variables, axes = None, format_sortie = "csv", n_jobs = 1, executeur = "thread"):
+        
+        """
+            Génère à la suite les tableaux détaillés de plusieurs variables, séparés par une ligne vide.
+            Les axes correspondent forcément à des variable qualitatives.
+            
+            Input :
+                chemin : chemin du fichier de sortie
+                variables : liste des variables à traiter
+                axes : liste des axes d'analyse
+                format_sortie : 'tsv', 'csv', 'ods', 'xlsx' ou 'raw', voir tableau_detail_variable
+                n_jobs : nombre de workers pour générer les tableaux des variables, 1 pour une génération séquentielle
+                executeur : 'thread' ou 'process', voir _generer_blocs
+            Output :
+                si chemin textuel : aucune sortie, écriture du fichier
+                si chemin du fichier vaut None : retour du stream
+        """
+        
+        # Vérification que toutes les variables existent
+        self._verifier_existence_variables(variables)
+        
+        # Empreinte des résultats, pour le cache de rendu et l'index
+        self._actualiser_empreintes(variables)
+        
+        # Vérification que tous les axes existent
+        self._verifier_existence_axes(axes)
+        
+        # Génération des tableaux de chaque variable
+        blocs = self._generer_blocs(
+            "_generer_tableau_detail",
+            [(variable, axes) for variable in variables],
+            n_jobs,
+            executeur
+        )
+        
+        # Assemblage : une ligne vide entre deux tableaux
         tableau = []
-        tableau.append(en_tete)
+        for lignes in blocs:
+            if len(tableau) > 0:
+                tableau.append([])
+            tableau.extend(lignes)
         
-        # On génère la première ligne d'analyse
-        tableau = tableau + self._generer_lignes_detail(variable, None)
+        # Generation de la sortie
+        sortie = self._generer_sortie(chemin, tableau, format_sortie)
         
-        # Ligne vide
-        tableau.append(["" for x in range(len(tableau[-1]))])
+        return(sortie)
+
+    
+    def _generer_colonnes_numeriques (self, variables, axes):
         
-        # Ajout des axes
-        if axes is not None:
+        """
+            Génère les colonnes d'une table longue contenant les valeurs numériques des résultats
+            Une ligne par variable, axe, modalité de l'axe et modalité de la variable (qualitative).
+            Le résultat du test est répété sur chaque ligne de l'axe concerné.
+            
+            Input :
+                variables : liste des variables
+                axes : liste des axes
+            Output :
+                dictionnaire nom de colonne -> liste de valeurs
+        """
+        
+        colonnes = dict(zip(
+            _COLONNES_NUMERIQUES,
+            [[] for x in _COLONNES_NUMERIQUES]
+        ))
+        
+        def ajouter_ligne (variable, type_variable, axe, modalite, valeur, description, test):
+            
+            ligne = dict.fromkeys(_COLONNES_NUMERIQUES, np.nan)
+            ligne.update({
+                "variable":str(variable), "type":type_variable,
+                "axe":"" if axe is None else str(self._nom_axe(axe)),
+                "modalite":"" if modalite is None else self._generer_texte_propre(modalite),
+                "valeur":"" if valeur is None else self._generer_texte_propre(valeur),
+                "test":"",
+                "methode":""
+            })
+            
+            # Description
+            if modalite in ["pearson", "spearman"] and "r" in description:
+                # Corrélation avec un axe quantitatif
+                ligne["n"] = description["n"]
+                ligne["r"] = description["r"]
+                ligne["ci_inf"], ligne["ci_sup"] = description["ci_95"]
+            elif type_variable == "quantitative":
+                for cle in ["n", "mean", "std", "median"]:
+                    ligne[cle] = description[cle]
+                ligne["q25"] = description["Q25"]
+                ligne["q75"] = description["Q75"]
+                ligne["ci_inf"], ligne["ci_sup"] = description["ci_95"]
+            else:
+                ligne["total"] = description["total"]
+                if valeur in description:
+                    ligne["n"] = description[valeur]["n"]
+                    ligne["p"] = description[valeur]["p"]
+                else:
+                    ligne["n"], ligne["p"] = 0, 0
+            
+            # Test
+            if test is not None and len(test[1].keys()) > 1:
+                ligne["test"] = test[0]
+                ligne["statistic"] = test[1]["statistic"]
+                ligne["p_value"] = test[1]["p_value"]
+                ligne["methode"] = test[1].get("methode", "")
+                
+                # Tailles d'effet, l'IC est celui du g de Hedges ou de l'odds ratio
+                taille_effet = test[1].get("taille_effet") or {}
+                for cle in ["cohen_d", "hedges_g", "eta_carre", "odds_ratio", "cramer_v"]:
+                    ligne[cle] = taille_effet.get(cle, np.nan)
+                ligne["effet_ci_inf"], ligne["effet_ci_sup"] = taille_effet.get("ci_95", [np.nan, np.nan])
+            
+            for cle, valeur_ligne in ligne.items():
+                colonnes[cle].append(valeur_ligne)
+        
+        for variable in variables:
+            
+            donnees = self.data[variable]
+            entree = self.index.variable(variable)
+            
+            # Valeurs de la variable : une ligne par modalité pour les variables qualitatives
+            valeurs = entree["modalites"] if entree["type"] == "qualitative" else [None]
+            
+            for valeur in valeurs:
+                ajouter_ligne(variable, entree["type"], None, None, valeur, donnees["global"], None)
+            
             for axe in axes:
-                tableau = tableau + self._generer_lignes_detail(variable, axe)
+                
+                # Axe quantitatif : une ligne par coefficient de corrélation
+                if axe in entree["correlations"]:
+                    for methode, correlation in donnees["correlation"][axe].items():
+                        ajouter_ligne(variable, entree["type"], axe, methode, None, correlation, donnees["test"][axe])
+                    continue
+                elif axe not in entree["axes"]:
+                    continue
+                
+                for modalite in entree["axes"][axe]["modalites"]:
+                    for valeur in valeurs:
+                        ajouter_ligne(
+                            variable, entree["type"], axe, modalite, valeur,
+                            donnees["sous_groupes"][axe][modalite],
+                            donnees["test"][axe]
+                        )
+        
+        return colonnes
+    
+    def tableau_post_hoc (self, chemin, variables = None, axes = None, format_sortie = "csv"):
         
-        return(tableau)
+        """
+            Décrit les comparaisons post-hoc (analyse_univarie avec post_hoc = True)
+            Une ligne par variable et axe (méthode de comparaison), puis une ligne par paire de modalités :
+            différence (de moyennes, ou de rangs moyens pour Dunn), IC à 95% (Tukey et Games-Howell), statistique et p.
+            Les variables et axes sans comparaison post-hoc sont ignorés.
+            
+            Input :
+                chemin : chemin du fichier de sortie
+                variables : liste des variables à traiter, toutes si None
+                axes : liste des axes à traiter, tous si None
+                format_sortie : 'tsv', 'csv', 'ods', 'xlsx' ou 'raw', voir tableau_detail_variable
+            Output :
+                si chemin textuel : aucune sortie, écriture du fichier
+                si chemin du fichier vaut None : retour du stream
+        """
+        
+        if variables is None:
+            variables = self.liste_variables
+        if axes is None:
+            axes = self.liste_axes
+        
+        # Vérification que toutes les variables existent
+        self._verifier_existence_variables(variables)
+        
+        # Empreinte des résultats, pour le cache de rendu et l'index
+        self._actualiser_empreintes(variables)
+        
+        # Vérification que tous les axes existent
+        self._verifier_existence_axes(axes)
+        
+        # En-tête
+        tableau = [["", "", "Comparaison", "Différence", "IC 95%", "Statistique", "p"]]
+        
+        for variable in variables:
+            
+            donnees = self.data[variable]
+            
+            for axe in axes:
+                
+                if axe not in donnees.get("test", {}) or "post_hoc" not in donnees["test"][axe][1]:
+                    continue
+                
+                comparaisons = donnees["test"][axe][1]["post_hoc"]
+                
+                # Ligne de la variable et de l'axe : méthode de comparaison
+                methode = comparaisons["methode"]
+                if comparaisons["ajustement"] is not None:
+                    methode = "{} ({})".format(methode, comparaisons["ajustement"])
+                tableau.append([variable, self._nom_axe(axe), methode, "", "", "", ""])
+                
+                # Une ligne par paire de modalités
+                for (modalite_a, modalite_b), comparaison in comparaisons["comparaisons"].items():
+                    tableau.append([
+                        "",
+                        "",
+                        "{} vs {}".format(self._generer_texte_propre(modalite_a), self._generer_texte_propre(modalite_b)),
+                        self._generer_str_valeur(comparaison["difference"]),
+                        self._generer_str_ci(comparaison["ci_95"]) if "ci_95" in comparaison else "",
+                        self._generer_str_valeur(comparaison["statistic"]),
+                        self._formater_p_value(comparaison["p_value"])
+                    ])
+        
+        # Generation de la sortie
+        sortie = self._generer_sortie(chemin, tableau, format_sortie)
+        
+        return(sortie)
+    
+    def tableau_multivarie (self, chemin, resultats, variables = None, format_sortie = "csv"):
+        
+        """
+            Décrit les modèles multivariés produits par analyseMultivariee.regression
+            Une ligne par variable d'intérêt (modèle, n), puis une ligne par terme :
+            coefficient et IC à 95% pour une régression linéaire, odds ratio et IC à 95% pour une régression logistique.
+            
+            Input :
+                chemin : chemin du fichier de sortie
+                resultats : résultats de analyseMultivariee.regression
+                variables : liste des variables à traiter, toutes si None
+                format_sortie : 'tsv', 'csv', 'ods', 'xlsx' ou 'raw', voir tableau_detail_variable
+            Output :
+                si chemin textuel : aucune sortie, écriture du fichier
+                si chemin du fichier vaut None : retour du stream
+        """
+        
+        if variables is None:
+            variables = list(resultats.keys())
+        
+        variables_manquantes = [x for x in variables if x not in resultats]
+        if len(variables_manquantes) > 0:
+            raise Exception("Erreur, les variables {} sont inexistantes des modèles.".format(
+                ", ".join(variables_manquantes)
+            ))
+        
+        # En-tête
+        tableau = [["", "", "n", "Coefficient / OR", "IC 95%", "p"]]
+        
+        for variable in variables:
+            
+            modele = resultats[variable]
+            
+            # Ligne du modèle
+            if modele["modele"] == "logistique":
+                nom = "{} = {} (logistique)".format(variable, self._generer_texte_propre(modele["evenement"]))
+            else:
+                nom = "{} (linéaire)".format(variable)
+            tableau.append([nom, "", self._generer_str_valeur(modele["n"]), "", "", ""])
+            
+            # Une ligne par terme
+            for terme, coefficient in modele["coefficients"].items():
+                
+                if modele["modele"] == "logistique":
+                    valeur, ci = coefficient["odds_ratio"], coefficient["or_ci_95"]
+                else:
+                    valeur, ci = coefficient["estimate"], coefficient["ci_95"]
+                
+                tableau.append([
+                    "",
+                    terme,
+                    "",
+                    self._generer_str_valeur(valeur),
+                    self._generer_str_ci(ci),
+                    self._formater_p_value(coefficient["p_value"])
+                ])
+        
+        # Generation de la sortie
+        sortie = self._generer_sortie(chemin, tableau, format_sortie)
+        
+        return(sortie)
+    
+    def export_numerique (self, chemin, variables = None, axes = None, format_sortie = "parquet"):
+        
+        """
+            Exporte les valeurs numériques des résultats (n, moyenne, écart-type, IC, proportions, statistique, p et tailles d'effet du test)
+            dans une table longue typée, sans formatage textuel.
+            
+            Input :
+                chemin : chemin du fichier de sortie
+                variables : liste des variables à exporter, toutes si None
+                axes : liste des axes à exporter, tous si None
+                format_sortie :
+                    'parquet' pour un fichier Parquet (nécessite pyarrow)
+                    'feather' pour un fichier Feather (nécessite pyarrow)
+                    'npz' pour une archive numpy, une entrée par colonne
+                    'raw' pour un envoi du DataFrame pandas
+            Output :
+                si chemin textuel : aucune sortie, écriture du fichier
+                si chemin du fichier vaut None : retour du stream (BytesIO), ou du DataFrame si 'raw'
+        """
+        
+        if variables is None:
+            variables = self.liste_variables
+        if axes is None:
+            axes = self.liste_axes
+        
+        # Vérification que toutes les variables existent
+        self._verifier_existence_variables(variables)
+        
+        # Empreinte des résultats, pour le cache de rendu et l'index
+        self._actualiser_empreintes(variables)
+        
+        # Vérification que tous les axes existent
+        self._verifier_existence_axes(axes)
+        
+        # Colonnes typées
+        colonnes = self._generer_colonnes_numeriques(variables, axes)
+        colonnes = dict(zip(
+            colonnes.keys(),
+            [np.array(valeurs, dtype = _COLONNES_NUMERIQUES[cle]) for cle, valeurs in colonnes.items()]
+        ))
+        
+        if format_sortie == "raw":
+            return pd.DataFrame(colonnes)
+        
+        f = BytesIO()
+        if format_sortie == "parquet":
+            pd.DataFrame(colonnes).to_parquet(f, index = False)
+        elif format_sortie == "feather":
+            pd.DataFrame(colonnes).to_feather(f)
+        elif format_sortie == "npz":
+            np.savez(f, **colonnes)
+        else:
+            raise Exception("Format de sortie non supporté.")
+        
+        if type(chemin) == type(str()):
+            # On écrit le fichier
+            with open(chemin, "wb") as fichier_sortie:
+                fichier_sortie.write(f.getvalue())
+        else:
+            # On renvoie le buffer
+            f.seek(0)
+            return (f)
+
+# Colonnes de l'export numérique et leur type
+_COLONNES_NUMERIQUES = {
+    "variable":str,
+    "type":str,
+    "axe":str,
+    "modalite":str,
+    "valeur":str,
+    "n":np.int64,
+    "total":np.float64,
+    "mean":np.float64,
+    "std":np.float64,
+    "median":np.float64,
+    "q25":np.float64,
+    "q75":np.float64,
+    "ci_inf":np.float64,
+    "ci_sup":np.float64,
+    "p":np.float64,
+    "r":np.float64,
+    "test":str,
+    "methode":str,
+    "statistic":np.float64,
+    "p_value":np.float64,
+    "cohen_d":np.float64,
+    "hedges_g":np.float64,
+    "eta_carre":np.float64,
+    "odds_ratio":np.float64,
+    "cramer_v":np.float64,
+    "effet_ci_inf":np.float64,
+    "effet_ci_sup":np.float64
+}
+
+# Cache de rendu : empreinte des résultats d'une variable
+
+def _empreinte (objet):
+    
+    """
+        Calcule une empreinte (hash) du contenu d'un résultat
+        Input : objet : résultat, éventuellement imbriqué (dictionnaires, listes, tuples, tableaux numpy)
+    """
+    
+    empreinte = hashlib.blake2b(digest_size = 16)
+    _alimenter_empreinte(empreinte, objet)
+    
+    return empreinte.hexdigest()
+
+def _alimenter_empreinte (empreinte, objet):
+    
+    if isinstance(objet, Mapping):
+        empreinte.update(b"{")
+        for cle, valeur in objet.items():
+            _alimenter_empreinte(empreinte, cle)
+            _alimenter_empreinte(empreinte, valeur)
+        empreinte.update(b"}")
+    elif isinstance(objet, (list, tuple)):
+        empreinte.update(b"[")
+        for valeur in objet:
+            _alimenter_empreinte(empreinte, valeur)
+        empreinte.update(b"]")
+    elif isinstance(objet, np.ndarray):
+        empreinte.update("{}{}".format(objet.dtype, objet.shape).encode())
+        empreinte.update(np.ascontiguousarray(objet).tobytes())
+    else:
+        empreinte.update(repr(objet).encode())
+        empreinte.update(b";")
+
+def _figer (objet):
+    
+    """
+        Convertit des arguments en objet hashable
+    """
+    
+    if isinstance(objet, dict):
+        return tuple((cle, _figer(valeur)) for cle, valeur in objet.items())
+    elif isinstance(objet, (list, tuple)):
+        return tuple(_figer(valeur) for valeur in objet)
+    else:
+        return objet
+
+
+def _generer_paquet (generateur, methode, paquet):
+    
+    """
+        Génère les blocs de lignes d'un paquet d'arguments
+    """
+    
+    return [getattr(generateur, methode)(*x) for x in paquet]
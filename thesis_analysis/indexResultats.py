@@ -0,0 +1,233 @@
+class indexResultats ():
+    """
+        Index des données aggrégées produites par analyseStatistiques.analyse_univarie
+        Construit une seule fois, il permet des recherches en temps constant :
+            variable -> type, modalités de la variable, modalités présentes pour chaque axe, axes quantitatifs corrélés
+            axe -> modalités ordonnées (union sur les variables), présence par variable, type de l'axe
+
+        Input :
+            data : données aggrégées (dictionnaire ou Mapping variable -> résultat)
+    """
+
+    def __init__ (self, data):
+
+        self.data = data
+
+        # Position de chaque variable : test d'existence en O(1)
+        self.variables = dict(zip(data.keys(), range(len(data))))
+
+        # Entrées par variable, construites une seule fois
+        self._entrees = {}
+
+        # Union ordonnée des modalités de chaque axe, mémorisée
+        self._axes = None
+        self._modalites_axes = {}
+        self._axes_quantitatifs = None
+
+        # Pour un dictionnaire les résultats sont déjà en mémoire : on indexe tout immédiatement
+        if isinstance(data, dict):
+            for variable in self.variables:
+                self.variable(variable)
+
+    def _construire_entree (self, variable):
+
+        """
+            Construit l'entrée d'index d'une variable
+            Input : variable : nom de la variable
+            Output : dictionnaire type, modalites, axes
+        """
+
+        resultat = self.data[variable]
+
+        entree = {}
+        entree["type"] = resultat["type"]
+
+        # Modalités de la variable (qualitative uniquement)
+        if entree["type"] == "qualitative":
+            entree["modalites"] = [x for x in resultat["global"].keys() if x != "total"]
+        else:
+            entree["modalites"] = []
+
+        # Modalités de chaque axe, dans l'ordre des résultats, et ensemble pour la présence
+        entree["axes"] = {}
+        if "sous_groupes" in resultat:
+            for axe, donnees_axe in resultat["sous_groupes"].items():
+                modalites = list(donnees_axe.keys())
+                entree["axes"][axe] = {
+                    "modalites":modalites,
+                    "presentes":set(modalites)
+                }
+
+        # Axes quantitatifs : corrélations, sans modalités
+        entree["correlations"] = list(resultat["correlation"].keys()) if "correlation" in resultat else []
+
+        return entree
+
+    def variable (self, variable):
+
+        """
+            Retourne l'entrée d'index d'une variable
+            Input : variable : nom de la variable
+        """
+
+        if variable not in self._entrees:
+            self._entrees[variable] = self._construire_entree(variable)
+
+        return self._entrees[variable]
+
+    def invalider (self, variable):
+
+        """
+            Reconstruit l'entrée d'une variable dont les résultats ont changé
+            Les axes, leurs modalités et les axes quantitatifs ne sont mis à jour que pour ce qui diffère de l'ancienne entrée
+            Input : variable : nom de la variable
+        """
+
+        ancienne = self._entrees.pop(variable, None)
+
+        # Entrée jamais construite : aucune union ne la contient
+        if ancienne is None:
+            return None
+
+        entree = self.variable(variable)
+
+        # Union des modalités : oubliée uniquement pour les axes dont les modalités de la variable ont changé
+        for axe in set(ancienne["axes"].keys()) | set(entree["axes"].keys()):
+            if ancienne["axes"].get(axe, {}).get("modalites") != entree["axes"].get(axe, {}).get("modalites"):
+                self._modalites_axes.pop(axe, None)
+
+        # Axes : ajout des axes apparus, retrait des axes disparus qui ne sont plus présents dans aucune variable
+        anciens_axes = list(ancienne["axes"].keys()) + ancienne["correlations"]
+        nouveaux_axes = list(entree["axes"].keys()) + entree["correlations"]
+
+        if self._axes is not None and getattr(self.data, "axes", None) is None:
+            for axe in nouveaux_axes:
+                self._axes.setdefault(axe, len(self._axes))
+
+            disparus = [x for x in anciens_axes if x not in nouveaux_axes and not self._axe_present(x)]
+            if len(disparus) > 0:
+                axes = [x for x in self._axes.keys() if x not in disparus]
+                self._axes = dict(zip(axes, range(len(axes))))
+
+        if self._axes_quantitatifs is not None and getattr(self.data, "axes_quantitatifs", None) is None:
+            self._axes_quantitatifs.update(entree["correlations"])
+
+            for axe in ancienne["correlations"]:
+                if axe not in entree["correlations"] and not self._axe_present(axe, "correlations"):
+                    self._axes_quantitatifs.discard(axe)
+
+    def _axe_present (self, axe, cle = None):
+
+        """
+            Indique si un axe est présent dans au moins une entrée construite
+            Input :
+                axe : nom de l'axe
+                cle : "axes" ou "correlations", les deux si None
+        """
+
+        cles = ["axes", "correlations"] if cle is None else [cle]
+
+        return any([axe in entree[x] for entree in self._entrees.values() for x in cles])
+
+    @property
+    def axes (self):
+
+        """
+            Axes d'analyse présents dans les données, dans l'ordre de première apparition
+        """
+
+        if self._axes is None:
+            axes = getattr(self.data, "axes", None)
+
+            if axes is None:
+                axes = {}
+                for variable in self.variables:
+                    for axe in list(self.variable(variable)["axes"].keys()) + self.variable(variable)["correlations"]:
+                        axes.setdefault(axe, len(axes))
+
+            self._axes = dict(zip(axes, range(len(axes))))
+
+        return self._axes
+
+    def modalites_axe (self, axe, variables = None):
+
+        """
+            Retourne l'union ordonnée des modalités d'un axe
+            Input :
+                axe : nom de l'axe
+                variables : liste des variables considérées, toutes si None
+        """
+
+        if variables is None and axe in self._modalites_axes:
+            return self._modalites_axes[axe]
+
+        modalites = {}
+        for variable in (self.variables if variables is None else variables):
+            entree_axe = self.variable(variable)["axes"].get(axe)
+            if entree_axe is not None:
+                for modalite in entree_axe["modalites"]:
+                    modalites.setdefault(modalite, None)
+        modalites = list(modalites.keys())
+
+        if variables is None:
+            self._modalites_axes[axe] = modalites
+
+        return modalites
+
+    def modalite_presente (self, variable, axe, modalite):
+
+        """
+            Indique si une modalité d'axe est décrite pour une variable
+        """
+
+        entree_axe = self.variable(variable)["axes"].get(axe)
+
+        return entree_axe is not None and modalite in entree_axe["presentes"]
+
+    @property
+    def axes_quantitatifs (self):
+
+        """
+            Axes quantitatifs (corrélations) d'au moins une variable
+            Ils sont lus dans les métadonnées des résultats (résultats différés ou stockés),
+            les variables ne sont alors ni calculées ni décodées
+        """
+
+        if self._axes_quantitatifs is None:
+            axes_quantitatifs = getattr(self.data, "axes_quantitatifs", None)
+
+            if axes_quantitatifs is None:
+                axes_quantitatifs = set()
+                for variable in self.variables:
+                    axes_quantitatifs.update(self.variable(variable)["correlations"])
+
+            self._axes_quantitatifs = set(axes_quantitatifs)
+
+        return self._axes_quantitatifs
+
+    def axe_quantitatif (self, axe):
+
+        """
+            Indique si un axe est quantitatif (corrélations) pour au moins une variable
+        """
+
+        return axe in self.axes_quantitatifs
+
+    def restreindre (self, variables):
+
+        """
+            Index limité aux résultats de quelques variables, transmis à un autre processus
+            Les axes, les unions de modalités déjà calculées et les axes quantitatifs de l'ensemble des résultats sont conservés
+            Input : variables : liste des variables
+            Output : indexResultats
+        """
+
+        index = indexResultats.__new__(indexResultats)
+        index.data = dict([(variable, self.data[variable]) for variable in variables])
+        index.variables = dict(zip(index.data.keys(), range(len(index.data))))
+        index._entrees = dict([(variable, self.variable(variable)) for variable in variables])
+        index._axes = dict(self.axes)
+        index._modalites_axes = dict(self._modalites_axes)
+        index._axes_quantitatifs = set(self.axes_quantitatifs)
+
+        return index
@@ -0,0 +1,378 @@
+"""
+    Puissance par simulation de l'arbre de décision des tests (testQuantitatif.best_test et testQualitatif.best_test)
+    Pour chaque taille d'échantillon, les jeux de données simulés sont tirés par lots dans des tableaux (répliques, sujets)
+    et chaque étape de l'arbre (normalité, égalité des variances, test retenu) est évaluée pour toutes les répliques à la fois.
+    Chaque taille a son propre générateur, dérivé de la graine : une courbe est reproductible quelle que soit la grille.
+"""
+
+import math
+import numpy as np
+from scipy.special import ndtr
+from scipy.stats import rankdata, f as loi_f, t as loi_t, chi2 as loi_khi2
+from .aleatoire import generateur as generateur_aleatoire
+from .test import testQualitatif, fisher_exact_lot, politique_taille
+from .test.normalite import normalite_repliques
+from .test.exact import distribution_mann_whitney
+
+_LOIS = ["normale", "lognormale"]
+
+def puissance_quantitative (moyennes, ecarts_types, tailles, proportions = None, loi = "normale", n_simulations = 2000,
+                            alpha = 0.05, normal = None, seed = None, politique = None, taille_lot = 2**22):
+
+    """
+        Puissance du test choisi par testQuantitatif.best_test, pour une grille de tailles d'échantillon
+        Input :
+            moyennes, ecarts_types : moyenne et écart type de la variable dans chaque groupe (modalité de l'axe)
+            tailles : liste des effectifs totaux à évaluer
+            proportions : part de l'effectif total dans chaque groupe, groupes de même taille si None
+            loi : "normale" ou "lognormale" (de moyennes et écarts types donnés, moyennes positives)
+            n_simulations : nombre de jeux de données simulés par taille
+            alpha : risque de première espèce
+            normal : si True, la normalité est supposée sans test (best_test(normal = True))
+            seed : graine, None pour une graine aléatoire
+            politique : seuils de la politique de taille (politique_taille)
+            taille_lot : nombre maximal de valeurs simulées à la fois
+        Output : dictionnaire taille -> {"puissance", "erreur_standard", "effectifs", "tests"}
+            effectifs : effectif de chaque groupe
+            tests : test retenu -> proportion des simulations
+    """
+
+    if loi not in _LOIS:
+        raise Exception("Loi de simulation inconnue : {}".format(loi))
+    if len(moyennes) != len(ecarts_types) or len(moyennes) < 2:
+        raise Exception("Une moyenne et un écart type sont attendus pour chacun des groupes (au moins deux)")
+
+    moyennes = np.asarray(moyennes, dtype = np.float64)
+    ecarts_types = np.asarray(ecarts_types, dtype = np.float64)
+    politique = politique_taille(politique)
+
+    # Paramètres de la loi log-normale de mêmes moyennes et écarts types
+    if loi == "lognormale":
+        if (moyennes <= 0).any():
+            raise Exception("La loi log-normale nécessite des moyennes positives")
+        sigma = np.sqrt(np.log(1 + (ecarts_types/moyennes)**2))
+        mu = np.log(moyennes) - sigma**2/2
+
+    def simuler (generateur, effectifs, taille):
+        if loi == "normale":
+            return [generateur.normal(moyennes[g], ecarts_types[g], (taille, n)) for g, n in enumerate(effectifs)]
+        return [generateur.lognormal(mu[g], sigma[g], (taille, n)) for g, n in enumerate(effectifs)]
+
+    def tester (generateur, groupes, effectifs):
+        return _arbre_quantitatif(groupes, effectifs, normal, politique)
+
+    return _courbe(tailles, proportions, len(moyennes), simuler, tester, n_simulations, alpha, seed, "quantitative", taille_lot)
+
+def puissance_qualitative (probabilites, tailles, proportions = None, n_simulations = 2000, alpha = 0.05, n_monte_carlo = 1000,
+                           seed = None, taille_lot = 2**22):
+
+    """
+        Puissance du test choisi par testQualitatif.best_test, pour une grille de tailles d'échantillon
+        Input :
+            probabilites : pour chaque groupe (modalité de l'axe), probabilités des modalités de la variable
+            tailles : liste des effectifs totaux à évaluer
+            proportions : part de l'effectif total dans chaque groupe, groupes de même taille si None
+            n_simulations : nombre de jeux de données simulés par taille
+            alpha : risque de première espèce
+            n_monte_carlo : nombre de tableaux simulés du test de Fisher par Monte Carlo (tableaux r x c hors conditions du Khi-2)
+            seed : graine, None pour une graine aléatoire
+            taille_lot : nombre maximal de cellules simulées à la fois
+        Output : dictionnaire taille -> {"puissance", "erreur_standard", "effectifs", "tests"}, voir puissance_quantitative
+    """
+
+    probabilites = np.asarray(probabilites, dtype = np.float64)
+    if probabilites.ndim != 2 or min(probabilites.shape) < 2:
+        raise Exception("Les probabilités attendues sont un tableau groupes x modalités, d'au moins deux lignes et deux colonnes")
+    probabilites = probabilites/probabilites.sum(axis = 1, keepdims = True)
+
+    def simuler (generateur, effectifs, taille):
+        # Tableaux de contingence (répliques, groupes, modalités), une loi multinomiale par groupe
+        return np.stack([generateur.multinomial(n, probabilites[g], size = taille) for g, n in enumerate(effectifs)], axis = 1)
+
+    def tester (generateur, tables, effectifs):
+        return _arbre_qualitatif(tables, n_monte_carlo, generateur)
+
+    # Un tableau de contingence par réplique
+    return _courbe(
+        tailles, proportions, probabilites.shape[0], simuler, tester, n_simulations, alpha, seed, "qualitative", taille_lot,
+        largeur = probabilites.size
+    )
+
+def taille_minimale (courbe, puissance_cible = 0.8):
+
+    """
+        Plus petite taille de la grille atteignant la puissance visée
+        Input :
+            courbe : résultat de puissance_quantitative ou puissance_qualitative
+            puissance_cible : puissance visée
+        Output : taille d'échantillon, None si aucune taille de la grille n'atteint la puissance visée
+    """
+
+    tailles = [taille for taille, resultat in sorted(courbe.items()) if resultat["puissance"] >= puissance_cible]
+
+    return tailles[0] if len(tailles) > 0 else None
+
+def _effectifs (taille, proportions, k):
+
+    """
+        Effectif de chaque groupe pour un effectif total : arrondi des proportions, le reste au plus grand groupe
+    """
+
+    if proportions is None:
+        proportions = np.ones(k)
+    proportions = np.asarray(proportions, dtype = np.float64)
+    if proportions.shape[0] != k:
+        raise Exception("Une proportion est attendue pour chacun des {} groupes".format(k))
+
+    proportions = proportions/proportions.sum()
+    effectifs = np.floor(taille*proportions).astype(np.int64)
+    effectifs[np.argmax(proportions)] += int(taille) - effectifs.sum()
+
+    return effectifs
+
+def _courbe (tailles, proportions, k, simuler, tester, n_simulations, alpha, seed, type_variable, taille_lot, largeur = None):
+
+    """
+        Simule n_simulations jeux de données pour chaque taille, par lots, et compte les rejets au risque alpha
+        Input :
+            simuler : fonction (générateur, effectifs, répliques) -> données simulées du lot
+            tester : fonction (générateur, données, effectifs) -> nom du test retenu et p-value de chaque réplique
+            largeur : nombre de valeurs simulées par réplique, l'effectif total si None
+    """
+
+    # Graine commune : tirée une fois si absente, pour que toutes les tailles en dérivent
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    courbe = {}
+    for taille in tailles:
+
+        effectifs = _effectifs(taille, proportions, k)
+        generateur = generateur_aleatoire(seed, ("puissance", type_variable, int(taille)))
+
+        rejets = 0
+        tests = {}
+        taille_lot_repliques = max(1, taille_lot//max(int(taille if largeur is None else largeur), 1))
+
+        for debut in range(0, n_simulations, taille_lot_repliques):
+
+            repliques = min(taille_lot_repliques, n_simulations - debut)
+            noms, p_values = tester(generateur, simuler(generateur, effectifs, repliques), effectifs)
+
+            # Absence de test ou p-value indéfinie : pas de rejet
+            rejets += int(np.sum(p_values < alpha))
+            for nom, nombre in zip(*np.unique(noms, return_counts = True)):
+                tests[str(nom)] = tests.get(str(nom), 0) + int(nombre)
+
+        puissance = rejets/n_simulations
+        courbe[int(taille)] = {
+            "puissance":puissance,
+            "erreur_standard":math.sqrt(puissance*(1 - puissance)/n_simulations),
+            "effectifs":[int(x) for x in effectifs],
+            "tests":dict([(nom, nombre/n_simulations) for nom, nombre in tests.items()])
+        }
+
+    return courbe
+
+def _arbre_quantitatif (groupes, effectifs, normal, politique):
+
+    """
+        Arbre de décision de testQuantitatif.best_test évalué pour toutes les répliques
+        Input :
+            groupes : liste (une par groupe) de tableaux (répliques, n_g)
+            effectifs : effectif de chaque groupe
+        Output : nom du test retenu et p-value, tableaux (répliques,)
+    """
+
+    repliques = groupes[0].shape[0]
+    k = len(groupes)
+    n = effectifs.astype(np.float64)
+    N = n.sum()
+
+    moyennes = np.stack([x.mean(axis = 1) for x in groupes], axis = 1)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        variances = np.stack([x.var(axis = 1, ddof = 1) for x in groupes], axis = 1)
+
+    noms = np.empty(repliques, dtype = object)
+    p_values = np.full(repliques, np.nan)
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+
+        if k == 2 and (effectifs >= 30).all():
+            # Z-test (variance commune)
+            variance_commune = ((n[0] - 1)*variances[:, 0] + (n[1] - 1)*variances[:, 1])/(N - 2)
+            noms[:] = "z_test"
+            p_values[:] = 2*ndtr(-np.abs((moyennes[:, 0] - moyennes[:, 1])/np.sqrt(variance_commune*(1/n[0] + 1/n[1]))))
+            return noms, p_values
+
+        # Normalité de tous les groupes (Shapiro-Wilk ou D'Agostino), les groupes non testables ne sont pas supposés normaux
+        normaux = np.ones(repliques, dtype = bool)
+        if not normal:
+            for x in groupes:
+                normaux &= normalite_repliques(x) >= 0.05
+
+        # Test de Levene centré sur la moyenne : ANOVA des écarts absolus à la moyenne du groupe
+        ecarts = [np.abs(x - moyennes[:, [g]]) for g, x in enumerate(groupes)]
+        p_levene = _anova(
+            np.stack([x.mean(axis = 1) for x in ecarts], axis = 1),
+            np.stack([x.var(axis = 1, ddof = 1) for x in ecarts], axis = 1),
+            n
+        )
+        egalite_variances = p_levene >= 0.05
+
+        if k == 2:
+
+            n1, n2 = n
+            variance_commune = ((n1 - 1)*variances[:, 0] + (n2 - 1)*variances[:, 1])/(N - 2)
+            difference = moyennes[:, 0] - moyennes[:, 1]
+
+            # t-test
+            t_test = normaux & egalite_variances
+            noms[t_test] = "t_test"
+            p_values[t_test] = (2*loi_t.sf(np.abs(difference/np.sqrt(variance_commune*(1/n1 + 1/n2))), N - 2))[t_test]
+
+            # Test de Welch
+            welch = normaux & ~egalite_variances
+            v1, v2 = variances[:, 0]/n1, variances[:, 1]/n2
+            ddl = (v1 + v2)**2/(v1**2/(n1 - 1) + v2**2/(n2 - 1))
+            noms[welch] = "t_test Welch"
+            p_values[welch] = (2*loi_t.sf(np.abs(difference/np.sqrt(v1 + v2)), ddl))[welch]
+
+            # Mann-Whitney Wilcoxon
+            rangs = ~normaux
+            if rangs.any():
+                noms[rangs] = "Mann-Whitney Wilcoxon"
+                p_values[rangs] = _mann_whitney([x[rangs] for x in groupes], effectifs, politique)
+        else:
+            # ANOVA
+            anova = normaux & egalite_variances
+            noms[anova] = "ANOVA_1W"
+            p_values[anova] = _anova(moyennes, variances, n)[anova]
+
+            # Kruskal-Wallis
+            rangs = ~anova
+            if rangs.any():
+                noms[rangs] = "Kurskal_Wallis"
+                p_values[rangs] = _kruskal_wallis([x[rangs] for x in groupes], effectifs)
+
+    return noms, p_values
+
+def _anova (moyennes, variances, n):
+
+    """
+        p-value de l'ANOVA à un facteur à partir des moyennes et variances de chaque groupe, tableaux (répliques, k)
+    """
+
+    k = moyennes.shape[1]
+    N = n.sum()
+
+    moyenne_globale = (moyennes*n).sum(axis = 1, keepdims = True)/N
+    inter = (n*(moyennes - moyenne_globale)**2).sum(axis = 1)
+    intra = ((n - 1)*variances).sum(axis = 1)
+
+    return loi_f.sf((inter/(k - 1))/(intra/(N - k)), k - 1, N - k)
+
+def _rangs (groupes):
+
+    """
+        Rangs de toutes les répliques, calculés sur l'ensemble des sujets, et somme des rangs de chaque groupe
+    """
+
+    rangs = rankdata(np.concatenate(groupes, axis = 1), axis = 1)
+    bornes = np.cumsum([0] + [x.shape[1] for x in groupes])
+
+    return np.stack([rangs[:, bornes[g]:bornes[g + 1]].sum(axis = 1) for g in range(len(groupes))], axis = 1)
+
+def _mann_whitney (groupes, effectifs, politique, seuil_exact = 8):
+
+    """
+        p-value de Mann-Whitney (mêmes règles que testQuantitatif.mwwilcoxon) pour des données continues, sans ex-aequo
+    """
+
+    n1, n2 = int(effectifs[0]), int(effectifs[1])
+    u1 = _rangs(groupes)[:, 0] - n1*(n1 + 1)/2
+    u = np.maximum(u1, n1*n2 - u1)
+
+    if min(n1, n2) <= seuil_exact and n1 + n2 <= politique["exact_max"] and n1*n2 < 2**22:
+        # Distribution exacte mise en cache, P(U >= u) = P(U <= n1.n2 - u)
+        p_value = 2*distribution_mann_whitney(min(n1, n2), max(n1, n2))[np.round(n1*n2 - u).astype(np.int64)]
+    else:
+        ecart_type = np.sqrt(n1*n2*(n1 + n2 + 1)/12)
+        p_value = 2*ndtr(-(u - n1*n2/2 - 0.5)/ecart_type)
+
+    return np.clip(p_value, 0, 1)
+
+def _kruskal_wallis (groupes, effectifs):
+
+    """
+        p-value de Kruskal-Wallis pour des données continues, sans ex-aequo
+    """
+
+    n = effectifs.astype(np.float64)
+    N = n.sum()
+
+    H = 12/(N*(N + 1))*(_rangs(groupes)**2/n).sum(axis = 1) - 3*(N + 1)
+
+    return loi_khi2.sf(H, len(groupes) - 1)
+
+def _arbre_qualitatif (tables, n_monte_carlo, generateur):
+
+    """
+        Arbre de décision de testQualitatif.best_test évalué pour toutes les répliques
+        Comme dans les analyses, seules les modalités présentes de chaque tableau sont conservées
+        Input :
+            tables : tableaux de contingence (répliques, r, c)
+        Output : nom du test retenu et p-value, tableaux (répliques,)
+    """
+
+    repliques = tables.shape[0]
+    tables = tables.astype(np.float64)
+
+    lignes = tables.sum(axis = 2)
+    colonnes = tables.sum(axis = 1)
+    N = tables.sum(axis = (1, 2))
+    presentes = (lignes > 0)[:, :, np.newaxis] & (colonnes > 0)[:, np.newaxis, :]
+    n_lignes, n_colonnes = (lignes > 0).sum(axis = 1), (colonnes > 0).sum(axis = 1)
+    ddl = (n_lignes - 1)*(n_colonnes - 1)
+
+    noms = np.full(repliques, "no_test", dtype = object)
+    p_values = np.full(repliques, np.nan)
+    a_tester = np.minimum(n_lignes, n_colonnes) >= 2
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+
+        attendus = lignes[:, :, np.newaxis]*colonnes[:, np.newaxis, :]/N[:, np.newaxis, np.newaxis]
+        minimum_attendu = np.where(presentes, attendus, np.inf).min(axis = (1, 2))
+
+        # 1. Khi-2
+        khi2 = a_tester & (minimum_attendu >= 5)
+        statistique = np.where(presentes, (tables - attendus)**2/attendus, 0).sum(axis = (1, 2))
+        noms[khi2] = "khi2"
+        p_values[khi2] = loi_khi2.sf(statistique, ddl)[khi2]
+
+        # 2. Khi-2 avec correction de Yates (un degré de liberté)
+        yates = a_tester & ~khi2 & (minimum_attendu >= 3) & (ddl == 1)
+        ecarts = np.maximum(np.abs(tables - attendus) - 0.5, 0)
+        statistique = np.where(presentes, ecarts**2/attendus, 0).sum(axis = (1, 2))
+        noms[yates] = "khi2_yates"
+        p_values[yates] = loi_khi2.sf(statistique, 1)[yates]
+
+    # Tableaux compactés : modalités présentes en premier
+    restants = a_tester & ~khi2 & ~yates
+    compactes = np.take_along_axis(tables, np.argsort(lignes == 0, axis = 1, kind = "stable")[:, :, np.newaxis], axis = 1)
+    compactes = np.take_along_axis(compactes, np.argsort(colonnes == 0, axis = 1, kind = "stable")[:, np.newaxis, :], axis = 2)
+
+    # 3. Fisher (tableau 2x2), en un lot
+    fisher = restants & (n_lignes == 2) & (n_colonnes == 2)
+    if fisher.any():
+        noms[fisher] = "fisher"
+        p_values[fisher] = fisher_exact_lot(compactes[fisher][:, :2, :2])[1]
+
+    # 4. Fisher par simulation de Monte Carlo (tableau r x c)
+    for i in np.flatnonzero(restants & ~fisher):
+        contingence = compactes[i, :n_lignes[i], :n_colonnes[i]].astype(np.int64)
+        resultat = testQualitatif.depuis_contingence(contingence).fisher_monte_carlo(n_monte_carlo, generateur)
+        noms[i] = "fisher_monte_carlo"
+        p_values[i] = resultat["p_value"]
+
+    return noms, p_values
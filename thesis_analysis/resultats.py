@@ -0,0 +1,241 @@
+"""
+    Conteneurs compacts des descriptions produites par analyseStatistiques
+    Ils utilisent __slots__ et se lisent comme les dictionnaires qu'ils remplacent :
+        description["mean"], description.keys(), "total" in description, ...
+"""
+
+from collections.abc import Mapping
+import threading
+
+class descriptionQuantitative (Mapping):
+    """
+        Description d'une variable quantitative
+            n, mean, median, Q25, Q75, std, std_mean, ci_95
+    """
+
+    __slots__ = ("n", "mean", "median", "Q25", "Q75", "std", "std_mean", "ci_95")
+
+    def __init__ (self, n, mean, median, Q25, Q75, std, std_mean, ci_95):
+
+        self.n = n
+        self.mean = mean
+        self.median = median
+        self.Q25 = Q25
+        self.Q75 = Q75
+        self.std = std
+        self.std_mean = std_mean
+        self.ci_95 = ci_95
+
+    def __getitem__ (self, cle):
+
+        if cle not in self.__slots__:
+            raise KeyError(cle)
+
+        return getattr(self, cle)
+
+    def __iter__ (self):
+
+        return iter(self.__slots__)
+
+    def __len__ (self):
+
+        return len(self.__slots__)
+
+    def __repr__ (self):
+
+        return repr(dict(self.items()))
+
+class modaliteQualitative (Mapping):
+    """
+        Effectif et proportion d'une modalité d'une variable qualitative
+            n, p
+    """
+
+    __slots__ = ("n", "p")
+
+    def __init__ (self, n, p):
+
+        self.n = n
+        self.p = p
+
+    def __getitem__ (self, cle):
+
+        if cle not in self.__slots__:
+            raise KeyError(cle)
+
+        return getattr(self, cle)
+
+    def __iter__ (self):
+
+        return iter(self.__slots__)
+
+    def __len__ (self):
+
+        return len(self.__slots__)
+
+    def __repr__ (self):
+
+        return repr(dict(self.items()))
+
+class descriptionQualitative (Mapping):
+    """
+        Description d'une variable qualitative
+        Se lit comme un dictionnaire modalité -> {"n", "p"}, avec une clé "total"
+
+        Input :
+            modalites : liste des modalités
+            effectifs : tableau numpy des effectifs de chaque modalité
+    """
+
+    __slots__ = ("modalites", "effectifs", "total", "_positions")
+
+    def __init__ (self, modalites, effectifs):
+
+        self.modalites = modalites
+        self.effectifs = effectifs
+        self.total = effectifs.sum()
+        self._positions = None
+
+    def _position (self, modalite):
+
+        # Position de chaque modalité, construite à la première recherche
+        if self._positions is None:
+            self._positions = dict(zip(self.modalites, range(len(self.modalites))))
+
+        return self._positions.get(modalite)
+
+    def __getitem__ (self, cle):
+
+        if isinstance(cle, str) and cle == "total":
+            return self.total
+
+        position = self._position(cle)
+        if position is None:
+            raise KeyError(cle)
+
+        return modaliteQualitative(
+            self.effectifs[position],
+            self.effectifs[position]/self.total
+        )
+
+    def __contains__ (self, cle):
+
+        return (isinstance(cle, str) and cle == "total") or self._position(cle) is not None
+
+    def __iter__ (self):
+
+        yield from self.modalites
+        yield "total"
+
+    def __len__ (self):
+
+        return len(self.modalites) + 1
+
+    def __repr__ (self):
+
+        return repr(dict(self.items()))
+
+class resultatsDifferes (Mapping):
+    """
+        Résultats d'une analyse calculés à la demande
+        Chaque variable est analysée au premier accès puis conservée.
+        Utilisable directement par genererTableau.
+
+        Input :
+            calculer : fonction (variable, type_variable) -> résultat de la variable
+            variables : dictionnaire variable -> type de variable
+            axes : liste des axes d'analyse
+            axes_quantitatifs : liste des axes quantitatifs (corrélations), inclus dans axes
+            prefetch : si True, les variables sont calculées en arrière plan dans l'ordre de variables
+    """
+
+    def __init__ (self, calculer, variables, axes = None, prefetch = False, axes_quantitatifs = None):
+
+        self._calculer = calculer
+        self._variables = dict(variables)
+        self.axes = [] if axes is None else list(axes)
+        self.axes_quantitatifs = [] if axes_quantitatifs is None else list(axes_quantitatifs)
+
+        self._resultats = {}
+        self._verrous = dict(zip(
+            self._variables.keys(),
+            [threading.Lock() for x in self._variables]
+        ))
+
+        # Calcul en arrière plan
+        self._arret = False
+        self._prefetch = None
+        if prefetch:
+            self._prefetch = threading.Thread(target = self._prefetcher, daemon = True)
+            self._prefetch.start()
+
+    def _prefetcher (self):
+
+        for variable in self._variables:
+            if self._arret:
+                break
+            try:
+                self[variable]
+            except Exception:
+                # L'erreur sera levée à l'accès à la variable
+                pass
+
+    def arreter_prefetch (self):
+
+        """
+            Arrête le calcul en arrière plan après la variable en cours
+        """
+
+        self._arret = True
+
+    def __getitem__ (self, variable):
+
+        if variable in self._resultats:
+            return self._resultats[variable]
+
+        if variable not in self._variables:
+            raise KeyError(variable)
+
+        # Un seul calcul par variable, y compris avec le calcul en arrière plan
+        with self._verrous[variable]:
+            if variable not in self._resultats:
+                self._resultats[variable] = self._calculer(variable, self._variables[variable])
+
+        return self._resultats[variable]
+
+    def __iter__ (self):
+
+        return iter(self._variables)
+
+    def __len__ (self):
+
+        return len(self._variables)
+
+    def __contains__ (self, variable):
+
+        return variable in self._variables
+
+    def calcules (self):
+
+        """
+            Liste des variables déjà calculées
+        """
+
+        return [x for x in self._variables if x in self._resultats]
+
+    def materialize (self):
+
+        """
+            Calcule toutes les variables restantes
+            Output : dictionnaire variable -> résultat
+        """
+
+        return dict(zip(
+            self._variables.keys(),
+            [self[x] for x in self._variables]
+        ))
+
+    def __reduce__ (self):
+
+        # Transmis à un autre processus sous forme de dictionnaire complet
+        return (dict, (self.materialize(),))
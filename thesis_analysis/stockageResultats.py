@@ -0,0 +1,326 @@
+"""
+    Stockage binaire des résultats de analyseStatistiques.analyse_univarie
+
+    Format du fichier :
+        - signature (8 octets)
+        - taille de l'en-tête (entier 64 bits)
+        - en-tête JSON : version, axes, axes quantitatifs, table des clés, liste des variables avec la position de leur structure et de leurs valeurs
+        - structures JSON de chaque variable, les nombres y sont remplacés par leur position dans les valeurs
+          (un entier nu désigne un flottant, {"e":position} un entier 64 bits) et les clés par leur position dans la table des clés
+          Les entiers hors de l'intervalle des entiers 64 bits (graines 128 bits) sont écrits tels quels : {"j":valeur}
+        - données binaires alignées sur 8 octets : pour chaque variable chaque tableau numpy de manière contigüe
+          dans son type d'origine, puis un vecteur float64 des valeurs scalaires et un vecteur int64 des entiers
+
+    La lecture projette les données binaires en mémoire (memmap) : seules les variables lues sont décodées.
+"""
+
+from collections.abc import Mapping
+import json
+import struct
+import numpy as np
+
+_SIGNATURE = b"THESRES1"
+_VERSION = 2
+
+_INT64_MIN, _INT64_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+def _encoder_cle (cle):
+
+    """
+        Encode une clé de dictionnaire (modalité) en conservant son type
+    """
+
+    if isinstance(cle, str):
+        return cle
+    elif cle is None:
+        return None
+    elif isinstance(cle, (bool, np.bool_)):
+        return {"B":bool(cle)}
+    elif isinstance(cle, (int, np.integer)):
+        return {"I":int(cle)}
+    elif isinstance(cle, (float, np.floating)):
+        return {"F":float(cle)}
+    elif isinstance(cle, tuple):
+        return {"T":[_encoder_cle(x) for x in cle]}
+    else:
+        raise Exception("Type de clé non supporté : {}".format(type(cle)))
+
+def _decoder_cle (cle):
+
+    if cle is None or isinstance(cle, str):
+        return cle
+    elif "B" in cle:
+        return cle["B"]
+    elif "I" in cle:
+        return cle["I"]
+    elif "F" in cle:
+        return cle["F"]
+    else:
+        return tuple(_decoder_cle(x) for x in cle["T"])
+
+class _encodeurVariable ():
+    """
+        Encode le résultat d'une variable : structure JSON, valeurs scalaires et tableaux
+            position_tableaux : position courante dans les données binaires
+            cles : table des clés partagée entre les variables, (type, clé) -> position
+    """
+
+    def __init__ (self, position_tableaux, cles):
+
+        self.scalaires = []
+        self.entiers = []
+        self.tableaux = []
+        self.position = position_tableaux
+        self.cles = cles
+
+    def _position_cle (self, cle):
+
+        # Le type distingue 1, 1.0 et True, égaux pour un dictionnaire
+        cle = (type(cle), cle)
+
+        if cle not in self.cles:
+            self.cles[cle] = len(self.cles)
+
+        return self.cles[cle]
+
+    def encoder (self, objet):
+
+        # Cas les plus fréquents : flottants et dictionnaires
+        type_objet = type(objet)
+        if type_objet is float or type_objet is np.float64:
+            self.scalaires.append(objet)
+            return len(self.scalaires)-1
+        elif type_objet is dict:
+            return {"m":[[self._position_cle(cle), self.encoder(valeur)] for cle, valeur in objet.items()]}
+
+        if isinstance(objet, Mapping):
+            return {"m":[[self._position_cle(cle), self.encoder(valeur)] for cle, valeur in objet.items()]}
+        elif isinstance(objet, list):
+            return {"l":[self.encoder(x) for x in objet]}
+        elif isinstance(objet, tuple):
+            return {"t":[self.encoder(x) for x in objet]}
+        elif isinstance(objet, np.ndarray):
+            tableau = np.ascontiguousarray(objet)
+            reference = {"a":[self.position, tableau.dtype.str, list(tableau.shape)]}
+            self.tableaux.append(tableau)
+            self.position += _aligner(tableau.nbytes)
+            return reference
+        elif objet is None or isinstance(objet, (str, bool, np.bool_)):
+            return objet if not isinstance(objet, np.bool_) else bool(objet)
+        elif isinstance(objet, (int, np.integer)):
+            # Entiers conservés exactement : vecteur int64, ou valeur JSON au-delà de 64 bits
+            objet = int(objet)
+            if objet < _INT64_MIN or objet > _INT64_MAX:
+                return {"j":objet}
+            self.entiers.append(objet)
+            return {"e":len(self.entiers)-1}
+        elif isinstance(objet, (float, np.floating)):
+            self.scalaires.append(objet)
+            return len(self.scalaires)-1
+        else:
+            raise Exception("Type de valeur non supporté : {}".format(type(objet)))
+
+def _aligner (taille):
+
+    return taille + (-taille) % 8
+
+def sauvegarder_resultats (resultats, chemin):
+
+    """
+        Sauvegarde les résultats d'une analyse dans un fichier binaire compact
+        Input :
+            resultats : dictionnaire produit par analyseStatistiques.analyse_univarie
+            chemin : chemin du fichier de sortie
+    """
+
+    structures = []
+    blocs = []
+    variables = []
+    position_structure = 0
+    position_binaire = 0
+    axes = {}
+    axes_quantitatifs = {}
+    cles = {}
+
+    for variable, resultat in resultats.items():
+
+        # Les tableaux de la variable sont écrits en premier, suivis de ses valeurs scalaires puis de ses entiers
+        encodeur = _encodeurVariable(position_binaire, cles)
+        structure = json.dumps(encodeur.encoder(resultat), separators = (",", ":")).encode("utf-8")
+
+        scalaires = np.array(encodeur.scalaires, dtype = np.float64)
+        entiers = np.array(encodeur.entiers, dtype = np.int64)
+        position_scalaires = encodeur.position
+        position_entiers = position_scalaires + scalaires.nbytes
+
+        blocs.extend(encodeur.tableaux)
+        blocs.append(scalaires)
+        blocs.append(entiers)
+        position_binaire = position_entiers + entiers.nbytes
+
+        variables.append([
+            _encoder_cle(variable),
+            position_structure, len(structure),
+            position_scalaires, scalaires.shape[0],
+            position_entiers, entiers.shape[0]
+        ])
+        structures.append(structure)
+        position_structure += len(structure)
+
+        for cle in ["sous_groupes", "correlation"]:
+            if cle in resultat:
+                for axe in resultat[cle].keys():
+                    axes.setdefault(axe, None)
+                    if cle == "correlation":
+                        axes_quantitatifs.setdefault(axe, None)
+
+    en_tete = json.dumps({
+        "version":_VERSION,
+        "axes":[_encoder_cle(x) for x in axes.keys()],
+        "axes_quantitatifs":[_encoder_cle(x) for x in axes_quantitatifs.keys()],
+        "cles":[_encoder_cle(x[1]) for x in cles.keys()],
+        "variables":variables
+    }, separators = (",", ":")).encode("utf-8")
+
+    with open(chemin, "wb") as fichier:
+        fichier.write(_SIGNATURE)
+        fichier.write(struct.pack("<Q", len(en_tete)))
+        fichier.write(en_tete)
+        for structure in structures:
+            fichier.write(structure)
+
+        # Alignement des données binaires
+        position = len(_SIGNATURE) + 8 + len(en_tete) + position_structure
+        fichier.write(b"\0" * ((-position) % 8))
+
+        for bloc in blocs:
+            fichier.write(bloc.tobytes())
+            fichier.write(b"\0" * ((-bloc.nbytes) % 8))
+
+def charger_resultats (chemin):
+
+    """
+        Ouvre un fichier de résultats sans le décoder
+        Input : chemin : chemin du fichier
+        Output : resultatsStockes, Mapping variable -> résultat, décodé à la lecture de chaque variable
+    """
+
+    return resultatsStockes(chemin)
+
+class resultatsStockes (Mapping):
+    """
+        Résultats lus depuis un fichier binaire
+        Les variables sont décodées à la première lecture puis conservées, les tableaux sont projetés en mémoire.
+        Utilisable directement par genererTableau.
+
+        Input :
+            chemin : chemin du fichier, écrit par sauvegarder_resultats
+    """
+
+    def __init__ (self, chemin):
+
+        self.chemin = chemin
+        self._ouvrir()
+
+    def _ouvrir (self):
+
+        with open(self.chemin, "rb") as fichier:
+            if fichier.read(len(_SIGNATURE)) != _SIGNATURE:
+                raise Exception("Le fichier {} n'est pas un fichier de résultats.".format(self.chemin))
+
+            taille_en_tete = struct.unpack("<Q", fichier.read(8))[0]
+            en_tete = json.loads(fichier.read(taille_en_tete).decode("utf-8"))
+
+        if en_tete["version"] != _VERSION:
+            raise Exception("Version de fichier de résultats non supportée.")
+
+        self.axes = [_decoder_cle(x) for x in en_tete["axes"]]
+        self.axes_quantitatifs = [_decoder_cle(x) for x in en_tete["axes_quantitatifs"]] \
+            if "axes_quantitatifs" in en_tete else None
+        self._cles = [_decoder_cle(x) for x in en_tete["cles"]]
+        self._variables = dict(
+            (_decoder_cle(x[0]), x[1:]) for x in en_tete["variables"]
+        )
+
+        # Position des structures et des données binaires
+        self._debut_structures = len(_SIGNATURE) + 8 + taille_en_tete
+        taille_structures = sum([x[1] for x in self._variables.values()])
+        self._debut_binaire = _aligner(self._debut_structures + taille_structures)
+
+        if len(self._variables) > 0 and self._debut_binaire < _taille_fichier(self.chemin):
+            self._binaire = np.memmap(self.chemin, dtype = np.uint8, mode = "r", offset = self._debut_binaire)
+        else:
+            self._binaire = np.zeros(0, dtype = np.uint8)
+
+        self._decodees = {}
+
+    def __getstate__ (self):
+
+        # Seul le chemin est transmis : le fichier est rouvert (pool de processus)
+        return {"chemin":self.chemin}
+
+    def __setstate__ (self, etat):
+
+        self.chemin = etat["chemin"]
+        self._ouvrir()
+
+    def __len__ (self):
+
+        return len(self._variables)
+
+    def __iter__ (self):
+
+        return iter(self._variables)
+
+    def __contains__ (self, variable):
+
+        return variable in self._variables
+
+    def __getitem__ (self, variable):
+
+        if variable not in self._decodees:
+            self._decodees[variable] = self._decoder_variable(variable)
+
+        return self._decodees[variable]
+
+    def _decoder_variable (self, variable):
+
+        position_structure, taille_structure, position_scalaires, n_scalaires, position_entiers, n_entiers = self._variables[variable]
+
+        with open(self.chemin, "rb") as fichier:
+            fichier.seek(self._debut_structures + position_structure)
+            structure = json.loads(fichier.read(taille_structure).decode("utf-8"))
+
+        scalaires = self._binaire[position_scalaires:position_scalaires + 8*n_scalaires] \
+            .view(np.float64)
+        entiers = self._binaire[position_entiers:position_entiers + 8*n_entiers].view(np.int64)
+
+        return self._decoder(structure, scalaires, entiers)
+
+    def _decoder (self, noeud, scalaires, entiers):
+
+        if isinstance(noeud, int) and not isinstance(noeud, bool):
+            return float(scalaires[noeud])
+        elif not isinstance(noeud, dict):
+            return noeud
+        elif "m" in noeud:
+            return dict((self._cles[cle], self._decoder(valeur, scalaires, entiers)) for cle, valeur in noeud["m"])
+        elif "l" in noeud:
+            return [self._decoder(x, scalaires, entiers) for x in noeud["l"]]
+        elif "t" in noeud:
+            return tuple(self._decoder(x, scalaires, entiers) for x in noeud["t"])
+        elif "e" in noeud:
+            return int(entiers[noeud["e"]])
+        elif "j" in noeud:
+            return noeud["j"]
+        else:
+            position, dtype, forme = noeud["a"]
+            dtype = np.dtype(dtype)
+            taille = dtype.itemsize * int(np.prod(forme))
+            return self._binaire[position:position + taille].view(dtype).reshape(forme)
+
+def _taille_fichier (chemin):
+
+    with open(chemin, "rb") as fichier:
+        fichier.seek(0, 2)
+        return fichier.tell()
@@ -1,2 +1,7 @@
 from .test_qualitatif import testQualitatif
-from .test_quantitatif import testQuantitatif
\ No newline at end of file
+from .test_quantitatif import testQuantitatif
+from .exact import fisher_exact_lot
+from .normalite import normalite_lot
+from .politique import politique_taille, POLITIQUE_TAILLE
+from .post_hoc import post_hoc
+from .taille_effet import taille_effet_groupes, taille_effet_contingences
\ No newline at end of file
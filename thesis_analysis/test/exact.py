@@ -0,0 +1,190 @@
+"""
+    Outils des tests exacts
+    La table des log-factorielles est partagée par tous les tests et agrandie au plus grand n rencontré,
+    le test exact de Fisher évalue un lot de tableaux 2x2 en une opération vectorisée,
+    les distributions exactes de la statistique U de Mann-Whitney sont mises en cache par taille de groupes.
+"""
+
+import threading
+import functools
+import numpy as np
+from scipy.special import gammaln, ndtr
+
+class _tableLogFactorielle ():
+    """
+        Table des log(k!) pour k = 0..n, partagée par tous les tests
+        La table est agrandie (au moins du double) lorsqu'un n plus grand est demandé
+    """
+
+    def __init__ (self):
+
+        self.valeurs = np.zeros(1)
+        self._verrou = threading.Lock()
+
+    def agrandir (self, n):
+
+        """
+            Garantit que la table couvre 0..n
+        """
+
+        if n < self.valeurs.shape[0]:
+            return
+
+        with self._verrou:
+            taille = self.valeurs.shape[0]
+            if n >= taille:
+                nouvelle_taille = max(n + 1, 2*taille)
+                valeurs = np.empty(nouvelle_taille)
+                valeurs[:taille] = self.valeurs
+                valeurs[taille:] = gammaln(np.arange(taille, nouvelle_taille) + 1)
+                self.valeurs = valeurs
+
+    def __call__ (self, k):
+
+        """
+            log(k!) pour un entier ou un tableau d'entiers positifs
+        """
+
+        k = np.asarray(k, dtype = np.int64)
+        if k.size > 0:
+            self.agrandir(int(k.max()))
+
+        return self.valeurs[k]
+
+log_factorielle = _tableLogFactorielle()
+
+def fisher_exact_lot (tables, taille_lot = 2**22):
+
+    """
+        Test exact de Fisher bilatéral d'un lot de tableaux 2x2, mêmes résultats que scipy.stats.fisher_exact
+        Les probabilités hypergéométriques de toutes les valeurs possibles de la cellule [0, 0]
+        sont évaluées ensemble à partir de la table partagée des log-factorielles
+
+        Input :
+            tables : tableau d'entiers (m, 2, 2)
+            taille_lot : nombre maximal de probabilités évaluées à la fois
+        Output : odds ratio, p-value : tableaux (m,)
+    """
+
+    tables = np.asarray(tables, dtype = np.int64).reshape(-1, 2, 2)
+
+    a, b = tables[:, 0, 0], tables[:, 0, 1]
+    c, d = tables[:, 1, 0], tables[:, 1, 1]
+    ligne_1, ligne_2 = a + b, c + d
+    colonne_1, colonne_2 = a + c, b + d
+    n = ligne_1 + ligne_2
+
+    # Odds ratio de l'échantillon
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        odds_ratio = np.where((b > 0) & (c > 0), (a*d)/(b*c), np.inf)
+
+    # Valeurs possibles de la cellule [0, 0] à marges fixées
+    minimum = np.maximum(0, colonne_1 - ligne_2)
+    maximum = np.minimum(ligne_1, colonne_1)
+
+    log_factorielle.agrandir(int(n.max()) if n.size > 0 else 0)
+    constante = log_factorielle(ligne_1) + log_factorielle(ligne_2) + log_factorielle(colonne_1) \
+        + log_factorielle(colonne_2) - log_factorielle(n)
+
+    log_p = lambda x, i: constante[i] - log_factorielle(x) - log_factorielle(ligne_1[i] - x) \
+        - log_factorielle(colonne_1[i] - x) - log_factorielle(ligne_2[i] - colonne_1[i] + x)
+
+    p_value = np.ones(tables.shape[0])
+
+    # Lots de tableaux : chaque tableau occupe une ligne de la largeur du plus grand support du lot
+    etendues = maximum - minimum + 1
+    debut = 0
+    while debut < tables.shape[0]:
+
+        fin = debut + 1
+        largeur = etendues[debut]
+        while fin < tables.shape[0] and (fin - debut + 1)*max(largeur, etendues[fin]) <= taille_lot:
+            largeur = max(largeur, etendues[fin])
+            fin += 1
+
+        i = np.arange(debut, fin)
+        valeurs = minimum[i, np.newaxis] + np.arange(largeur)
+        support = valeurs <= maximum[i, np.newaxis]
+        valeurs = np.where(support, valeurs, minimum[i, np.newaxis])
+
+        probabilites = np.where(support, np.exp(log_p(valeurs, i[:, np.newaxis])), 0)
+        observee = np.exp(log_p(a[i], i))
+
+        # Somme des probabilités des tableaux au plus aussi probables que le tableau observé
+        p_value[i] = np.minimum(1, np.sum(np.where(probabilites <= observee[:, np.newaxis]*(1 + 1e-7), probabilites, 0), axis = 1))
+
+        debut = fin
+
+    # Ligne ou colonne vide : p-value de 1, odds ratio indéfini
+    vide = (ligne_1 == 0) | (ligne_2 == 0) | (colonne_1 == 0) | (colonne_2 == 0)
+    p_value[vide] = 1
+    odds_ratio = np.where(vide, np.nan, odds_ratio)
+
+    return odds_ratio, p_value
+
+@functools.lru_cache(maxsize = 256)
+def distribution_mann_whitney (n1, n2):
+
+    """
+        Fonction de répartition exacte de la statistique U de Mann-Whitney sous l'hypothèse nulle, en l'absence d'ex-aequo
+        Mise en cache par (n1, n2) : partagée par toutes les variables et tous les axes
+        Le nombre de rangements de U = u est le coefficient de q^u du binôme de Gauss [n1+n2, n1],
+        construit par récurrence : [n2+i, i] = [n2+i-1, i-1] (1 - q^(n2+i)) / (1 - q^i)
+        (la division par 1 - q^i est une somme cumulée de pas i), normalisé à chaque étape en probabilités
+
+        Input : n1, n2 : tailles des groupes, n1 <= n2
+        Output : tableau (n1.n2 + 1,) des P(U <= u), en lecture seule
+    """
+
+    probabilites = np.ones(1)
+
+    for i in range(1, n1 + 1):
+
+        taille = i*n2 + 1
+        pas = -(-taille//i)*i
+
+        # Produit par (1 - q^(n2+i)), tronqué aux coefficients utiles
+        coefficients = np.zeros(pas)
+        coefficients[:probabilites.shape[0]] = probabilites
+        coefficients[n2+i:taille] -= probabilites[:max(0, taille - n2 - i)]
+
+        # Division par (1 - q^i) : somme cumulée de chaque classe de résidus modulo i
+        coefficients = coefficients.reshape(-1, i).cumsum(axis = 0).reshape(-1)[:taille]
+        probabilites = coefficients*i/(n2 + i)
+
+    repartition = np.cumsum(probabilites)
+    repartition.setflags(write = False)
+
+    return repartition
+
+def p_value_mann_whitney (u1, n1, n2, terme_ex_aequo = 0, seuil_exact = 8, exact_max = np.inf, taille_max = 2**22):
+
+    """
+        p-value bilatérale du test de Mann-Whitney, mêmes résultats que scipy.stats.mannwhitneyu (method = "auto")
+        Distribution exacte (mise en cache) en l'absence d'ex-aequo lorsque l'un des groupes a au plus seuil_exact sujets,
+        approximation normale avec correction de continuité et correction des ex-aequo au-delà
+
+        Input :
+            u1 : statistique U du premier groupe
+            n1, n2 : tailles des groupes
+            terme_ex_aequo : somme des t^3 - t sur les groupes de t valeurs ex-aequo
+            seuil_exact : taille de groupe au-delà de laquelle l'approximation normale est utilisée
+            exact_max : effectif total au-delà duquel l'approximation normale est utilisée (politique de taille)
+            taille_max : nombre maximal de valeurs de U de la distribution exacte
+        Output : p-value, méthode utilisée ("exact" ou "asymptotique")
+    """
+
+    u = max(u1, n1*n2 - u1)
+
+    if terme_ex_aequo == 0 and min(n1, n2) <= seuil_exact and n1 + n2 <= exact_max and n1*n2 < taille_max:
+        # P(U >= u) = P(U <= n1.n2 - u) par symétrie
+        p_value = 2*distribution_mann_whitney(min(n1, n2), max(n1, n2))[int(round(n1*n2 - u))]
+        methode = "exact"
+    else:
+        n = n1 + n2
+        ecart_type = np.sqrt(n1*n2/12*((n + 1) - terme_ex_aequo/(n*(n - 1))))
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            p_value = 2*ndtr(-(u - n1*n2/2 - 0.5)/ecart_type)
+        methode = "asymptotique"
+
+    return float(np.clip(p_value, 0, 1)), methode
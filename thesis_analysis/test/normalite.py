@@ -0,0 +1,278 @@
+"""
+    Tests de normalité d'un lot de groupes
+    Les groupes sont triés par taille puis rangés dans des matrices de valeurs triées complétées par NaN :
+    chaque test est évalué pour toutes les lignes d'une matrice en une opération vectorisée.
+        shapiro : Shapiro-Wilk (algorithme de Royston, AS R94), 3 <= n <= 5000
+        dagostino : test omnibus K² de D'Agostino et Pearson (asymétrie et aplatissement), n >= 8
+        lilliefors : Kolmogorov-Smirnov sur les valeurs centrées réduites (Lilliefors), n >= 4,
+            évalué groupe par groupe par statsmodels.stats.diagnostic.lilliefors
+"""
+
+import warnings
+import numpy as np
+from scipy.special import ndtr, ndtri
+from statsmodels.stats.diagnostic import lilliefors
+
+METHODES_NORMALITE = ["auto", "shapiro", "dagostino", "lilliefors"]
+
+# Tailles minimales et maximales de chaque test
+_TAILLES = {
+    "shapiro":(3, 5000),
+    "dagostino":(8, np.inf),
+    "lilliefors":(4, np.inf)
+}
+
+def normalite_lot (groupes, methode = "auto", seuil_shapiro = 50, taille_lot = 2**22):
+
+    """
+        Tests de normalité de plusieurs groupes
+        Input :
+            groupes : dictionnaire clé -> tableau numpy des valeurs du groupe, sans valeur manquante
+            methode : "shapiro", "dagostino", "lilliefors" ou "auto"
+                auto : Shapiro-Wilk jusqu'à seuil_shapiro sujets, D'Agostino au-delà
+            seuil_shapiro : taille maximale des groupes testés par Shapiro-Wilk en mode auto
+            taille_lot : nombre maximal de valeurs d'une matrice de groupes
+        Output : dictionnaire clé -> {"methode", "statistic", "p_value"}
+            methode vaut "no_test" (statistic et p_value NaN) si le groupe est trop petit ou constant
+    """
+
+    if methode not in METHODES_NORMALITE:
+        raise Exception("Méthode de test de normalité inconnue : {}".format(methode))
+
+    cles = list(groupes.keys())
+    valeurs = [np.asarray(groupes[cle], dtype = np.float64) for cle in cles]
+    tailles = np.array([x.shape[0] for x in valeurs], dtype = np.int64)
+
+    # Test de chaque groupe
+    if methode == "auto":
+        methodes = np.where(tailles <= seuil_shapiro, "shapiro", "dagostino")
+    else:
+        methodes = np.full(len(cles), methode)
+
+    resultats = dict([(cle, {"methode":"no_test", "statistic":np.nan, "p_value":np.nan}) for cle in cles])
+
+    for nom_methode, fonction in [("shapiro", _shapiro), ("dagostino", _dagostino), ("lilliefors", _lilliefors)]:
+
+        minimum, maximum = _TAILLES[nom_methode]
+        positions = np.flatnonzero((methodes == nom_methode) & (tailles >= minimum) & (tailles <= maximum))
+
+        for lot in _lots(positions[np.argsort(tailles[positions], kind = "stable")], tailles, taille_lot):
+
+            X = _matrice_triee([valeurs[i] for i in lot], tailles[lot].max())
+
+            with warnings.catch_warnings(), np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+                warnings.simplefilter("ignore", RuntimeWarning)
+                statistiques, p_values = fonction(X, tailles[lot])
+
+            for i, statistique, p_value in zip(lot, statistiques, p_values):
+                # Groupe constant : pas de test
+                if np.isfinite(statistique):
+                    resultats[cles[i]] = {
+                        "methode":nom_methode,
+                        "statistic":float(statistique),
+                        "p_value":float(p_value)
+                    }
+
+    return resultats
+
+def normalite_repliques (X, methode = "auto", seuil_shapiro = 50):
+
+    """
+        Tests de normalité de répliques de même taille (simulations), une réplique par ligne
+        Input :
+            X : tableau (répliques, n) des valeurs, sans valeur manquante
+            methode, seuil_shapiro : voir normalite_lot
+        Output : tableau (répliques,) des p-values, NaN si le test n'est pas applicable (groupe trop petit ou constant)
+    """
+
+    if methode not in METHODES_NORMALITE:
+        raise Exception("Méthode de test de normalité inconnue : {}".format(methode))
+
+    X = np.asarray(X, dtype = np.float64)
+    n = X.shape[1]
+
+    if methode == "auto":
+        methode = "shapiro" if n <= seuil_shapiro else "dagostino"
+
+    minimum, maximum = _TAILLES[methode]
+    if n < minimum or n > maximum:
+        return np.full(X.shape[0], np.nan)
+
+    fonction = {"shapiro":_shapiro, "dagostino":_dagostino, "lilliefors":_lilliefors}[methode]
+
+    with warnings.catch_warnings(), np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        statistiques, p_values = fonction(np.sort(X, axis = 1), np.full(X.shape[0], n, dtype = np.int64))
+
+    return np.where(np.isfinite(statistiques), p_values, np.nan)
+
+def _lots (positions, tailles, taille_lot):
+
+    """
+        Découpe des groupes triés par taille en lots d'au plus taille_lot valeurs (complétées comprises)
+    """
+
+    debut = 0
+    while debut < len(positions):
+
+        fin = debut + 1
+        while fin < len(positions) and (fin - debut + 1)*tailles[positions[fin]] <= taille_lot:
+            fin += 1
+
+        yield positions[debut:fin]
+        debut = fin
+
+def _matrice_triee (valeurs, largeur):
+
+    """
+        Matrice (groupes, largeur) des valeurs triées de chaque groupe, complétée par NaN
+    """
+
+    X = np.full((len(valeurs), largeur), np.nan)
+    for i, x in enumerate(valeurs):
+        X[i, :x.shape[0]] = x
+
+    # Les NaN sont placés en fin de ligne
+    X.sort(axis = 1)
+
+    return X
+
+def _moments_centres (X, n):
+
+    """
+        Moyenne et écarts à la moyenne de chaque ligne, 0 au-delà de la taille du groupe
+    """
+
+    masque = np.arange(X.shape[1]) < n[:, np.newaxis]
+    moyenne = np.where(masque, X, 0).sum(axis = 1)/n
+    ecarts = np.where(masque, X - moyenne[:, np.newaxis], 0)
+
+    return ecarts, masque
+
+def _polynome (coefficients, x):
+
+    """
+        Polynôme c0 + c1.x + c2.x² + ...
+    """
+
+    return sum([c*x**i for i, c in enumerate(coefficients)])
+
+def _shapiro (X, n):
+
+    """
+        Statistique W de Shapiro-Wilk et p-value (approximation de Royston)
+        Les coefficients ne dépendent que de la taille du groupe : ils sont calculés pour toutes les lignes à la fois
+    """
+
+    rang = np.arange(1, X.shape[1] + 1)
+    ecarts, masque = _moments_centres(X, n)
+    nf = n.astype(np.float64)
+
+    # Scores normaux attendus m_i
+    m = np.where(masque, ndtri((rang - 0.375)/(nf[:, np.newaxis] + 0.25)), 0)
+    somme_m2 = (m*m).sum(axis = 1)
+    racine_m2 = np.sqrt(somme_m2)
+    u = 1/np.sqrt(nf)
+
+    m_dernier = m[np.arange(len(n)), n - 1]
+    m_avant_dernier = m[np.arange(len(n)), np.maximum(n - 2, 0)]
+
+    a_n = _polynome([0, 0.221157, -0.147981, -2.071190, 4.434685, -2.706056], u) + m_dernier/racine_m2
+    a_n1 = _polynome([0, 0.042981, -0.293762, -1.752461, 5.682633, -3.582633], u) + m_avant_dernier/racine_m2
+
+    # Coefficients centraux : m_i normalisés, les extrêmes sont remplacés par les approximations polynomiales
+    deux_extremes = n > 5
+    facteur = np.where(
+        deux_extremes,
+        np.sqrt((somme_m2 - 2*m_dernier**2 - 2*m_avant_dernier**2)/(1 - 2*a_n**2 - 2*a_n1**2)),
+        np.sqrt((somme_m2 - 2*m_dernier**2)/(1 - 2*a_n**2))
+    )
+    a = m/facteur[:, np.newaxis]
+
+    lignes = np.arange(len(n))
+    a[lignes, n - 1] = a_n
+    a[lignes, 0] = -a_n
+    a[lignes[deux_extremes], n[deux_extremes] - 2] = a_n1[deux_extremes]
+    a[lignes[deux_extremes], 1] = -a_n1[deux_extremes]
+
+    # n = 3 : coefficients exacts
+    a[n == 3, :3] = [-np.sqrt(0.5), 0, np.sqrt(0.5)]
+
+    somme_carres = (ecarts*ecarts).sum(axis = 1)
+    W = np.where(somme_carres > 0, np.minimum(np.where(masque, a*X, 0).sum(axis = 1)**2/somme_carres, 1), np.nan)
+
+    # p-value : transformation normalisante de Royston
+    log_n = np.log(nf)
+    w1 = np.log(1 - W)
+    petit = n <= 11
+
+    gamma = _polynome([-2.273, 0.459], nf)
+    moyenne = np.where(petit, _polynome([0.5440, -0.39978, 0.025054, -6.714e-4], nf), _polynome([-1.5861, -0.31082, -0.083751, 0.0038915], log_n))
+    ecart_type = np.exp(np.where(petit, _polynome([1.3822, -0.77857, 0.062767, -0.0020322], nf), _polynome([-0.4803, -0.082676, 0.0030302], log_n)))
+    y = np.where(petit, -np.log(gamma - w1), w1)
+
+    p_value = ndtr(-(y - moyenne)/ecart_type)
+    p_value = np.where(petit & (w1 >= gamma), 1e-99, p_value)
+
+    # n = 3 : p-value exacte
+    p_value = np.where(n == 3, np.maximum(6/np.pi*(np.arcsin(np.sqrt(W)) - np.pi/3), 0), p_value)
+
+    return W, p_value
+
+def _dagostino (X, n):
+
+    """
+        Statistique K² de D'Agostino et Pearson et p-value (loi du Khi-2 à 2 degrés de liberté)
+    """
+
+    ecarts, masque = _moments_centres(X, n)
+    n = n.astype(np.float64)
+
+    m2 = (ecarts**2).sum(axis = 1)/n
+    m3 = (ecarts**3).sum(axis = 1)/n
+    m4 = (ecarts**4).sum(axis = 1)/n
+
+    # Asymétrie
+    b1 = m3/m2**1.5
+    y = b1*np.sqrt((n + 1)*(n + 3)/(6*(n - 2)))
+    beta2 = 3*(n*n + 27*n - 70)*(n + 1)*(n + 3)/((n - 2)*(n + 5)*(n + 7)*(n + 9))
+    W2 = -1 + np.sqrt(2*(beta2 - 1))
+    delta = 1/np.sqrt(0.5*np.log(W2))
+    alpha = np.sqrt(2/(W2 - 1))
+    y = np.where(y == 0, 1, y)
+    z_asymetrie = delta*np.log(y/alpha + np.sqrt((y/alpha)**2 + 1))
+
+    # Aplatissement
+    b2 = m4/m2**2
+    esperance = 3*(n - 1)/(n + 1)
+    variance = 24*n*(n - 2)*(n - 3)/((n + 1)**2*(n + 3)*(n + 5))
+    x = (b2 - esperance)/np.sqrt(variance)
+    racine_beta1 = 6*(n*n - 5*n + 2)/((n + 7)*(n + 9))*np.sqrt(6*(n + 3)*(n + 5)/(n*(n - 2)*(n - 3)))
+    A = 6 + 8/racine_beta1*(2/racine_beta1 + np.sqrt(1 + 4/racine_beta1**2))
+    terme_1 = 1 - 2/(9*A)
+    denominateur = 1 + x*np.sqrt(2/(A - 4))
+    terme_2 = np.sign(denominateur)*np.where(denominateur == 0, np.nan, ((1 - 2/A)/np.abs(denominateur))**(1/3))
+    z_aplatissement = (terme_1 - terme_2)/np.sqrt(2/(9*A))
+
+    K2 = z_asymetrie**2 + z_aplatissement**2
+
+    return K2, np.exp(-K2/2)
+
+def _lilliefors (X, n):
+
+    """
+        Statistique D de Kolmogorov-Smirnov des valeurs centrées réduites (écart type corrigé) et p-value
+        La p-value provient de l'interface publique de statsmodels (table de Lilliefors), appliquée à chaque groupe non constant :
+        elle n'accepte qu'un échantillon à la fois et n'expose pas la table pour un lot de statistiques
+    """
+
+    ecarts, masque = _moments_centres(X, n)
+    nf = n.astype(np.float64)
+    ecart_type = np.sqrt((ecarts*ecarts).sum(axis = 1)/(nf - 1))
+
+    D = np.full(len(n), np.nan)
+    p_value = np.full(len(n), np.nan)
+    for i in np.flatnonzero(ecart_type > 0):
+        D[i], p_value[i] = lilliefors(X[i, :n[i]], dist = "norm", pvalmethod = "table")
+
+    return D, p_value
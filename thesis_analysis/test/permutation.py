@@ -0,0 +1,48 @@
+import math
+import numpy as np
+
+def p_value_permutation (observee, statistiques_lot, n_permutations = 10000, precision = 0.005, seed = None, taille_lot = 1000):
+
+    """
+        p-value d'un test de permutation, les permutations sont générées et évaluées par lots
+        Le calcul s'arrête dès que l'erreur standard de la p-value est inférieure à la précision demandée
+
+        Input :
+            observee : statistique observée
+            statistiques_lot : fonction (générateur, taille du lot) -> tableau des statistiques de chaque permutation du lot
+            n_permutations : nombre maximal de permutations
+            precision : erreur standard visée pour la p-value
+            seed : graine du générateur
+            taille_lot : nombre de permutations par lot
+        Output : p-value, erreur standard, nombre de permutations réalisées
+    """
+
+    generateur = np.random.default_rng(seed)
+
+    # Tolérance relative : une statistique égale à l'observée aux arrondis près est comptée
+    seuil = observee - 1e-10*abs(observee)
+
+    superieures = 0
+    total = 0
+
+    while total < n_permutations:
+
+        taille = min(taille_lot, n_permutations - total)
+        superieures += int(np.sum(statistiques_lot(generateur, taille) >= seuil))
+        total += taille
+
+        p_value = (1 + superieures)/(1 + total)
+        erreur = math.sqrt(p_value*(1 - p_value)/total)
+
+        if erreur <= precision:
+            break
+
+    return p_value, erreur, total
+
+def taille_lot_permutation (n, taille_lot = 1000, taille_max = 2**22):
+
+    """
+        Nombre de permutations par lot, borné pour limiter la mémoire à taille_max valeurs
+    """
+
+    return int(max(1, min(taille_lot, taille_max//max(int(n), 1))))
@@ -0,0 +1,35 @@
+"""
+    Politique de taille des tests : au-delà de seuils d'effectif, la distribution exacte de Mann-Whitney
+    et les tests de permutation (quantitatifs et qualitatifs) sont remplacés par leur approximation asymptotique,
+    calculée en forme close. La méthode effectivement utilisée est enregistrée dans le résultat de ces seuls tests (clé "methode").
+    Les autres tests n'en dépendent pas : le Khi-2 et les tests paramétriques sont déjà asymptotiques ou en forme close,
+    le test exact de Fisher 2x2 reste exact (table des log-factorielles) et le test de Fisher par Monte Carlo
+    dépend du nombre de simulations, pas de l'effectif.
+"""
+
+# Seuils par défaut
+POLITIQUE_TAILLE = {
+    # Effectif total au-delà duquel les distributions exactes ne sont plus construites (Mann-Whitney)
+    "exact_max":10000,
+    # Effectif total au-delà duquel les tests de permutation sont remplacés par le test asymptotique de leur statistique
+    "permutation_max":50000
+}
+
+def politique_taille (politique = None):
+
+    """
+        Complète une politique de taille par les seuils par défaut
+        Input : politique : dictionnaire seuil -> effectif, None pour les seuils par défaut
+        Output : dictionnaire de tous les seuils
+    """
+
+    seuils = dict(POLITIQUE_TAILLE)
+
+    if politique is not None:
+        inconnus = [x for x in politique.keys() if x not in POLITIQUE_TAILLE]
+        if len(inconnus) > 0:
+            raise Exception("Seuils de politique de taille inconnus : {}".format(", ".join(inconnus)))
+
+        seuils.update(politique)
+
+    return seuils
@@ -0,0 +1,185 @@
+"""
+    Comparaisons post-hoc de toutes les paires de modalités après une ANOVA ou un test de Kruskal-Wallis
+    Les statistiques de toutes les paires sont calculées sous forme de matrices (k, k) à partir des effectifs,
+    moyennes et variances des groupes, ou des rangs moyens calculés une fois sur l'ensemble des sujets.
+        tukey : Tukey HSD (variance commune)
+        games_howell : Games-Howell (variances inégales, degrés de liberté de Welch)
+        dunn : Dunn (rangs), p-values ajustées pour comparaisons multiples
+"""
+
+import functools
+import numpy as np
+from scipy.special import ndtr
+from scipy.stats import rankdata, studentized_range
+from scipy.interpolate import PchipInterpolator
+from statsmodels.stats.multitest import multipletests
+
+METHODES_POST_HOC = ["tukey", "games_howell", "dunn"]
+AJUSTEMENTS = [None, "bonferroni", "holm", "fdr_bh"]
+
+def post_hoc (groupes, methode = "tukey", ajustement = "holm"):
+
+    """
+        Comparaisons de toutes les paires de groupes
+        Input :
+            groupes : dictionnaire modalité -> tableau numpy des valeurs, sans valeur manquante
+            methode : "tukey", "games_howell" ou "dunn"
+            ajustement : ajustement des p-values de Dunn, None, "bonferroni", "holm" ou "fdr_bh"
+                (Tukey et Games-Howell contrôlent déjà le risque global)
+        Output : dictionnaire
+            methode, ajustement
+            comparaisons : (modalité i, modalité j) -> difference (i - j), std_error, statistic, p_value, ci_95 (Tukey et Games-Howell)
+    """
+
+    if methode not in METHODES_POST_HOC:
+        raise Exception("Méthode post-hoc inconnue : {}".format(methode))
+    if ajustement not in AJUSTEMENTS:
+        raise Exception("Ajustement des p-values inconnu : {}".format(ajustement))
+
+    modalites = list(groupes.keys())
+    valeurs = [np.asarray(groupes[x], dtype = np.float64) for x in modalites]
+
+    if methode == "dunn":
+        matrices = _dunn(valeurs)
+    else:
+        matrices = _studentise(valeurs, methode)
+
+    # Paires i < j, dans l'ordre des modalités
+    i, j = np.triu_indices(len(modalites), k = 1)
+    p_values = matrices["p_value"][i, j]
+
+    if methode == "dunn" and ajustement is not None and len(p_values) > 0:
+        valides = ~np.isnan(p_values)
+        p_values[valides] = multipletests(p_values[valides], method = ajustement)[1]
+
+    comparaisons = {}
+    for position, (a, b) in enumerate(zip(i, j)):
+
+        comparaison = {
+            "difference":matrices["difference"][a, b],
+            "std_error":matrices["std_error"][a, b],
+            "statistic":matrices["statistic"][a, b],
+            "p_value":p_values[position]
+        }
+        if "ci_inf" in matrices:
+            comparaison["ci_95"] = [matrices["ci_inf"][a, b], matrices["ci_sup"][a, b]]
+
+        comparaisons[(modalites[a], modalites[b])] = comparaison
+
+    resultat = {
+        "methode":methode,
+        "ajustement":ajustement if methode == "dunn" else None,
+        "comparaisons":comparaisons
+    }
+
+    return resultat
+
+def _studentise (valeurs, methode):
+
+    """
+        Tukey HSD et Games-Howell : étendue studentisée de chaque paire
+        Output : dictionnaire de matrices (k, k) difference, std_error, statistic, p_value, ci_inf, ci_sup
+    """
+
+    n = np.array([x.shape[0] for x in valeurs], dtype = np.float64)
+    moyennes = np.array([x.mean() for x in valeurs])
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        variances = np.array([x.var(ddof = 1) if x.shape[0] > 1 else np.nan for x in valeurs])
+
+    k = len(valeurs)
+    difference = moyennes[:, np.newaxis] - moyennes[np.newaxis, :]
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        if methode == "tukey":
+            # Carré moyen résiduel commun à toutes les paires
+            ddl = n.sum() - k
+            carre_moyen = np.nansum((n - 1)*variances)/ddl
+            std_error = np.sqrt(carre_moyen/2*(1/n[:, np.newaxis] + 1/n[np.newaxis, :]))
+            ddl = np.full((k, k), ddl)
+        else:
+            # Variances propres à chaque groupe, degrés de liberté de Welch
+            v = variances/n
+            somme = v[:, np.newaxis] + v[np.newaxis, :]
+            std_error = np.sqrt(somme/2)
+            ddl = somme**2/((v**2/(n - 1))[:, np.newaxis] + (v**2/(n - 1))[np.newaxis, :])
+
+        statistique = np.abs(difference)/std_error
+
+    # Loi de l'étendue studentisée : évaluée pour les paires i < j seulement
+    i, j = np.triu_indices(k, k = 1)
+    p_value = np.full((k, k), np.nan)
+    quantile = np.full((k, k), np.nan)
+    valides = np.isfinite(statistique[i, j]) & np.isfinite(ddl[i, j]) & (ddl[i, j] > 0)
+    if valides.any():
+        a, b = i[valides], j[valides]
+        p_value[a, b] = studentized_range.sf(statistique[a, b], k, ddl[a, b])
+        quantile[a, b] = _quantiles_etendue(k, ddl[a, b])
+
+    return {
+        "difference":difference,
+        "std_error":std_error,
+        "statistic":statistique,
+        "p_value":p_value,
+        "ci_inf":difference - quantile*std_error,
+        "ci_sup":difference + quantile*std_error
+    }
+
+def _quantiles_etendue (k, ddl, noeuds = 8):
+
+    """
+        Quantiles à 95% de l'étendue studentisée pour plusieurs degrés de liberté
+        Le quantile est coûteux (inversion numérique) : il est calculé une fois par degré de liberté distinct,
+        ou, au-delà de noeuds valeurs distinctes, sur une grille en 1/ddl interpolée (erreur relative ~1e-4)
+    """
+
+    distincts, inverse = np.unique(ddl, return_inverse = True)
+
+    if distincts.shape[0] <= noeuds:
+        return np.array([_quantile_etendue(k, float(x)) for x in distincts])[inverse]
+
+    grille = np.linspace(1/distincts.max(), 1/distincts.min(), noeuds)
+    quantiles = np.array([_quantile_etendue(k, float(1/x)) for x in grille])
+
+    return PchipInterpolator(grille, quantiles)(1/ddl)
+
+@functools.lru_cache(maxsize = 1024)
+def _quantile_etendue (k, ddl):
+
+    """
+        Quantile à 95% de l'étendue studentisée, mis en cache : les variables de même effectif le partagent
+    """
+
+    return studentized_range.ppf(0.95, k, ddl)
+
+def _dunn (valeurs):
+
+    """
+        Test de Dunn : rangs moyens de chaque groupe, rangs calculés une fois sur l'ensemble des sujets
+        Output : dictionnaire de matrices (k, k) difference (de rangs moyens), std_error, statistic (z), p_value (non ajustée)
+    """
+
+    n = np.array([x.shape[0] for x in valeurs], dtype = np.float64)
+    N = n.sum()
+
+    toutes = np.concatenate(valeurs)
+    rangs = rankdata(toutes)
+    etiquettes = np.repeat(np.arange(len(valeurs)), n.astype(np.int64))
+    rangs_moyens = np.bincount(etiquettes, weights = rangs, minlength = len(valeurs))/n
+
+    # Correction des ex-aequo
+    effectifs = np.unique(toutes, return_counts = True)[1].astype(np.float64)
+    terme_ex_aequo = (effectifs**3 - effectifs).sum()/(12*(N - 1))
+
+    difference = rangs_moyens[:, np.newaxis] - rangs_moyens[np.newaxis, :]
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        std_error = np.sqrt((N*(N + 1)/12 - terme_ex_aequo)*(1/n[:, np.newaxis] + 1/n[np.newaxis, :]))
+        statistique = difference/std_error
+        p_value = 2*ndtr(-np.abs(statistique))
+
+    return {
+        "difference":difference,
+        "std_error":std_error,
+        "statistic":statistique,
+        "p_value":p_value
+    }
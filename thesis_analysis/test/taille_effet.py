@@ -0,0 +1,136 @@
+"""
+    Tailles d'effet d'un lot de tests, calculées à partir des statistiques déjà disponibles
+    sans nouveau passage sur les données brutes :
+        groupes : effectifs, moyennes et écarts types des groupes -> d de Cohen, g de Hedges (IC 95%), êta²
+        contingences : tableaux de contingence -> V de Cramér, odds ratio (IC 95%) des tableaux 2x2
+    Les tests du lot sont rangés dans des matrices complétées (NaN ou 0) et évalués en une opération vectorisée.
+"""
+
+import numpy as np
+from scipy.special import gammaln, ndtri
+
+def taille_effet_groupes (effectifs, moyennes, ecarts_types, niveau = 0.95):
+
+    """
+        Tailles d'effet de tests comparant des groupes quantitatifs
+        Input :
+            effectifs, moyennes, ecarts_types : listes (une par test) des valeurs de chaque groupe
+            niveau : niveau de l'intervalle de confiance du g de Hedges
+        Output : liste (une par test) de dictionnaires, None pour un test à moins de deux groupes
+            eta_carre : part de la variance expliquée par les groupes
+            deux groupes : cohen_d et hedges_g (premier groupe - second groupe, écart type commun), ci_95 (IC du g de Hedges)
+    """
+
+    n, moyenne, ecart_type = [_matrice(x) for x in [effectifs, moyennes, ecarts_types]]
+    k = (n > 0).sum(axis = 1)
+    N = np.nansum(n, axis = 1)
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+
+        # Sommes des carrés inter et intra groupes (les groupes d'un sujet n'ont pas d'écart type)
+        moyenne_globale = np.nansum(n*moyenne, axis = 1)/N
+        inter = np.nansum(n*(moyenne - moyenne_globale[:, np.newaxis])**2, axis = 1)
+        intra = np.nansum(np.where(n > 1, (n - 1)*ecart_type**2, 0), axis = 1)
+        eta_carre = inter/(inter + intra)
+
+        # Deux groupes : différence standardisée par l'écart type commun
+        ddl = N - 2
+        d = (moyenne[:, 0] - moyenne[:, 1 % moyenne.shape[1]])/np.sqrt(intra/ddl)
+
+        # Correction de biais exacte de Hedges
+        correction = np.exp(gammaln(ddl/2) - gammaln((ddl - 1)/2))/np.sqrt(ddl/2)
+        g = correction*d
+
+        n1, n2 = n[:, 0], n[:, 1 % n.shape[1]]
+        erreur = np.sqrt((n1 + n2)/(n1*n2) + g**2/(2*(n1 + n2)))
+        z = ndtri(0.5 + niveau/2)
+
+    resultats = []
+    for i in range(n.shape[0]):
+
+        if k[i] < 2:
+            resultats.append(None)
+            continue
+
+        resultat = {"eta_carre":float(eta_carre[i])}
+        if k[i] == 2:
+            resultat.update({
+                "cohen_d":float(d[i]),
+                "hedges_g":float(g[i]),
+                "ci_95":[float(g[i] - z*erreur[i]), float(g[i] + z*erreur[i])]
+            })
+        resultats.append(resultat)
+
+    return resultats
+
+def taille_effet_contingences (contingences, niveau = 0.95):
+
+    """
+        Tailles d'effet de tests d'indépendance de deux variables qualitatives
+        Input :
+            contingences : liste de tableaux de contingence (tailles quelconques)
+            niveau : niveau de l'intervalle de confiance de l'odds ratio
+        Output : liste (une par tableau) de dictionnaires, None pour un tableau à une seule ligne ou colonne
+            cramer_v : V de Cramér (Khi-2 sans correction)
+            tableaux 2x2 : odds_ratio (a.d / b.c) et ci_95 (IC de Woolf),
+                avec correction de Haldane-Anscombe (+0.5 à chaque case) si une case est vide
+    """
+
+    formes = [np.shape(x) for x in contingences]
+    if len(formes) == 0:
+        return []
+
+    # Tableaux complétés par des lignes et colonnes vides, qui ne contribuent pas au Khi-2
+    T = np.zeros((len(contingences), max([x[0] for x in formes]), max([x[1] for x in formes])))
+    for i, contingence in enumerate(contingences):
+        T[i, :formes[i][0], :formes[i][1]] = contingence
+
+    N = T.sum(axis = (1, 2))
+    lignes = T.sum(axis = 2)
+    colonnes = T.sum(axis = 1)
+    dimension = np.minimum((lignes > 0).sum(axis = 1), (colonnes > 0).sum(axis = 1))
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+
+        attendus = lignes[:, :, np.newaxis]*colonnes[:, np.newaxis, :]/N[:, np.newaxis, np.newaxis]
+        khi2 = np.where(attendus > 0, (T - attendus)**2/attendus, 0).sum(axis = (1, 2))
+        cramer_v = np.sqrt(khi2/(N*(dimension - 1)))
+
+        # Odds ratio des tableaux 2x2
+        a, b, c, d = T[:, 0, 0], T[:, 0, 1 % T.shape[2]], T[:, 1 % T.shape[1], 0], T[:, 1 % T.shape[1], 1 % T.shape[2]]
+        vide = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+        a, b, c, d = [np.where(vide, x + 0.5, x) for x in [a, b, c, d]]
+
+        log_odds_ratio = np.log(a*d/(b*c))
+        erreur = np.sqrt(1/a + 1/b + 1/c + 1/d)
+        z = ndtri(0.5 + niveau/2)
+
+    resultats = []
+    for i, forme in enumerate(formes):
+
+        if dimension[i] < 2:
+            resultats.append(None)
+            continue
+
+        resultat = {"cramer_v":float(cramer_v[i])}
+        if forme == (2, 2):
+            resultat.update({
+                "odds_ratio":float(np.exp(log_odds_ratio[i])),
+                "ci_95":[float(np.exp(log_odds_ratio[i] - z*erreur[i])), float(np.exp(log_odds_ratio[i] + z*erreur[i]))]
+            })
+        resultats.append(resultat)
+
+    return resultats
+
+def _matrice (valeurs):
+
+    """
+        Matrice (tests, groupes) des valeurs de chaque test, complétée par NaN
+    """
+
+    largeur = max([len(x) for x in valeurs] + [1])
+    X = np.full((len(valeurs), largeur), np.nan)
+    for i, x in enumerate(valeurs):
+        X[i, :len(x)] = x
+
+    return X
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import chi2_contingency, fisher_exact
-from scipy.stats import normaltest, kstest, levene, ttest_ind, mannwhitneyu, f_oneway, kruskal
-import statsmodels.stats.weightstats as ws
+from scipy.stats import chi2_contingency, chi2 as loi_khi2
+from .permutation import p_value_permutation, taille_lot_permutation
+from .exact import log_factorielle, fisher_exact_lot
+from .politique import politique_taille
 
 # Qualitatif
 
@@ -19,6 +20,19 @@ class testQualitatif ():
         # Calcul du tableau de contingence
         self.contingency = self._get_contingency(df, y, x)
         
+    @classmethod
+    def depuis_contingence (cls, contingency):
+        
+        """
+            Construit le test à partir d'un tableau de contingence déjà calculé
+                contingency : tableau numpy d'entiers, modalités de x en lignes et de y en colonnes
+        """
+        
+        test = cls.__new__(cls)
+        test.contingency = contingency
+        
+        return test
+        
     def _get_contingency (self, df, y, x):
         
         contingency = pd.DataFrame(
@@ -30,22 +44,40 @@ class testQualitatif ():
         
         return(contingency.values.astype(int))
         
-    def best_test (self):
+    def best_test (self, method = None, seed = None, politique = None, n_simulations = 10000):
         
         """
             Selectionne le meilleur test possible
+            
+            Variable :
+                method : "permutation" pour un test de permutation à la place des tests asymptotiques
+                seed : graine du test de permutation et du test de Fisher par Monte Carlo
+                politique : seuils de la politique de taille (politique_taille), None pour les seuils par défaut
+                    seul le test de permutation en dépend (permutation_max)
+                n_simulations : nombre de tableaux simulés du test de Fisher par Monte Carlo
         """
         
+        if method == "permutation":
+            # Tableau à une seule ligne ou colonne : absence de test, comme pour les tests asymptotiques
+            test_result = self.permutation(seed = seed, politique = politique)
+            if test_result["valid"] == False:
+                return ("no_test", self._no_test())
+            return ("permutation", test_result)
+        elif method is not None:
+            raise Exception("Méthode de test inconnue : {}".format(method))
+        
         # Ordre de priorité
         ## 1. Khi2
         ## 2. Khi2 - Yates
-        ## 3. Student test
-        ## 4. Absence de test
+        ## 3. Fisher (tableau 2x2)
+        ## 4. Fisher par simulation de Monte Carlo (tableau r x c)
+        ## 5. Absence de test
         
         order_test = {
             "khi2":[self.khi2,[False]],
             "khi2_yates":[self.khi2,[True]],
             "fisher":[self.fisher,[]],
+            "fisher_monte_carlo":[self.fisher_monte_carlo,[n_simulations, seed]],
             "no_test":[self._no_test, []]
         }
         
@@ -66,12 +98,11 @@ class testQualitatif ():
         # Application du test
         test_result = chi2_contingency(self.contingency, correction=yates_correction)
         
-        # Validité du test
+        # Validité du test : effectifs théoriques, comparés en une opération
         if yates_correction == False:
-            khi2_valid = len([True for x in test_result[3] for y in x if y < 5]) == 0
+            khi2_valid = bool((test_result[3] >= 5).all())
         else:
-            khi2_valid = (len([True for x in test_result[3] for y in x if y < 3]) == 0) \
-                        & (test_result[2] == 1)
+            khi2_valid = bool((test_result[3] >= 3).all()) & (test_result[2] == 1)
         
         # Structuration du résultat
         output_result = dict(zip(
@@ -90,17 +121,164 @@ class testQualitatif ():
         valid = (self.contingency.shape == (2,2))
         
         if (valid == True):
-            fisher_result = fisher_exact(self.contingency)
+            odds_ratio, p_value = fisher_exact_lot(self.contingency[np.newaxis])
             
             output_result = dict(zip(
                 ["statistic", "p_value", "observed_values","valid"],
-                list(fisher_result)+[self.contingency, valid]
+                [odds_ratio[0], p_value[0], self.contingency, valid]
             ))
         else:
             output_result = {"valid":valid}
             
         return output_result
     
+    @classmethod
+    def fisher_lot (cls, contingencies):
+        """
+            Test de Fisher d'un lot de tableaux 2x2, évalués ensemble
+            Les probabilités hypergéométriques reposent sur la table partagée des log-factorielles
+            
+            Paramètre :
+                contingencies : liste de tableaux de contingence 2x2
+            Output : liste des résultats, au format de fisher
+        """
+        
+        if len(contingencies) == 0:
+            return []
+        
+        odds_ratios, p_values = fisher_exact_lot(np.stack([np.asarray(x) for x in contingencies]))
+        
+        output_result = [
+            {
+                "statistic":odds_ratios[i],
+                "p_value":p_values[i],
+                "observed_values":contingency,
+                "valid":True
+            } for i, contingency in enumerate(contingencies)
+        ]
+        
+        return output_result
+    
+    def fisher_monte_carlo (self, n_simulations = 10000, seed = None):
+        """
+            Test exact de Fisher pour un tableau r x c, p-value estimée par simulation de Monte Carlo
+            Les tableaux de mêmes marges sont simulés cellule par cellule selon des lois hypergéométriques conditionnelles
+            (algorithme de Patefield), toutes les simulations à la fois.
+            La p-value est la proportion de tableaux de probabilité inférieure ou égale à celle du tableau observé.
+            
+            Paramètres :
+                n_simulations : nombre de tableaux simulés
+                seed : graine du générateur
+        """
+        
+        # Seules les modalités présentes sont conservées
+        contingency = np.asarray(self.contingency)
+        contingency = contingency[contingency.sum(axis = 1) > 0][:, contingency.sum(axis = 0) > 0]
+        
+        # Validité : tableau plus grand que 2x2
+        valid = (min(contingency.shape) >= 2) and (contingency.shape != (2,2))
+        
+        if (valid == False):
+            return {"valid":valid}
+        
+        tables = _simuler_tables(
+            contingency.sum(axis = 1),
+            contingency.sum(axis = 0),
+            n_simulations,
+            np.random.default_rng(seed)
+        )
+        
+        # Probabilité d'un tableau de marges fixées : seul le terme -somme(log n_ij!) varie
+        log_observe = log_factorielle(contingency).sum()
+        log_simules = log_factorielle(tables).sum(axis = (1, 2))
+        
+        # Tolérance relative pour les tableaux de même probabilité aux arrondis près
+        extremes = np.sum(log_simules >= log_observe*(1 - 1e-7))
+        p_value = (1 + extremes)/(1 + n_simulations)
+        
+        # Probabilité du tableau observé
+        n = contingency.sum()
+        log_probabilite = log_factorielle(contingency.sum(axis = 1)).sum() + log_factorielle(contingency.sum(axis = 0)).sum() \
+            - log_factorielle(n) - log_observe
+        
+        output_result = {
+            "statistic":np.exp(log_probabilite),
+            "p_value":p_value,
+            "p_value_se":np.sqrt(p_value*(1 - p_value)/n_simulations),
+            "n_simulations":n_simulations,
+            "observed_values":self.contingency,
+            "valid":valid
+        }
+        
+        return output_result
+    
+    def permutation (self, n_permutations = 10000, precision = 0.005, seed = None, taille_lot = 1000, politique = None):
+        """
+            Test de permutation de la statistique du Khi-2
+            Les sujets sont reconstitués à partir du tableau de contingence, les modalités de y sont permutées
+            et les tableaux de chaque lot de permutations sont comptés en un seul bincount
+            Au-delà de permutation_max sujets (politique de taille), la p-value est celle de la loi du Khi-2
+            
+            Paramètres :
+                n_permutations : nombre maximal de permutations
+                precision : erreur standard visée pour la p-value, arrêt anticipé une fois atteinte
+                seed : graine du générateur
+                taille_lot : nombre de permutations évaluées à la fois
+                politique : seuils de la politique de taille
+        """
+        
+        politique = politique_taille(politique)
+        
+        # Seules les modalités présentes sont conservées
+        contingency = np.asarray(self.contingency)
+        contingency = contingency[contingency.sum(axis = 1) > 0][:, contingency.sum(axis = 0) > 0]
+        
+        if min(contingency.shape) < 2:
+            return {"valid":False}
+        
+        n_lignes, n_colonnes = contingency.shape
+        n = contingency.sum()
+        
+        # Effectifs théoriques : les marges sont invariantes par permutation
+        attendus = np.outer(contingency.sum(axis = 1), contingency.sum(axis = 0))/n
+        
+        khi2 = lambda tables: (((tables - attendus)**2)/attendus).sum(axis = (-2, -1))
+        observee = khi2(contingency)
+        
+        if n > politique["permutation_max"]:
+            # Grand effectif : loi asymptotique de la statistique du Khi-2
+            p_value, erreur, n_realisees = loi_khi2.sf(observee, (n_lignes - 1)*(n_colonnes - 1)), np.nan, 0
+            methode = "asymptotique"
+        else:
+            # Un sujet par observation : cellule -> (ligne, colonne)
+            cellules = np.repeat(np.arange(n_lignes*n_colonnes), contingency.ravel())
+            x = cellules // n_colonnes
+            y = cellules % n_colonnes
+            
+            def statistiques_lot (generateur, taille):
+                permutations = generateur.permuted(np.broadcast_to(y, (taille, n)), axis = 1)
+                indices = np.arange(taille)[:, np.newaxis]*(n_lignes*n_colonnes) + x*n_colonnes + permutations
+                tables = np.bincount(indices.ravel(), minlength = taille*n_lignes*n_colonnes) \
+                    .reshape(taille, n_lignes, n_colonnes)
+                return khi2(tables)
+            
+            p_value, erreur, n_realisees = p_value_permutation(
+                observee, statistiques_lot, n_permutations, precision, seed, taille_lot_permutation(n, taille_lot)
+            )
+            methode = "permutation"
+        
+        output_result = {
+            "statistic":observee,
+            "p_value":p_value,
+            "p_value_se":erreur,
+            "n_permutations":n_realisees,
+            "methode":methode,
+            "observed_values":self.contingency,
+            "valid":True
+        }
+        
+        return output_result
+    
     def _no_test (self):
         """
             Retourne l'absence de test
@@ -108,4 +286,42 @@ class testQualitatif ():
         
         output_result = {"valid":True}
         
-        return output_result
\ No newline at end of file
+        return output_result
+
+def _simuler_tables (lignes, colonnes, n_simulations, generateur):
+    
+    """
+        Simule des tableaux de contingence de marges fixées (algorithme de Patefield)
+        Chaque cellule suit une loi hypergéométrique conditionnelle aux cellules déjà tirées,
+        les simulations sont tirées ensemble cellule par cellule.
+        Input :
+            lignes, colonnes : marges du tableau
+            n_simulations : nombre de tableaux
+            generateur : générateur numpy
+        Output : tableau (n_simulations, r, c)
+    """
+    
+    n_lignes, n_colonnes = len(lignes), len(colonnes)
+    tables = np.zeros((n_simulations, n_lignes, n_colonnes), dtype = np.int64)
+    
+    # Effectifs restant à répartir dans chaque colonne
+    colonnes_restantes = np.tile(np.asarray(colonnes, dtype = np.int64), (n_simulations, 1))
+    
+    for i in range(n_lignes - 1):
+        
+        ligne_restante = np.full(n_simulations, lignes[i], dtype = np.int64)
+        reste_colonnes = colonnes_restantes.sum(axis = 1)
+        
+        for j in range(n_colonnes - 1):
+            reste_colonnes = reste_colonnes - colonnes_restantes[:, j]
+            cellule = generateur.hypergeometric(colonnes_restantes[:, j], reste_colonnes, ligne_restante)
+            tables[:, i, j] = cellule
+            ligne_restante = ligne_restante - cellule
+        
+        tables[:, i, -1] = ligne_restante
+        colonnes_restantes = colonnes_restantes - tables[:, i, :]
+    
+    # Dernière ligne : ce qui reste de chaque colonne
+    tables[:, -1, :] = colonnes_restantes
+    
+    return tables
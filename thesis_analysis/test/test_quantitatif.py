@@ -1,8 +1,11 @@
-import pandas as pd
 import numpy as np
-from scipy.stats import chi2_contingency, fisher_exact
-from scipy.stats import normaltest, kstest, levene, ttest_ind, mannwhitneyu, f_oneway, kruskal
+from scipy.stats import levene, ttest_ind, f_oneway, kruskal, rankdata, f as loi_f
 import statsmodels.stats.weightstats as ws
+from .permutation import p_value_permutation, taille_lot_permutation
+from .exact import p_value_mann_whitney
+from .normalite import normalite_lot
+from .politique import politique_taille
+from .post_hoc import post_hoc
 
 class testQuantitatif ():
     """
@@ -23,16 +26,41 @@ class testQuantitatif ():
         self.x_shapes = self.df[x].drop_duplicates()
         
         # On détermine les valeurs de y pour chaque x
-        self.y_values = {}
+        y_values = {}
         for x_value in self.x_shapes:
-            self.y_values[x_value] = df[
+            y_values[x_value] = df[
                             df[x] == x_value
                         ][y] \
                         .values
             
+        self._initialiser_groupes(y_values)
+        
+    @classmethod
+    def depuis_groupes (cls, y_values, normalite = None):
+        
+        """
+            Construit le test à partir des valeurs de y déjà groupées selon les modalités de x
+                y_values : dictionnaire modalité de x -> tableau numpy des valeurs de y
+                normalite : tests de normalité des groupes déjà calculés (normalite_lot, méthode auto), None pour les calculer au besoin
+        """
+        
+        test = cls.__new__(cls)
+        test._initialiser_groupes(y_values, normalite)
+        
+        return test
+        
+    def _initialiser_groupes (self, y_values, normalite = None):
+        
+        self.y_values = y_values
+        
+        # Cache des tests de normalité : méthode -> résultats par modalité
+        self._normalite = {}
+        if normalite is not None:
+            self._normalite["auto"] = normalite
+        
         # On détermine les éléments de validités
-        self.x_shape = self.x_shapes.shape[0]
-        self.n_sup_30 = ((df.groupby(x).count()[y] >= 30).sum() == 2)
+        self.x_shape = len(y_values)
+        self.n_sup_30 = (sum([len(x) >= 30 for x in y_values.values()]) == 2)
         
     def _check_all_group_normal(self):
         
@@ -40,17 +68,34 @@ class testQuantitatif ():
         normal_test_result = self.normal_distribution();
         
         # On vérifie que tous les groupes sont distribués normalement
-        valid = len([False for x in normal_test_result.values() if x["p_value"] < 0.05]) == 0
+        # Un groupe non testable (trop petit ou constant, p-value NaN) n'est pas supposé normal
+        valid = len([False for x in normal_test_result.values() if not (x["p_value"] >= 0.05)]) == 0
         
         return valid
         
-    def best_test (self, normal = None):
+    def normalite_requise (self, normal = None, method = None):
+        
+        """
+            Indique si best_test utilise la normalité des groupes (mêmes paramètres que best_test)
+            Elle n'est pas utilisée pour moins de deux groupes, les tests de permutation, le z-test
+            ou si la normalité est supposée (normal = True)
+        """
+        
+        return self.x_shape >= 2 and method is None and not normal and not (self.x_shape == 2 and self.n_sup_30)
+        
+    def best_test (self, normal = None, method = None, seed = None, politique = None, post_hoc = False):
         
         """
             Selectionne le meilleur test possible
             
             Variable :
                 normal : boolean, si True, on suppose une distribution normale sans faire de test de normalité
+                method : "permutation" pour un test de permutation à la place des tests paramétriques et asymptotiques
+                seed : graine du test de permutation
+                politique : seuils de la politique de taille (politique_taille), None pour les seuils par défaut
+                    seuls Mann-Whitney (exact_max) et le test de permutation (permutation_max) en dépendent
+                post_hoc : si True, les comparaisons deux à deux (Tukey après une ANOVA, Dunn après un Kruskal-Wallis)
+                    sont ajoutées au résultat du test (clé post_hoc)
         """
         
         # Arbre decisionnel
@@ -65,6 +110,15 @@ class testQuantitatif ():
         ### > 2 :
         #### Egalite variance et distribution normal : ANOVA
         #### Autrement un test de Kruskal Wallis
+        ### < 2 : absence de test (une seule modalité, par exemple dans une strate)
+        
+        if self.x_shape < 2:
+            return ("no_test", self._no_test())
+        
+        if method == "permutation":
+            return ("permutation", self.permutation(seed = seed, politique = politique))
+        elif method is not None:
+            raise Exception("Méthode de test inconnue : {}".format(method))
         
         if self.x_shape == 2:
             if self.n_sup_30:
@@ -75,7 +129,7 @@ class testQuantitatif ():
                 # Vérification de la normalité
                 if normal or self._check_all_group_normal():
                     # Vérification de l'égalité des variance
-                    if self.variance_equity["p_value"] >= 0.05:
+                    if self.variance_equity()["p_value"] >= 0.05:
                         # On suppose l'égalité de variance : t-test
                         welch = False
                         test_applied = "t_test"
@@ -87,16 +141,20 @@ class testQuantitatif ():
                     result = self.t_test(welch)
                 else:
                     test_applied = "Mann-Whitney Wilcoxon"
-                    result = self.mwwilcoxon()
+                    result = self.mwwilcoxon(politique = politique)
         else:
             # Vérification de la normalité et de l'égalité de variance
-            if (normal or self._check_all_group_normal()) and (self.variance_equity["p_value"] >= 0.05):
+            if (normal or self._check_all_group_normal()) and (self.variance_equity()["p_value"] >= 0.05):
                 # Anova
                 test_applied = "ANOVA_1W"
                 result = self.anova_1w()
             else:
                 test_applied = "Kurskal_Wallis"
                 result = self.kruskal_wallis()
+            
+            # Comparaisons deux à deux
+            if post_hoc:
+                result["post_hoc"] = self.post_hoc("tukey" if test_applied == "ANOVA_1W" else "dunn")
                 
         return (test_applied, result)
                 
@@ -113,21 +171,21 @@ class testQuantitatif ():
         
         return(output_result)
         
-    def normal_distribution (self):
-        
-        # On applique le test de normalité à chaque catégorie
-        norm_test_result = dict(zip(
-            self.y_values.keys(),
-            [   dict(zip(
-                    ["statistic", "p_value"],
-                    [x.statistic, x.pvalue]
-                ))
-                for x in
-                [kstest(y_values, "norm") for y_values in self.y_values.values()]         
-            ]
-        ))
+    def normal_distribution (self, methode = "auto"):
+        
+        """
+            Test de normalité de chaque catégorie, tous les groupes sont testés en un lot (normalite_lot)
+            Les résultats sont mis en cache : best_test et les rapports les réutilisent
+            
+            Paramètre :
+                methode : "auto" (Shapiro-Wilk jusqu'à 50 sujets, D'Agostino au-delà), "shapiro", "dagostino" ou "lilliefors"
+            Output : dictionnaire modalité -> {"methode", "statistic", "p_value"}
+        """
+        
+        if methode not in self._normalite:
+            self._normalite[methode] = normalite_lot(self.y_values, methode)
             
-        return (norm_test_result)
+        return (self._normalite[methode])
     
     def z_test (self):
         
@@ -144,14 +202,42 @@ class testQuantitatif ():
     def t_test (self, welch = False):
         
         # Application du test
-        output_result = self._apply_test(ttest_ind, {"equal_var":welch})
+        output_result = self._apply_test(ttest_ind, {"equal_var":not welch})
         
         return(output_result)
     
-    def mwwilcoxon (self):
+    def mwwilcoxon (self, seuil_exact = 8, politique = None):
         
-        # Application du test
-        output_result = self._apply_test(mannwhitneyu)
+        """
+            Test de Mann-Whitney Wilcoxon bilatéral, mêmes résultats que scipy.stats.mannwhitneyu
+            La distribution exacte de U est mise en cache par taille de groupes et réutilisée d'un test à l'autre
+            
+            Paramètres :
+                seuil_exact : distribution exacte (sans ex-aequo) si l'un des groupes a au plus seuil_exact sujets,
+                    approximation normale au-delà
+                politique : seuils de la politique de taille, approximation normale au-delà de exact_max sujets
+        """
+        
+        politique = politique_taille(politique)
+        
+        x, y = [np.asarray(x, dtype = np.float64) for x in self.y_values.values()]
+        n1, n2 = len(x), len(y)
+        
+        # Statistique U du premier groupe à partir des rangs moyens
+        valeurs = np.concatenate([x, y])
+        rangs = rankdata(valeurs)
+        u1 = rangs[:n1].sum() - n1*(n1 + 1)/2
+        
+        # Correction des ex-aequo
+        effectifs = np.unique(valeurs, return_counts = True)[1].astype(np.float64)
+        terme_ex_aequo = (effectifs**3 - effectifs).sum()
+        
+        p_value, methode = p_value_mann_whitney(u1, n1, n2, terme_ex_aequo, seuil_exact, politique["exact_max"])
+        
+        output_result = dict(zip(
+            ["statistic","p_value","methode"],
+            [u1, p_value, methode]
+        ))
         
         return(output_result)
     
@@ -161,8 +247,9 @@ class testQuantitatif ():
             Test de Levene mesuré sur la moyenne
         """
         
-        # Application du test
-        output_result = self._apply_test(levene,{"center":"mean"})
+        # Application du test, groupes de variance nulle possibles
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            output_result = self._apply_test(levene,{"center":"mean"})
         
         return(output_result)
     
@@ -183,6 +270,82 @@ class testQuantitatif ():
         
         return(output_result)
     
+    def post_hoc (self, methode = "tukey", ajustement = "holm"):
+        
+        """
+            Comparaisons post-hoc de toutes les paires de modalités, calculées sous forme matricielle
+            
+            Paramètres :
+                methode : "tukey" (Tukey HSD), "games_howell" (variances inégales) ou "dunn" (rangs)
+                ajustement : ajustement des p-values de Dunn, None, "bonferroni", "holm" ou "fdr_bh"
+            Output : dictionnaire methode, ajustement, comparaisons : (modalité i, modalité j) -> résultat de la paire
+        """
+        
+        output_result = post_hoc(self.y_values, methode, ajustement)
+        
+        return(output_result)
+    
+    def permutation (self, n_permutations = 10000, precision = 0.005, seed = None, taille_lot = 1000, politique = None):
+        
+        """
+            Test de permutation de la statistique F de l'ANOVA (équivalent à la différence de moyennes pour deux groupes)
+            Les sommes par groupe de chaque lot de permutations sont obtenues par un produit matriciel avec les indicatrices des groupes
+            Au-delà de permutation_max sujets (politique de taille), la p-value est celle de la loi de Fisher (ANOVA)
+            
+            Paramètres :
+                n_permutations : nombre maximal de permutations
+                precision : erreur standard visée pour la p-value, arrêt anticipé une fois atteinte
+                seed : graine du générateur
+                taille_lot : nombre de permutations évaluées à la fois
+                politique : seuils de la politique de taille
+        """
+        
+        politique = politique_taille(politique)
+        
+        groupes = [np.asarray(x, dtype = np.float64) for x in self.y_values.values()]
+        effectifs = np.array([len(x) for x in groupes])
+        n, k = effectifs.sum(), len(groupes)
+        
+        # Valeurs centrées : la somme des carrés inter-groupes vaut somme(S_g²/n_g)
+        y = np.concatenate(groupes)
+        y = y - y.mean()
+        etiquettes = np.repeat(np.arange(k), effectifs)
+        
+        inter_groupes = lambda sommes: (sommes*sommes/effectifs).sum(axis = -1)
+        observee = inter_groupes(np.bincount(etiquettes, weights = y, minlength = k))
+        
+        # Statistique F observée : la somme des carrés totale est invariante par permutation
+        intra_groupes = (y*y).sum() - observee
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            statistique = (observee/(k-1))/(intra_groupes/(n-k))
+        
+        if n > politique["permutation_max"]:
+            # Grand effectif : loi asymptotique de la statistique F
+            p_value, erreur, n_realisees = loi_f.sf(statistique, k-1, n-k), np.nan, 0
+            methode = "asymptotique"
+        else:
+            indicatrices = np.zeros((n, k))
+            indicatrices[np.arange(n), etiquettes] = 1
+            
+            def statistiques_lot (generateur, taille):
+                permutations = generateur.permuted(np.broadcast_to(y, (taille, n)), axis = 1)
+                return inter_groupes(permutations @ indicatrices)
+            
+            p_value, erreur, n_realisees = p_value_permutation(
+                observee, statistiques_lot, n_permutations, precision, seed, taille_lot_permutation(n, taille_lot)
+            )
+            methode = "permutation"
+        
+        output_result = {
+            "statistic":statistique,
+            "p_value":p_value,
+            "p_value_se":erreur,
+            "n_permutations":n_realisees,
+            "methode":methode
+        }
+        
+        return(output_result)
+    
     def _no_test (self):
         """
             Retourne l'absence de test